@@ -3,4 +3,4 @@ Physics Modules Package
 Contains all physics calculation modules
 """
 
-__all__ = ['kinematics', 'freefall_dynamics', 'work_energy', 'momentum', 'electricity', 'vectors', 'projectile_motion', 'circular_motion']
\ No newline at end of file
+__all__ = ['kinematics', 'freefall_dynamics', 'work_energy', 'momentum', 'electricity', 'vectors', 'projectile_motion', 'circular_motion', 'energy_simulation', 'oscillator', 'optics']
\ No newline at end of file
@@ -1,5 +1,6 @@
 """Circular Motion Module"""
 import math
+import numpy as np
 
 class CircularMotion:
     @staticmethod
@@ -30,3 +31,58 @@ class CircularMotion:
                 results['centripetal_force'] = centripetal_force
         
         return results
+    
+    @staticmethod
+    def calculate_batch(v=0, r=0, m=0, g=9.8):
+        """Vectorized calculate() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate() would not
+            return that key
+        """
+        v, r, m = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (v, r, m)))
+        valid = (v > 0) & (r > 0)
+        
+        with np.errstate(all='ignore'):
+            centripetal_accel = np.where(valid, (v * v) / r, np.nan)
+            return {
+                'angular_velocity': np.where(valid, v / r, np.nan),
+                'period': np.where(valid, (2 * math.pi * r) / v, np.nan),
+                'frequency': np.where(valid, v / (2 * math.pi * r), np.nan),
+                'centripetal_acceleration': centripetal_accel,
+                'centripetal_force': np.where(valid & (m > 0), m * centripetal_accel, np.nan)
+            }
+    
+    @staticmethod
+    def state(t, v=0, r=0, m=0):
+        """Position, velocity and acceleration at time t of uniform circular motion
+        
+        The body starts at (r, 0) and moves counterclockwise.
+        
+        Args:
+            t: Time (s), scalar or array
+            v: Speed (m/s)
+            r: Radius (m)
+            m: Mass (kg), for the kinetic energy
+            
+        Returns:
+            Dictionary of values (arrays when t is an array)
+        """
+        if r <= 0:
+            raise ValueError("Radius must be positive!")
+        t = np.asarray(t, dtype=float)
+        omega = v / r
+        angle = omega * t
+        cos_angle = np.cos(angle)
+        sin_angle = np.sin(angle)
+        return {
+            'angle': angle,
+            'x': r * cos_angle,
+            'y': r * sin_angle,
+            'vx': -v * sin_angle,
+            'vy': v * cos_angle,
+            'ax': -omega * v * cos_angle,
+            'ay': -omega * v * sin_angle,
+            'speed': v + 0 * t,
+            'kinetic_energy': 0.5 * m * v * v + 0 * t
+        }
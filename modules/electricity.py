@@ -1,4 +1,5 @@
 """Electricity Module"""
+import numpy as np
 
 class Electricity:
     @staticmethod
@@ -29,3 +30,38 @@ class Electricity:
             force = k * (q1 * q2) / (r * r)
             return {'force': force, 'distance': r}
         return {}
+    
+    @staticmethod
+    def calculate_ohms_law_batch(v=0, i=0, r=0):
+        """Vectorized calculate_ohms_law() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate_ohms_law()
+            would not return that key
+        """
+        v, i, r = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (v, i, r)))
+        find_r = (v > 0) & (i > 0)
+        find_i = ~find_r & (v > 0) & (r > 0)
+        find_v = ~find_r & ~find_i & (i > 0) & (r > 0)
+        
+        with np.errstate(all='ignore'):
+            i = np.where(find_i, v / r, i)
+            v = np.where(find_v, i * r, v)
+            return {
+                'resistance': np.where(find_r, v / i, np.nan),
+                'current': np.where(find_i, i, np.nan),
+                'voltage': np.where(find_v, v, np.nan),
+                'power': np.where((v > 0) & (i > 0), v * i, np.nan)
+            }
+    
+    @staticmethod
+    def calculate_coulombs_law_batch(q1=0, q2=0, r=1, k=8.99e9):
+        """Vectorized calculate_coulombs_law() over arrays of inputs"""
+        q1, q2, r = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (q1, q2, r)))
+        valid = (q1 > 0) & (q2 > 0) & (r > 0)
+        
+        with np.errstate(all='ignore'):
+            return {
+                'force': np.where(valid, k * (q1 * q2) / (r * r), np.nan),
+                'distance': np.where(valid, r, np.nan)
+            }
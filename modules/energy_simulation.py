@@ -0,0 +1,217 @@
+"""Energy Conservation Simulation Module"""
+import time
+import numpy as np
+
+
+def _pendulum_acceleration(x, p):
+    # x is the angle from vertical (rad)
+    return -(p['g'] / p['length']) * np.sin(x)
+
+
+def _pendulum_energy(x, v, p):
+    pe = p['m'] * p['g'] * p['length'] * (1 - np.cos(x))
+    ke = 0.5 * p['m'] * (p['length'] * v) ** 2
+    return pe, ke
+
+
+def _ramp_acceleration(x, p):
+    # x is the distance up a frictionless ramp (m)
+    return -p['g'] * np.sin(np.radians(p['angle'])) + 0 * x
+
+
+def _ramp_energy(x, v, p):
+    pe = p['m'] * p['g'] * x * np.sin(np.radians(p['angle']))
+    ke = 0.5 * p['m'] * v * v
+    return pe, ke
+
+
+def _spring_acceleration(x, p):
+    # x is the extension from equilibrium (m)
+    return -(p['k'] / p['m']) * x
+
+
+def _spring_energy(x, v, p):
+    pe = 0.5 * p['k'] * x * x
+    ke = 0.5 * p['m'] * v * v
+    return pe, ke
+
+
+def _euler_step(x, v, a, dt, accel):
+    x_new = x + v * dt
+    v_new = v + a * dt
+    return x_new, v_new, accel(x_new)
+
+
+def _semi_implicit_step(x, v, a, dt, accel):
+    v_new = v + a * dt
+    x_new = x + v_new * dt
+    return x_new, v_new, accel(x_new)
+
+
+def _verlet_step(x, v, a, dt, accel):
+    x_new = x + v * dt + 0.5 * a * dt * dt
+    a_new = accel(x_new)
+    v_new = v + 0.5 * (a + a_new) * dt
+    return x_new, v_new, a_new
+
+
+def _rk4_step(x, v, a, dt, accel):
+    k2x = v + 0.5 * dt * a
+    k2v = accel(x + 0.5 * dt * v)
+    k3x = v + 0.5 * dt * k2v
+    k3v = accel(x + 0.5 * dt * k2x)
+    k4x = v + dt * k3v
+    k4v = accel(x + dt * k3x)
+    x_new = x + (dt / 6) * (v + 2 * k2x + 2 * k3x + k4x)
+    v_new = v + (dt / 6) * (a + 2 * k2v + 2 * k3v + k4v)
+    return x_new, v_new, accel(x_new)
+
+
+class EnergySimulation:
+    """Time-stepped PE <-> KE exchange for pendulums, ramps and springs"""
+
+    SYSTEMS = {
+        'pendulum': (_pendulum_acceleration, _pendulum_energy),
+        'ramp': (_ramp_acceleration, _ramp_energy),
+        'spring': (_spring_acceleration, _spring_energy),
+    }
+
+    INTEGRATORS = {
+        'euler': _euler_step,
+        'semi_implicit': _semi_implicit_step,
+        'verlet': _verlet_step,
+        'rk4': _rk4_step,
+    }
+
+    @staticmethod
+    def prepare(system, integrator, x0, v0, dt, steps, record_every, m, g, length, k, angle):
+        """Validate simulate() arguments and broadcast the per-sample inputs
+
+        Returns:
+            tuple: (steps, record_every, x, v, params) with x, v and every
+            params array ('m', 'g', 'length', 'k', 'angle') of one shape
+        """
+        if system not in EnergySimulation.SYSTEMS:
+            raise ValueError(f"Unknown system: {system}")
+        if integrator not in EnergySimulation.INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {integrator}")
+        steps = int(steps)
+        if steps <= 0:
+            raise ValueError("Steps must be positive!")
+        if dt <= 0:
+            raise ValueError("Time step must be positive!")
+
+        x, v, m, g, length, k, angle = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (x0, v0, m, g, length, k, angle))
+        )
+        if np.any(m <= 0):
+            raise ValueError("Mass must be positive!")
+        if system == 'pendulum' and np.any(length <= 0):
+            raise ValueError("Length must be positive!")
+
+        if record_every is None:
+            record_every = max(1, steps // 1000)
+        record_every = max(1, int(record_every))
+        params = {'m': m, 'g': g, 'length': length, 'k': k, 'angle': angle}
+        return steps, record_every, x.copy(), v.copy(), params
+
+    @staticmethod
+    def simulate(system='spring', integrator='verlet', x0=1.0, v0=0.0, dt=0.01,
+                 steps=1000, record_every=None, m=1.0, g=9.8, length=1.0, k=10.0, angle=30.0,
+                 progress=None):
+        """Integrate one system over time for many initial conditions at once
+
+        Args:
+            system: 'pendulum', 'ramp' or 'spring'
+            integrator: 'euler', 'semi_implicit', 'verlet' or 'rk4'
+            x0: Initial position - angle (rad), distance up the ramp (m) or
+                spring extension (m); scalar or array
+            v0: Initial velocity (rad/s for the pendulum, m/s otherwise)
+            dt: Time step (s)
+            steps: Number of time steps
+            record_every: Keep every n-th state (default: about 1000 frames)
+            m: Mass (kg)
+            g: Gravitational acceleration (m/s²)
+            length: Pendulum length (m)
+            k: Spring constant (N/m)
+            angle: Ramp angle (degrees)
+            progress: Optional callback called with the fraction of steps
+                done, about every 1% of the run
+
+        Returns:
+            Dictionary with the recorded time series, the energy drift of each
+            initial condition and the integrator throughput
+        """
+        steps, record_every, x, v, params = EnergySimulation.prepare(
+            system, integrator, x0, v0, dt, steps, record_every, m, g, length, k, angle
+        )
+        accel_fn, energy_fn = EnergySimulation.SYSTEMS[system]
+        step = EnergySimulation.INTEGRATORS[integrator]
+
+        def accel(pos):
+            return accel_fn(pos, params)
+
+        a = accel(x)
+        pe, ke = energy_fn(x, v, params)
+        e0 = pe + ke
+        max_error = np.zeros_like(e0)
+
+        frames = {'t': [0.0], 'position': [x], 'velocity': [v],
+                  'potential_energy': [pe], 'kinetic_energy': [ke]}
+
+        report_every = max(1, steps // 100)
+        start = time.perf_counter()
+        for n in range(1, steps + 1):
+            x, v, a = step(x, v, a, dt, accel)
+            pe, ke = energy_fn(x, v, params)
+            np.maximum(max_error, np.abs(pe + ke - e0), out=max_error)
+            if n % record_every == 0 or n == steps:
+                frames['t'].append(n * dt)
+                frames['position'].append(x)
+                frames['velocity'].append(v)
+                frames['potential_energy'].append(pe)
+                frames['kinetic_energy'].append(ke)
+            if progress is not None and n % report_every == 0:
+                progress(n / steps)
+        elapsed = max(time.perf_counter() - start, 1e-12)
+
+        # Relative drift, falling back to absolute drift where E0 is zero
+        scale = np.abs(e0)
+        drift = np.divide(max_error, scale, out=max_error.copy(), where=scale > 0)
+
+        results = {key: np.stack(values) if key != 't' else np.array(values)
+                   for key, values in frames.items()}
+        results['total_energy'] = results['potential_energy'] + results['kinetic_energy']
+        results['energy_drift'] = drift
+        results['max_energy_drift'] = float(np.max(drift))
+        results['steps_per_second'] = steps / elapsed
+        results['sample_steps_per_second'] = steps * max(x.size, 1) / elapsed
+        return results
+
+    @staticmethod
+    def compare_integrators(system='spring', integrators=None, simulate=None, **kwargs):
+        """Run the same initial conditions through several integrators
+
+        Args:
+            system: 'pendulum', 'ramp' or 'spring'
+            integrators: Integrator names (default: all)
+            simulate: Function to run each integrator with (default:
+                EnergySimulation.simulate; any function with its signature)
+            **kwargs: Any other simulate() argument
+
+        Returns:
+            Dictionary of integrator name: drift and throughput summary
+        """
+        integrators = integrators or list(EnergySimulation.INTEGRATORS)
+        simulate = simulate or EnergySimulation.simulate
+        kwargs['record_every'] = kwargs.get('steps', 1000)
+        results = {}
+        for name in integrators:
+            run = simulate(system=system, integrator=name, **kwargs)
+            results[name] = {
+                'max_energy_drift': run['max_energy_drift'],
+                'mean_energy_drift': float(np.mean(run['energy_drift'])),
+                'steps_per_second': run['steps_per_second'],
+                'sample_steps_per_second': run['sample_steps_per_second'],
+            }
+        return results
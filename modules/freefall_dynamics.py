@@ -1,4 +1,5 @@
 """Freefall Dynamics Module"""
+import numpy as np
 
 class FreefallDynamics:
     @staticmethod
@@ -15,17 +16,78 @@ class FreefallDynamics:
             results['height'] = h
         elif t > 0:
             # Time known, find height and velocity
-            h = 0.5 * g * t * t
+            h = g * t * t / 2
             v = g * t
             results['height'] = h
             results['final_velocity'] = v
             results['time'] = t
         elif v0 > 0 and t > 0:
             # Initial velocity and time
-            h = v0 * t + 0.5 * g * t * t
+            h = v0 * t + g * t * t / 2
             v = v0 + g * t
             results['height'] = h
             results['final_velocity'] = v
             results['time'] = t
         
         return results
+    
+    @staticmethod
+    def calculate_freefall_batch(h=0, v0=0, t=0, g=9.8):
+        """Vectorized calculate_freefall() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate_freefall()
+            would not return that key
+        """
+        h, v0, t, g = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (h, v0, t, g)))
+        
+        # Height known, find time and final velocity
+        from_height = (h > 0) & (v0 == 0)
+        # Time known, find height and velocity
+        from_time = ~from_height & (t > 0)
+        
+        with np.errstate(all='ignore'):
+            time = np.where(from_height, (2 * h / g) ** 0.5, np.where(from_time, t, np.nan))
+            height = np.where(from_height, h, np.where(from_time, 0.5 * g * t * t, np.nan))
+        
+        return {
+            'time': time,
+            'final_velocity': g * time,
+            'height': height
+        }
+    
+    @staticmethod
+    def state(t, h=0, v0=0, g=9.8, m=1.0):
+        """Height, speed and energy at time t of a body dropped from height h
+        
+        Args:
+            t: Time since release (s), scalar or array
+            h: Release height above the ground (m)
+            v0: Initial downward velocity (m/s)
+            g: Gravitational acceleration (m/s²)
+            m: Mass (kg), for the energies
+            
+        Returns:
+            Dictionary of values (arrays when t is an array)
+        """
+        t = np.asarray(t, dtype=float)
+        distance = v0 * t + 0.5 * g * t * t
+        velocity = v0 + g * t
+        height = h - distance
+        kinetic = 0.5 * m * velocity * velocity
+        potential = m * g * height
+        return {
+            'height': height,
+            'distance': distance,
+            'velocity': velocity,
+            'kinetic_energy': kinetic,
+            'potential_energy': potential,
+            'total_energy': kinetic + potential
+        }
+    
+    @staticmethod
+    def time_to_ground(h=0, v0=0, g=9.8):
+        """Time to fall height h starting at downward velocity v0 (s)"""
+        if h <= 0 or g <= 0:
+            raise ValueError("Height and gravity must be positive!")
+        return (-v0 + (v0 * v0 + 2 * g * h) ** 0.5) / g
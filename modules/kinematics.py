@@ -1,5 +1,6 @@
 """Kinematics Module"""
 import math
+import numpy as np
 
 class Kinematics:
     @staticmethod
@@ -16,7 +17,7 @@ class Kinematics:
         # s = ut + 0.5*a*t^2
         if t != 0 and a != 0:
             if s == 0:
-                s = u * t + 0.5 * a * t * t
+                s = u * t + a * t * t / 2
                 results['s'] = s
         
         # v^2 = u^2 + 2as
@@ -40,3 +41,47 @@ class Kinematics:
             results['a'] = a
         
         return results
+    
+    @staticmethod
+    def calculate_batch(u=0, a=0, t=0, s=0, v=0):
+        """Vectorized calculate() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate() would not
+            return that key
+        """
+        u, a, t, s, v = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (u, a, t, s, v)))
+        nan = np.full(u.shape, np.nan)
+        results = {'v': nan, 's': nan, 'a': nan, 't': nan}
+        
+        with np.errstate(all='ignore'):
+            # v = u + at
+            solve = (t != 0) & (a != 0) & (v == 0)
+            v = np.where(solve, u + a * t, v)
+            results['v'] = np.where(solve, v, results['v'])
+            
+            # s = ut + 0.5*a*t^2
+            solve = (t != 0) & (a != 0) & (s == 0)
+            s = np.where(solve, u * t + 0.5 * a * t * t, s)
+            results['s'] = np.where(solve, s, results['s'])
+            
+            # v^2 = u^2 + 2as
+            v_squared = u * u + 2 * a * s
+            solve = (a != 0) & (s != 0) & (v_squared >= 0) & (v == 0)
+            v = np.where(solve, np.sqrt(np.maximum(v_squared, 0)), v)
+            results['v'] = np.where(solve, v, results['v'])
+            
+            # Solve for missing values
+            solve = (t != 0) & (v != 0) & (u != 0) & (a == 0)
+            a = np.where(solve, (v - u) / t, a)
+            results['a'] = np.where(solve, a, results['a'])
+            
+            solve = (a != 0) & (v != 0) & (u != 0) & (t == 0)
+            t = np.where(solve, (v - u) / a, t)
+            results['t'] = np.where(solve, t, results['t'])
+            
+            solve = (s != 0) & (u != 0) & (t != 0) & (a == 0)
+            a = np.where(solve, (2 * (s - u * t)) / (t * t), a)
+            results['a'] = np.where(solve, a, results['a'])
+        
+        return results
@@ -1,4 +1,5 @@
 """Momentum Module"""
+import numpy as np
 
 class Momentum:
     @staticmethod
@@ -23,3 +24,21 @@ class Momentum:
             results['p_total'] = p_total
         
         return results
+    
+    @staticmethod
+    def calculate_batch(m1=0, v1=0, m2=0, v2=0):
+        """Vectorized calculate() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate() would not
+            return that key
+        """
+        m1, v1, m2, v2 = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (m1, v1, m2, v2)))
+        has_p1 = (m1 > 0) & (v1 != 0)
+        has_p2 = (m2 > 0) & (v2 != 0)
+        
+        return {
+            'p1': np.where(has_p1, m1 * v1, np.nan),
+            'p2': np.where(has_p2, m2 * v2, np.nan),
+            'p_total': np.where(has_p1 & has_p2, m1 * v1 + m2 * v2, np.nan)
+        }
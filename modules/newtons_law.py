@@ -1,4 +1,5 @@
 """Newton's Law of Motion Module"""
+import numpy as np
 
 class NewtonsLaw:
     @staticmethod
@@ -32,3 +33,26 @@ class NewtonsLaw:
                 results['acceleration'] = f / m
         
         return results
+    
+    @staticmethod
+    def calculate_batch(f=0, m=0, a=0):
+        """Vectorized calculate() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate() would not
+            return that key
+        """
+        f, m, a = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (f, m, a)))
+        
+        find_force = (f == 0) & (m > 0) & (a > 0)
+        find_mass = ~find_force & (m == 0) & (f > 0) & (a > 0)
+        find_accel = ~find_force & ~find_mass & (a == 0) & (f > 0) & (m > 0)
+        # If multiple values provided, calculate all possible results
+        all_given = ~(find_force | find_mass | find_accel)
+        
+        with np.errstate(all='ignore'):
+            return {
+                'force': np.where(find_force | (all_given & (m > 0) & (a > 0)), m * a, np.nan),
+                'mass': np.where(find_mass | (all_given & (f > 0) & (a > 0)), f / a, np.nan),
+                'acceleration': np.where(find_accel | (all_given & (f > 0) & (m > 0)), f / m, np.nan)
+            }
@@ -0,0 +1,143 @@
+"""Optics Module - thin lenses and paraxial ray-transfer matrices"""
+from functools import lru_cache
+import numpy as np
+
+
+def _element_key(element):
+    """Hashable (type, parameters...) tuple for one optical element"""
+    kind = element.get('type')
+    if kind == 'space':
+        return ('space', float(element['d']))
+    if kind == 'lens':
+        return ('lens', float(element['f']))
+    if kind == 'mirror':
+        return ('mirror', float(element['R']))
+    if kind == 'interface':
+        return ('interface', float(element.get('R', 0)),
+                float(element.get('n1', 1.0)), float(element.get('n2', 1.0)))
+    raise ValueError(f"Unknown optical element: {kind}")
+
+
+def _element_matrix(key):
+    """2x2 ray-transfer matrix acting on the ray vector (y, θ)"""
+    kind = key[0]
+    if kind == 'space':
+        return np.array([[1.0, key[1]], [0.0, 1.0]])
+    if kind == 'lens':
+        if key[1] == 0:
+            raise ValueError("Focal length cannot be zero!")
+        return np.array([[1.0, 0.0], [-1.0 / key[1], 1.0]])
+    if kind == 'mirror':
+        power = 0.0 if key[1] == 0 else -2.0 / key[1]
+        return np.array([[1.0, 0.0], [power, 1.0]])
+    # Refraction at a spherical interface; R = 0 means a flat surface
+    _, R, n1, n2 = key
+    power = 0.0 if R == 0 else (n1 - n2) / (R * n2)
+    return np.array([[1.0, 0.0], [power, n1 / n2]])
+
+
+@lru_cache(maxsize=256)
+def _system_matrix(keys):
+    matrix = np.eye(2)
+    for key in keys:
+        matrix = _element_matrix(key) @ matrix
+    matrix.setflags(write=False)
+    return matrix
+
+
+class OpticalSystem:
+    """A sequence of elements composed once into a single system matrix"""
+
+    def __init__(self, elements):
+        """
+        Args:
+            elements: List of element dicts in the order light meets them, e.g.
+                {'type': 'space', 'd': 10}, {'type': 'lens', 'f': 5},
+                {'type': 'mirror', 'R': 20} or
+                {'type': 'interface', 'R': 5, 'n1': 1.0, 'n2': 1.5}
+        """
+        self.keys = tuple(_element_key(element) for element in elements)
+        self.matrix = _system_matrix(self.keys)
+
+    def trace(self, y, theta):
+        """Trace a batch of rays through the whole system in one multiply
+
+        Args:
+            y: Ray heights (scalar or array)
+            theta: Ray angles in radians (scalar or array)
+
+        Returns:
+            tuple: (output heights, output angles) arrays
+        """
+        rays = np.stack(np.broadcast_arrays(
+            np.asarray(y, dtype=float), np.asarray(theta, dtype=float)
+        )).reshape(2, -1)
+        out = self.matrix @ rays
+        shape = np.broadcast_shapes(np.shape(y), np.shape(theta))
+        return out[0].reshape(shape), out[1].reshape(shape)
+
+    def properties(self):
+        """Focal properties of the system (lengths in the elements' units)
+
+        Returns:
+            Dictionary with the ABCD entries and, for a system with optical
+            power, the effective and back focal lengths
+        """
+        A, B, C, D = (float(value) for value in self.matrix.ravel())
+        results = {'A': A, 'B': B, 'C': C, 'D': D}
+        if C != 0:
+            results['effective_focal_length'] = -1 / C
+            results['back_focal_length'] = -A / C
+            results['optical_power'] = -C
+        return results
+
+
+class Optics:
+    @staticmethod
+    def calculate(f=0, u=0, v=0):
+        """Calculate thin-lens image formation: 1/f = 1/u + 1/v
+
+        Real objects and images are positive, so a virtual image has a
+        negative image distance.
+
+        Args:
+            f: Focal length (cm), negative for a diverging lens
+            u: Object distance (cm)
+            v: Image distance (cm)
+
+        Returns:
+            Dictionary with calculated values
+        """
+        results = {}
+
+        if f != 0 and u > 0 and v == 0:
+            if u == f:
+                results['image_at_infinity'] = True
+                return results
+            v = (u * f) / (u - f)
+            results['image_distance'] = v
+        elif f != 0 and v != 0 and u == 0:
+            if v == f:
+                return results
+            u = (v * f) / (v - f)
+            results['object_distance'] = u
+        elif f == 0 and u > 0 and v != 0:
+            f = (u * v) / (u + v) if u + v != 0 else 0
+            if f != 0:
+                results['focal_length'] = f
+
+        if f != 0:
+            results['power'] = 100 / f
+
+        if u != 0 and v != 0:
+            magnification = -v / u
+            results['magnification'] = magnification
+            results['image_type'] = 'real' if v > 0 else 'virtual'
+            results['orientation'] = 'inverted' if magnification < 0 else 'upright'
+
+        return results
+
+    @staticmethod
+    def trace(elements, y, theta):
+        """Trace rays through a list of elements (see OpticalSystem)"""
+        return OpticalSystem(elements).trace(y, theta)
@@ -0,0 +1,204 @@
+"""Simple Harmonic / Damped / Driven Oscillator Module"""
+import math
+import numpy as np
+
+
+def _batch(t, *params):
+    """Broadcast parameters to shape P and times to shape P + (T,)"""
+    params = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in params))
+    t = np.asarray(t, dtype=float)
+    return (t,) + tuple(p[..., np.newaxis] if t.ndim else p for p in params)
+
+
+def _homogeneous(t, omega0, gamma, x0, v0):
+    """Free damped response for any damping ratio
+
+    Each regime uses the closed form that stays finite for it:
+
+    - under-damped (γ < ω0): e^{-γt} (x0 cos(ωd t) + (v0 + γ x0) sin(ωd t)/ωd),
+      with sin(ωd t)/ωd written with np.sinc
+    - critically damped (γ = ω0): e^{-γt} (x0 + (v0 + γ x0) t)
+    - over-damped (γ > ω0): the two decaying exponentials e^{(-γ±s)t},
+      s = sqrt(γ² - ω0²), so that cosh(st) and sinh(st) never overflow
+      against an e^{-γt} that has already underflowed
+    """
+    c = v0 + gamma * x0
+    k = omega0 * omega0 * x0 + gamma * v0
+    over = gamma > omega0
+    critical = gamma == omega0
+
+    # Under-damped (and any negative damping): ωd may be complex only there
+    wd = np.sqrt(np.where(over | critical, 0.0, omega0 * omega0 - gamma * gamma) + 0j)
+    decay = np.exp(-gamma * t)
+    cos_term = np.cos(wd * t)
+    sin_term = t * np.sinc(wd * t / np.pi)
+    x = (decay * (x0 * cos_term + c * sin_term)).real
+    v = (decay * (v0 * cos_term - k * sin_term)).real
+
+    if np.any(critical):
+        x = np.where(critical, decay * (x0 + c * t), x)
+        v = np.where(critical, decay * (v0 - gamma * c * t), v)
+
+    if np.any(over):
+        s = np.sqrt(np.where(over, gamma * gamma - omega0 * omega0, 1.0))
+        # Slow root as ω0²/(γ + s), which does not cancel when γ >> ω0
+        slow = np.exp(-omega0 * omega0 / np.where(over, gamma + s, 1.0) * t)
+        fast = np.exp(-(gamma + s) * t)
+        # e^{-γt} cosh(st) and e^{-γt} sinh(st)/s; expm1 keeps the latter
+        # accurate as s -> 0 near critical damping
+        cosh_term = 0.5 * (slow + fast)
+        sinh_term = -slow * np.expm1(-2 * s * t) / (2 * s)
+        x = np.where(over, x0 * cosh_term + c * sinh_term, x)
+        v = np.where(over, v0 * cosh_term - k * sinh_term, v)
+    return x, v
+
+
+def _energies(x, v, m, k):
+    return {
+        'displacement': x,
+        'velocity': v,
+        'kinetic_energy': 0.5 * m * v * v,
+        'potential_energy': 0.5 * k * x * x,
+        'total_energy': 0.5 * m * v * v + 0.5 * k * x * x,
+    }
+
+
+class Oscillator:
+    @staticmethod
+    def calculate(A=0, f=0, T=0, m=0, k=0, t=None):
+        """Calculate simple harmonic motion parameters
+
+        Args:
+            A: Amplitude (m)
+            f: Frequency (Hz)
+            T: Period (s)
+            m: Mass (kg)
+            k: Spring constant (N/m)
+            t: Time at which to evaluate displacement and velocity (s)
+
+        Returns:
+            Dictionary with calculated values
+        """
+        results = {}
+
+        if f <= 0 and T > 0:
+            f = 1 / T
+        if f <= 0 and m > 0 and k > 0:
+            f = math.sqrt(k / m) / (2 * math.pi)
+
+        if f > 0:
+            omega = 2 * math.pi * f
+            results['period'] = 1 / f
+            results['frequency'] = f
+            results['angular_frequency'] = omega
+
+            if A > 0:
+                results['max_velocity'] = A * omega
+                results['max_acceleration'] = A * omega * omega
+
+            if A > 0 and m > 0:
+                results['total_energy'] = 0.5 * m * omega * omega * A * A
+
+            if A > 0 and t is not None:
+                results['displacement'] = A * math.cos(omega * t)
+                results['velocity'] = -A * omega * math.sin(omega * t)
+
+        return results
+
+    @staticmethod
+    def simple(t, A=1.0, m=1.0, k=10.0, phi=0.0):
+        """Evaluate undamped SHM x = A cos(ωt + φ) over a time array
+
+        Parameters may be arrays; they broadcast to a shape P and the results
+        have shape P + t.shape.
+
+        Returns:
+            Dictionary of displacement, velocity and energy arrays
+        """
+        t, A, m, k, phi = _batch(t, A, m, k, phi)
+        omega = np.sqrt(k / m)
+        phase = omega * t + phi
+        x = A * np.cos(phase)
+        v = -A * omega * np.sin(phase)
+        return _energies(x, v, m, k)
+
+    @staticmethod
+    def damped(t, m=1.0, k=10.0, b=0.5, x0=1.0, v0=0.0):
+        """Evaluate the free damped oscillator m x'' + b x' + k x = 0
+
+        Under-, critically and over-damped parameters are all handled in
+        closed form, so no time stepping is needed.
+
+        Returns:
+            Dictionary of displacement, velocity and energy arrays
+        """
+        t, m, k, b, x0, v0 = _batch(t, m, k, b, x0, v0)
+        omega0 = np.sqrt(k / m)
+        gamma = b / (2 * m)
+        x, v = _homogeneous(t, omega0, gamma, x0, v0)
+        return _energies(x, v, m, k)
+
+    @staticmethod
+    def driven(t, m=1.0, k=10.0, b=0.5, F0=1.0, omega_d=3.0, x0=0.0, v0=0.0):
+        """Evaluate m x'' + b x' + k x = F0 cos(ω_d t) including the transient
+
+        Returns:
+            Dictionary of displacement, velocity and energy arrays plus the
+            steady-state amplitude and phase lag
+        """
+        t, m, k, b, F0, omega_d, x0, v0 = _batch(t, m, k, b, F0, omega_d, x0, v0)
+        omega0 = np.sqrt(k / m)
+        gamma = b / (2 * m)
+        amplitude, phase = Oscillator._steady_state(omega0, gamma, F0 / m, omega_d)
+
+        # Steady state plus the free response that fixes the initial conditions
+        xp = amplitude * np.cos(omega_d * t - phase)
+        vp = -amplitude * omega_d * np.sin(omega_d * t - phase)
+        xh, vh = _homogeneous(
+            t, omega0, gamma,
+            x0 - amplitude * np.cos(phase),
+            v0 - amplitude * omega_d * np.sin(phase),
+        )
+        results = _energies(xp + xh, vp + vh, m, k)
+        results['steady_state_amplitude'] = amplitude[..., 0] if t.ndim else amplitude
+        results['phase_lag'] = phase[..., 0] if t.ndim else phase
+        return results
+
+    @staticmethod
+    def resonance_curve(omega_d, m=1.0, k=10.0, b=0.5, F0=1.0):
+        """Sweep the steady-state response over driving frequency
+
+        Args:
+            omega_d: Array of driving angular frequencies (rad/s)
+            m, k, b, F0: Oscillator parameters (may be arrays)
+
+        Returns:
+            Dictionary of amplitude, phase lag and mean absorbed power for every
+            driving frequency, plus the natural frequency and quality factor
+        """
+        omega_d, m, k, b, F0 = _batch(omega_d, m, k, b, F0)
+        omega0 = np.sqrt(k / m)
+        gamma = b / (2 * m)
+        amplitude, phase = Oscillator._steady_state(omega0, gamma, F0 / m, omega_d)
+        with np.errstate(divide='ignore'):
+            quality = np.where(b > 0, np.sqrt(m * k) / b, np.inf)
+
+        index = np.argmax(amplitude, axis=-1)
+        return {
+            'omega_d': omega_d,
+            'amplitude': amplitude,
+            'phase_lag': phase,
+            'power': 0.5 * b * omega_d * omega_d * amplitude * amplitude,
+            'natural_angular_frequency': omega0[..., 0] if omega_d.ndim else omega0,
+            'quality_factor': quality[..., 0] if omega_d.ndim else quality,
+            'peak_omega': np.take(omega_d, index) if omega_d.ndim else omega_d,
+        }
+
+    @staticmethod
+    def _steady_state(omega0, gamma, f0, omega_d):
+        """Amplitude and phase lag of the particular solution"""
+        detuning = omega0 * omega0 - omega_d * omega_d
+        damping = 2 * gamma * omega_d
+        with np.errstate(divide='ignore'):
+            amplitude = f0 / np.hypot(detuning, damping)
+        return amplitude, np.arctan2(damping, detuning)
@@ -1,4 +1,5 @@
 """Potential Energy and Kinetic Energy Module"""
+import numpy as np
 
 class PEandKE:
     @staticmethod
@@ -23,14 +24,33 @@ class PEandKE:
         
         # Kinetic Energy: KE = 0.5 * m * v²
         if m > 0 and v > 0:
-            ke = 0.5 * m * v * v
+            ke = m * v * v / 2
             results['kinetic_energy'] = ke
         
         # Total Energy
         pe = m * g * h if (m > 0 and h > 0) else 0
-        ke = 0.5 * m * v * v if (m > 0 and v > 0) else 0
+        ke = m * v * v / 2 if (m > 0 and v > 0) else 0
         
         if pe > 0 or ke > 0:
             results['total_energy'] = pe + ke
         
         return results
+    
+    @staticmethod
+    def calculate_batch(m=0, h=0, v=0, g=9.8):
+        """Vectorized calculate() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate() would not
+            return that key
+        """
+        m, h, v, g = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (m, h, v, g)))
+        
+        pe = np.where((m > 0) & (h > 0), m * g * h, 0)
+        ke = np.where((m > 0) & (v > 0), 0.5 * m * v * v, 0)
+        
+        return {
+            'potential_energy': np.where((m > 0) & (h > 0), pe, np.nan),
+            'kinetic_energy': np.where((m > 0) & (v > 0), ke, np.nan),
+            'total_energy': np.where((pe > 0) | (ke > 0), pe + ke, np.nan)
+        }
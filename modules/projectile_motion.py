@@ -1,5 +1,6 @@
 """Projectile Motion Module"""
 import math
+import numpy as np
 
 class ProjectileMotion:
     @staticmethod
@@ -27,3 +28,56 @@ class ProjectileMotion:
             results['time_to_max_height'] = time_to_max
         
         return results
+    
+    @staticmethod
+    def calculate_batch(v0=0, theta=0, g=9.8):
+        """Vectorized calculate() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate() would not
+            return that key
+        """
+        v0, theta, g = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (v0, theta, g)))
+        valid = (v0 > 0) & (theta >= 0) & (theta <= 90)
+        theta_rad = np.radians(theta)
+        sin_theta = np.sin(theta_rad)
+        
+        with np.errstate(all='ignore'):
+            return {
+                'max_height': np.where(valid, (v0 * v0 * sin_theta * sin_theta) / (2 * g), np.nan),
+                'time_of_flight': np.where(valid, (2 * v0 * sin_theta) / g, np.nan),
+                'range': np.where(valid, (v0 * v0 * np.sin(2 * theta_rad)) / g, np.nan),
+                'time_to_max_height': np.where(valid, (v0 * sin_theta) / g, np.nan)
+            }
+    
+    @staticmethod
+    def state(t, v0=0, theta=0, g=9.8, m=1.0):
+        """Position, velocity and energy of the projectile at time t
+        
+        Args:
+            t: Time since launch (s), scalar or array
+            v0: Launch speed (m/s)
+            theta: Launch angle (degrees)
+            g: Gravitational acceleration (m/s²)
+            m: Mass (kg), for the energies
+            
+        Returns:
+            Dictionary of values (arrays when t is an array)
+        """
+        t = np.asarray(t, dtype=float)
+        theta_rad = math.radians(theta)
+        vx = v0 * math.cos(theta_rad) + 0 * t
+        vy = v0 * math.sin(theta_rad) - g * t
+        y = v0 * math.sin(theta_rad) * t - 0.5 * g * t * t
+        kinetic = 0.5 * m * (vx * vx + vy * vy)
+        potential = m * g * y
+        return {
+            'x': vx * t,
+            'y': y,
+            'vx': vx,
+            'vy': vy,
+            'speed': np.hypot(vx, vy),
+            'kinetic_energy': kinetic,
+            'potential_energy': potential,
+            'total_energy': kinetic + potential
+        }
@@ -1,4 +1,5 @@
 """Work and Energy Module"""
+import numpy as np
 
 class WorkEnergy:
     @staticmethod
@@ -11,7 +12,7 @@ class WorkEnergy:
             results['work'] = work
         
         if mass > 0 and velocity > 0:
-            ke = 0.5 * mass * velocity * velocity
+            ke = mass * velocity * velocity / 2
             results['kinetic_energy'] = ke
         
         if mass > 0 and height > 0:
@@ -19,7 +20,7 @@ class WorkEnergy:
             results['potential_energy'] = pe
         
         if mass > 0 and velocity > 0 and height > 0:
-            ke = 0.5 * mass * velocity * velocity
+            ke = mass * velocity * velocity / 2
             pe = mass * g * height
             total_e = ke + pe
             results['kinetic_energy'] = ke
@@ -27,3 +28,26 @@ class WorkEnergy:
             results['total_energy'] = total_e
         
         return results
+    
+    @staticmethod
+    def calculate_work_energy_batch(force=0, distance=0, mass=0, velocity=0, height=0, g=9.8):
+        """Vectorized calculate_work_energy() over arrays of inputs
+        
+        Returns:
+            Dictionary of arrays; NaN marks rows where calculate_work_energy()
+            would not return that key
+        """
+        force, distance, mass, velocity, height, g = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (force, distance, mass, velocity, height, g))
+        )
+        has_ke = (mass > 0) & (velocity > 0)
+        has_pe = (mass > 0) & (height > 0)
+        ke = 0.5 * mass * velocity * velocity
+        pe = mass * g * height
+        
+        return {
+            'work': np.where((force > 0) & (distance > 0), force * distance, np.nan),
+            'kinetic_energy': np.where(has_ke, ke, np.nan),
+            'potential_energy': np.where(has_pe, pe, np.nan),
+            'total_energy': np.where(has_ke & has_pe, ke + pe, np.nan)
+        }
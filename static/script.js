@@ -64,8 +64,30 @@ window.addEventListener('load', () => {
     
     loadModule('home');
     loadHistory();
+    registerServiceWorker();
 });
 
+// ==================== OFFLINE SUPPORT ====================
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator)) {
+        return;
+    }
+    navigator.serviceWorker.register('/sw.js').catch((error) => {
+        console.error('Service worker registration failed:', error);
+    });
+    // Send calculations queued while offline (where Background Sync is missing)
+    const syncQueue = () => navigator.serviceWorker.ready.then((registration) => {
+        registration.active.postMessage('sync');
+    });
+    syncQueue();
+    window.addEventListener('online', syncQueue);
+    navigator.serviceWorker.addEventListener('message', (event) => {
+        if (event.data && event.data.type === 'history-synced') {
+            loadHistory();
+        }
+    });
+}
+
 // ==================== MODULE NAVIGATION ====================
 function loadModule(moduleName) {
     // Hide all modules
@@ -98,9 +120,8 @@ function loadModule(moduleName) {
 }
 
 // ==================== CALCULATION FUNCTIONS ====================
-async function calculate(module) {
+function readInputs(module) {
     let inputs = {};
-    let endpoint = '';
     
     switch(module) {
         case 'kinematics':
@@ -111,7 +132,6 @@ async function calculate(module) {
                 s: parseFloat(document.getElementById('kin_s').value) || 0,
                 v: parseFloat(document.getElementById('kin_v').value) || 0
             };
-            endpoint = '/api/kinematics';
             break;
         case 'newtons_law':
             inputs = {
@@ -119,7 +139,6 @@ async function calculate(module) {
                 m: parseFloat(document.getElementById('nl_m').value) || 0,
                 a: parseFloat(document.getElementById('nl_a').value) || 0
             };
-            endpoint = '/api/newtons_law';
             break;
         case 'pe_ke':
             inputs = {
@@ -128,7 +147,6 @@ async function calculate(module) {
                 v: parseFloat(document.getElementById('ek_v').value) || 0,
                 g: parseFloat(document.getElementById('ek_g').value) || 9.8
             };
-            endpoint = '/api/pe_ke';
             break;
         case 'freefall':
             inputs = {
@@ -137,7 +155,6 @@ async function calculate(module) {
                 t: parseFloat(document.getElementById('ff_t').value) || 0,
                 g: parseFloat(document.getElementById('ff_g').value) || 9.8
             };
-            endpoint = '/api/freefall';
             break;
         case 'work_energy':
             inputs = {
@@ -148,7 +165,6 @@ async function calculate(module) {
                 height: parseFloat(document.getElementById('we_height').value) || 0,
                 g: parseFloat(document.getElementById('we_g').value) || 9.8
             };
-            endpoint = '/api/work_energy';
             break;
         case 'momentum':
             inputs = {
@@ -157,7 +173,6 @@ async function calculate(module) {
                 m2: parseFloat(document.getElementById('mom_m2').value) || 0,
                 v2: parseFloat(document.getElementById('mom_v2').value) || 0
             };
-            endpoint = '/api/momentum';
             break;
         case 'electricity':
             // Check which tab is active
@@ -178,7 +193,6 @@ async function calculate(module) {
                     k: parseFloat(document.getElementById('elec_k').value) || 8.99e9
                 };
             }
-            endpoint = '/api/electricity';
             break;
         case 'vectors':
             // Check which tab is active
@@ -218,7 +232,6 @@ async function calculate(module) {
                     y2: parseFloat(document.getElementById('vec_angle_by').value) || 0
                 };
             }
-            endpoint = '/api/vectors';
             break;
         case 'projectile':
             inputs = {
@@ -226,7 +239,6 @@ async function calculate(module) {
                 theta: parseFloat(document.getElementById('proj_theta').value) || 0,
                 g: parseFloat(document.getElementById('proj_g').value) || 9.8
             };
-            endpoint = '/api/projectile';
             break;
         case 'circular':
             inputs = {
@@ -235,12 +247,25 @@ async function calculate(module) {
                 m: parseFloat(document.getElementById('circ_m').value) || 0,
                 g: parseFloat(document.getElementById('circ_g').value) || 9.8
             };
-            endpoint = '/api/circular';
             break;
     }
+    return inputs;
+}
+
+async function calculate(module) {
+    clearTimeout(liveTimers[module]);
+    const inputs = readInputs(module);
+    const request = beginRequest(module, false);
+    
+    // Show the result computed locally at once; the server still calculates
+    // it again to save it in the history and check the inputs for warnings
+    const local = calculateLocally(module, inputs);
+    if (local) {
+        displayResults(module, local, []);
+    }
     
     try {
-        const response = await fetch(endpoint, {
+        const response = await fetch(`/api/${module}`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -250,6 +275,21 @@ async function calculate(module) {
         
         const response_data = await response.json();
         
+        // The history is saved either way, but the display belongs to
+        // whatever the inputs say now
+        if (!isLatestRequest(module, request)) {
+            loadHistory();
+            return;
+        }
+        
+        if (response_data.queued) {
+            // Offline: the service worker saves it once the server is back
+            if (!local) {
+                alert('You are offline. The calculation will be saved when the connection returns.');
+            }
+            return;
+        }
+        
         // Extract data from new response format
         const results = response_data.success ? response_data.data : response_data;
         
@@ -258,30 +298,127 @@ async function calculate(module) {
             return;
         }
         
-        displayResults(module, results);
+        if (!local) {
+            displayResults(module, results, response_data.warnings || []);
+        } else if (response_data.warnings && response_data.warnings.length) {
+            showWarnings(module, response_data.warnings);
+        }
         loadHistory();
     } catch (error) {
         console.error('Error:', error);
-        alert('Calculation error: ' + error.message);
+        if (!local) {
+            alert('Calculation error: ' + error.message);
+        }
     }
 }
 
-function displayResults(module, results) {
-    // Map module names to result div prefixes
-    const prefixMap = {
-        'kinematics': 'kin',
-        'newtons_law': 'nl',
-        'pe_ke': 'ek',
-        'freefall': 'ff',
-        'work_energy': 'we',
-        'momentum': 'mom',
-        'electricity': 'elec',
-        'vectors': 'vec',
-        'projectile': 'proj',
-        'circular': 'circ'
-    };
-    
-    const modulePrefix = prefixMap[module];
+// ==================== LIVE RECALCULATION ====================
+// Results follow the inputs while they are typed. Local results are shown
+// at once; the server (for input warnings, or results the engine cannot
+// compute) is asked only once typing pauses, a newer request cancels the
+// one in flight, and answers to superseded requests are dropped.
+const LIVE_DELAY = 300;
+const liveTimers = {};
+const latestRequests = {};
+let requestCounter = 0;
+
+function beginRequest(module, cancellable) {
+    const previous = latestRequests[module];
+    if (previous && previous.controller) {
+        previous.controller.abort();
+    }
+    // Saves are never aborted: the server must still record them
+    const request = { id: ++requestCounter, controller: cancellable ? new AbortController() : null };
+    latestRequests[module] = request;
+    return request;
+}
+
+function isLatestRequest(module, request) {
+    return latestRequests[module] === request;
+}
+
+function recalculateLive(module) {
+    // Supersede any earlier preview now, so its answer cannot land on top
+    // of the result below while the new one is still waiting
+    const request = beginRequest(module, true);
+    const inputs = readInputs(module);
+    const local = calculateLocally(module, inputs);
+    if (local) {
+        displayResults(module, local, [], false);
+    }
+    clearTimeout(liveTimers[module]);
+    liveTimers[module] = setTimeout(
+        () => previewOnServer(module, inputs, local !== null, request), LIVE_DELAY
+    );
+}
+
+async function previewOnServer(module, inputs, shownLocally, request) {
+    // The engine version and then the keys in sorted order form the
+    // canonical URL, so no redirect is needed and repeated inputs are
+    // answered from the browser cache
+    const pairs = Object.keys(inputs).sort().map((key) => [key, inputs[key]]);
+    if (typeof PhysicsEngine !== 'undefined') {
+        pairs.unshift(['engine', PhysicsEngine.version]);
+    }
+    const query = new URLSearchParams(pairs);
+    try {
+        const response = await fetch(`/api/${module}?${query}`, {
+            // Previews are not saved to the history
+            headers: { 'X-Save-History': '0' },
+            signal: request.controller.signal
+        });
+        const response_data = await response.json();
+        if (!isLatestRequest(module, request) || !response_data.success) {
+            return;
+        }
+        if (!shownLocally) {
+            displayResults(module, response_data.data, response_data.warnings || [], false);
+        } else {
+            showWarnings(module, response_data.warnings || []);
+        }
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.error('Live preview failed:', error);
+        }
+    }
+}
+
+document.addEventListener('input', (event) => {
+    const view = event.target.closest('.module-view');
+    if (view && view.id in RESULT_PREFIXES) {
+        recalculateLive(view.id);
+    }
+});
+
+function calculateLocally(module, inputs) {
+    // Local results only when every input is usable; errors (e.g. a division
+    // by zero) are left to the server, which reports them
+    if (typeof PhysicsEngine === 'undefined' || !PhysicsEngine.has(module)) {
+        return null;
+    }
+    try {
+        return PhysicsEngine.calculate(module, inputs);
+    } catch (error) {
+        return null;
+    }
+}
+
+// Map module names to result div prefixes
+const RESULT_PREFIXES = {
+    'kinematics': 'kin',
+    'newtons_law': 'nl',
+    'pe_ke': 'ek',
+    'freefall': 'ff',
+    'work_energy': 'we',
+    'momentum': 'mom',
+    'electricity': 'elec',
+    'vectors': 'vec',
+    'projectile': 'proj',
+    'circular': 'circ'
+};
+
+function displayResults(module, results, warnings = [], animate = true) {
+    const modulePrefix = RESULT_PREFIXES[module];
     const resultsDiv = document.getElementById(`${modulePrefix}_results`);
     
     if (!resultsDiv) {
@@ -301,11 +438,22 @@ function displayResults(module, results) {
         }
     }
     resultsDiv.innerHTML = html;
+    showWarnings(module, warnings);
     resultsDiv.style.display = 'block';
     
     // Generate graphs based on module
     const inputs = getInputsForModule(module);
-    generateGraph(module, results, inputs);
+    generateGraph(module, results, inputs, animate);
+}
+
+function showWarnings(module, warnings) {
+    const resultsDiv = document.getElementById(`${RESULT_PREFIXES[module]}_results`);
+    if (!resultsDiv) {
+        return;
+    }
+    for (const warning of warnings) {
+        resultsDiv.insertAdjacentHTML('beforeend', `<div class="result-warning">${warning}</div>`);
+    }
 }
 
 function getInputsForModule(module) {
@@ -367,7 +515,7 @@ function getInputsForModule(module) {
     }
 }
 
-function generateGraph(module, results, inputs) {
+function generateGraph(module, results, inputs, animate = true) {
     // Map module names to graph div prefixes
     const prefixMap = {
         'kinematics': 'kin',
@@ -538,8 +686,108 @@ function generateGraph(module, results, inputs) {
     
     if (data.length > 0) {
         graphDiv.style.display = 'block';
-        Plotly.newPlot(graphDiv, data, layout, { responsive: true, displayModeBar: true });
+        loadPlotly().then(() => {
+            // react() updates the existing plot in place instead of rebuilding it
+            stopLiveSimulation();
+            Plotly.react(graphDiv, useWebGL(data), layout, { responsive: true, displayModeBar: true });
+            // The animation streams from the server, so it only runs for an
+            // explicit calculation, not on every keystroke
+            if (animate) {
+                startLiveSimulation(module, inputs, graphDiv);
+            }
+        }).catch(error => console.error('Error loading graphs:', error));
+    }
+}
+
+// SVG traces slow down noticeably beyond a few thousand points; larger
+// traces are drawn with WebGL instead. Series fetched from the API should
+// also pass max_points so the server sends no more than the plot can show.
+const WEBGL_THRESHOLD = 5000;
+
+function useWebGL(traces) {
+    return traces.map(trace => (trace.type === 'scatter' && trace.x && trace.x.length > WEBGL_THRESHOLD)
+        ? { ...trace, type: 'scattergl' }
+        : trace);
+}
+
+// Plotly is large and only needed for graphs, so it is fetched when the
+// first graph is drawn rather than with the page
+const PLOTLY_URL = 'https://cdn.jsdelivr.net/npm/plotly.js@2.26.0/dist/plotly.min.js';
+let plotlyLoading = null;
+
+function loadPlotly() {
+    if (window.Plotly) return Promise.resolve(window.Plotly);
+    if (!plotlyLoading) {
+        plotlyLoading = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = PLOTLY_URL;
+            script.async = true;
+            script.onload = () => resolve(window.Plotly);
+            script.onerror = () => {
+                plotlyLoading = null;
+                reject(new Error('Failed to load Plotly'));
+            };
+            document.head.appendChild(script);
+        });
+    }
+    return plotlyLoading;
+}
+
+// Live animation: the server streams frames as Server-Sent Events and a
+// marker follows the plotted path
+let liveStream = null;
+
+function stopLiveSimulation() {
+    if (liveStream) {
+        liveStream.close();
+        liveStream = null;
+    }
+}
+
+function startLiveSimulation(module, inputs, graphDiv) {
+    stopLiveSimulation();
+    
+    let params, duration, point;
+    switch(module) {
+        case 'projectile':
+            params = { v0: inputs.v0, theta: inputs.theta, g: inputs.g };
+            duration = (2 * inputs.v0 * Math.sin(inputs.theta * Math.PI / 180)) / inputs.g;
+            point = frame => [frame.x, frame.y];
+            break;
+        case 'circular':
+            params = { v: inputs.v, r: inputs.r };
+            duration = (2 * Math.PI * inputs.r) / inputs.v;
+            point = frame => [frame.x, frame.y];
+            break;
+        case 'freefall':
+            params = { h: inputs.v0 * inputs.t + 0.5 * inputs.g * inputs.t * inputs.t, v0: inputs.v0, g: inputs.g };
+            duration = inputs.t;
+            point = frame => [frame.t, frame.velocity];
+            break;
+        default:
+            return;
     }
+    if (!(duration > 0)) return;
+    
+    // Long simulations play faster so the animation takes at most ~5 s
+    params.speed = Math.max(1, duration / 5);
+    params.rate = 30;
+    
+    const markerIndex = graphDiv.data.length;
+    Plotly.addTraces(graphDiv, { x: [], y: [], name: 'Live', type: 'scatter', mode: 'markers', marker: { size: 12, color: '#ffeb3b' } });
+    
+    const stream = new EventSource(`/api/stream/${module}?${new URLSearchParams(params)}`);
+    liveStream = stream;
+    const stop = () => {
+        stream.close();
+        if (liveStream === stream) liveStream = null;
+    };
+    stream.addEventListener('frame', (event) => {
+        const [x, y] = point(JSON.parse(event.data));
+        Plotly.restyle(graphDiv, { x: [[x]], y: [[y]] }, [markerIndex]);
+    });
+    stream.addEventListener('end', stop);
+    stream.onerror = stop;
 }
 
 // Tab switching for modules with multiple calculation types
@@ -0,0 +1,174 @@
+// Service worker: keeps the app shell available offline and queues
+// calculations saved while offline until the server can be reached again.
+// Rendered by web_app.service_worker with the current asset URLs.
+const VERSION = {{ version|tojson }};
+const CACHE = `physics-lab-${VERSION}`;
+const SHELL = {{ shell|tojson }};
+// Calculation routes whose POSTs save history; queued when offline
+const QUEUED_ROUTES = {{ queued_routes|tojson }};
+// Third-party scripts (Plotly) kept after their first use
+const CDN_HOSTS = ['cdn.jsdelivr.net'];
+const SYNC_TAG = 'history-sync';
+const DB_NAME = 'physics-lab';
+const QUEUE_STORE = 'queued-calculations';
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(CACHE)
+            .then((cache) => cache.addAll(SHELL))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((keys) => Promise.all(
+                keys.filter((key) => key.startsWith('physics-lab-') && key !== CACHE)
+                    .map((key) => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+    const sameOrigin = url.origin === self.location.origin;
+
+    if (request.method === 'POST' && sameOrigin && QUEUED_ROUTES.includes(url.pathname)) {
+        event.respondWith(saveOrQueue(request));
+    } else if (request.method !== 'GET') {
+        return;
+    } else if (sameOrigin && url.pathname.startsWith('/assets/')) {
+        // Fingerprinted: a URL's content never changes
+        event.respondWith(cacheFirst(request));
+    } else if (!sameOrigin && CDN_HOSTS.includes(url.hostname)) {
+        event.respondWith(cacheFirst(request));
+    } else if (sameOrigin && (request.mode === 'navigate' || SHELL.includes(url.pathname)
+                              || url.pathname === '/api/history')) {
+        event.respondWith(networkFirst(request));
+    }
+});
+
+self.addEventListener('sync', (event) => {
+    if (event.tag === SYNC_TAG) {
+        event.waitUntil(replayQueue());
+    }
+});
+
+// Pages post 'sync' on load and when the browser comes back online, for
+// browsers without Background Sync
+self.addEventListener('message', (event) => {
+    if (event.data === 'sync') {
+        event.waitUntil(replayQueue());
+    }
+});
+
+// ==================== CACHING ====================
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    // Script tags load cross-origin files as opaque responses
+    if (response.ok || response.type === 'opaque') {
+        const cache = await caches.open(CACHE);
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function networkFirst(request) {
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            const cache = await caches.open(CACHE);
+            await cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await caches.match(request, { ignoreVary: true })
+            || (request.mode === 'navigate' && await caches.match('/'));
+        if (cached) {
+            return cached;
+        }
+        throw error;
+    }
+}
+
+// ==================== OFFLINE QUEUE ====================
+function openQueue() {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open(DB_NAME, 1);
+        open.onupgradeneeded = () => {
+            open.result.createObjectStore(QUEUE_STORE, { keyPath: 'id', autoIncrement: true });
+        };
+        open.onsuccess = () => resolve(open.result);
+        open.onerror = () => reject(open.error);
+    });
+}
+
+async function withQueue(mode, action) {
+    const db = await openQueue();
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(QUEUE_STORE, mode);
+        const request = action(transaction.objectStore(QUEUE_STORE));
+        transaction.oncomplete = () => resolve(request.result);
+        transaction.onerror = () => reject(transaction.error);
+    });
+}
+
+async function saveOrQueue(request) {
+    // Read the body first: fetch() consumes the request
+    const body = await request.clone().text();
+    try {
+        return await fetch(request);
+    } catch (error) {
+        await withQueue('readwrite', (store) => store.add({
+            url: request.url,
+            body: body,
+            queued_at: Date.now()
+        }));
+        if (self.registration.sync) {
+            self.registration.sync.register(SYNC_TAG).catch(() => {});
+        }
+        return new Response(JSON.stringify({ success: true, queued: true }), {
+            headers: { 'Content-Type': 'application/json' }
+        });
+    }
+}
+
+let replaying = null;
+
+function replayQueue() {
+    // One replay at a time, so no entry is sent twice
+    if (!replaying) {
+        replaying = sendQueued().finally(() => { replaying = null; });
+    }
+    return replaying;
+}
+
+async function sendQueued() {
+    const entries = await withQueue('readonly', (store) => store.getAll());
+    let sent = 0;
+    for (const entry of entries) {
+        try {
+            await fetch(entry.url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: entry.body
+            });
+        } catch (error) {
+            // Still offline: keep this and later entries, in order
+            break;
+        }
+        await withQueue('readwrite', (store) => store.delete(entry.id));
+        sent += 1;
+    }
+    if (sent > 0) {
+        const pages = await self.clients.matchAll();
+        pages.forEach((page) => page.postMessage({ type: 'history-synced', count: sent }));
+    }
+}
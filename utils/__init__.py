@@ -3,4 +3,4 @@ Utilities Package
 Helper functions for validation, history, and plotting
 """
 
-__all__ = ['validators', 'history', 'plotter', 'dialogs', 'unit_converter', 'tooltips', 'presets']
\ No newline at end of file
+__all__ = ['validators', 'history', 'plotter', 'dialogs', 'unit_converter', 'tooltips', 'presets', 'batch', 'units', 'bulk_upload', 'streaming', 'live_stream', 'jobs', 'parallel', 'jit', 'precision', 'singleflight', 'result_store', 'http_cache', 'serialization', 'assets', 'compression', 'client_engine', 'downsample', 'sweep_store', 'render', 'report']
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Static Asset Pipeline
+Minify and fingerprint the web UI's script and stylesheet, and write
+gzip/brotli variants next to them so the server never compresses them per
+request. The manifest maps each source name to its fingerprinted build.
+
+Usage:
+    python -m utils.assets          # build into static/dist/
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / 'static'
+DIST_DIR = STATIC_DIR / 'dist'
+MANIFEST_FILE = 'manifest.json'
+ASSETS = ('script.js', 'style.css')
+
+# Content-Encoding: file suffix, in order of preference
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# ==================== MINIFIERS ====================
+# Conservative: comments and indentation go, but line breaks are kept, so
+# JavaScript's automatic semicolon insertion behaves exactly as before.
+
+# Characters after which a '/' starts a regular expression, not a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield')
+
+
+def _regex_allowed(previous):
+    """Whether a '/' after this code (last significant text) opens a regex"""
+    if not previous or previous[-1] in _REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[A-Za-z_$]+$', previous)
+    return bool(word) and word.group() in _REGEX_KEYWORDS
+
+
+def _skip_string(source, index, quote):
+    """Index just past the string literal starting at source[index]"""
+    index += 1
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == quote:
+            return index + 1
+        if quote == '`' and source.startswith('${', index):
+            index = _skip_template_expression(source, index + 2)
+            continue
+        index += 1
+    raise ValueError("Unterminated string literal")
+
+
+def _skip_template_expression(source, index):
+    """Index just past the '}' closing a template literal's ${...}"""
+    depth = 1
+    while index < len(source):
+        char = source[index]
+        if char in '\'"`':
+            index = _skip_string(source, index, char)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    raise ValueError("Unterminated template literal")
+
+
+def _skip_regex(source, index):
+    """Index just past the regular expression literal at source[index]"""
+    index += 1
+    in_class = False
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '\n':
+            raise ValueError("Unterminated regular expression")
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            index += 1
+            while index < len(source) and source[index].isalpha():
+                index += 1
+            return index
+        index += 1
+    raise ValueError("Unterminated regular expression")
+
+
+def minify_js(source):
+    """
+    Remove comments, indentation and blank lines from JavaScript
+
+    String, template and regex literals are kept exactly as written, so a
+    multi-line template keeps its indentation and blank lines.
+
+    Raises:
+        ValueError: If a string, template or regex literal is unterminated
+    """
+    out = []
+    literals = []
+    previous = ''  # tail of the code so far, ignoring whitespace
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char in '\'"`':
+            end = _skip_string(source, index, char)
+            token = source[index:end]
+        elif source.startswith('//', index):
+            end = source.find('\n', index)
+            index = len(source) if end < 0 else end
+            continue
+        elif source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            if end < 0:
+                raise ValueError("Unterminated comment")
+            # A comment spanning lines still ends a statement
+            out.append('\n' if '\n' in source[index:end] else ' ')
+            index = end + 2
+            continue
+        elif char == '/' and _regex_allowed(previous):
+            end = _skip_regex(source, index)
+            token = source[index:end]
+        else:
+            end = index + 1
+            token = char
+        if token is char:
+            out.append(token)
+        else:
+            # Literals are set aside while the lines around them are trimmed
+            out.append(f'\0{len(literals)}\0')
+            literals.append(token)
+        if not token.isspace():
+            previous = (previous + token)[-16:]
+        index = end
+    lines = (line.strip() for line in ''.join(out).splitlines())
+    code = '\n'.join(line for line in lines if line) + '\n'
+    return re.sub(r'\0(\d+)\0', lambda match: literals[int(match.group(1))], code)
+
+
+def minify_css(source):
+    """Remove comments and redundant whitespace from CSS"""
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', source)
+    for index in range(0, len(parts), 2):
+        text = re.sub(r'/\*.*?\*/', '', parts[index], flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        # Spaces around these never matter (unlike ':' in "a :hover")
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        parts[index] = text.replace(';}', '}')
+    return ''.join(parts).strip() + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# ==================== BUILD ====================
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def build(static_dir=STATIC_DIR, dist_dir=None, assets=ASSETS):
+    """
+    Minify, fingerprint and precompress the assets
+
+    Args:
+        static_dir: Directory holding the source files
+        dist_dir: Output directory (default: static_dir/dist)
+        assets: Source file names
+
+    Returns:
+        dict: The manifest written to dist_dir/manifest.json: for each
+            source, its built file name, source hash and sizes
+    """
+    static_dir = Path(static_dir)
+    dist_dir = Path(dist_dir) if dist_dir else static_dir / 'dist'
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name in assets:
+        source = (static_dir / name).read_bytes()
+        stem, suffix = name.rsplit('.', 1)
+        minified = MINIFIERS['.' + suffix](source.decode('utf-8')).encode('utf-8')
+        built = f'{stem}.{_digest(minified)[:12]}.{suffix}'
+
+        # Remove earlier builds of this asset
+        for old in dist_dir.glob(f'{stem}.*.{suffix}*'):
+            if not old.name.startswith(built):
+                old.unlink()
+        (dist_dir / built).write_bytes(minified)
+        sizes = {'source': len(source), 'minified': len(minified)}
+        # mtime=0 keeps the .gz byte-identical between builds
+        compressed = {'gzip': gzip.compress(minified, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(minified, quality=11)
+        for encoding, data in compressed.items():
+            (dist_dir / (built + ENCODINGS[encoding])).write_bytes(data)
+            sizes[encoding] = len(data)
+        manifest[name] = {'file': built, 'source_hash': _digest(source), 'sizes': sizes}
+
+    with open(dist_dir / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# ==================== SERVING ====================
+
+def load_manifest(static_dir=STATIC_DIR, dist_dir=None):
+    """
+    Built file name for each asset whose build is up to date
+
+    Assets edited since the last build are left out, so the server falls
+    back to the source file rather than serving a stale build.
+
+    Returns:
+        dict: Source name: fingerprinted file name (empty without a build)
+    """
+    static_dir = Path(static_dir)
+    dist_dir = Path(dist_dir) if dist_dir else static_dir / 'dist'
+    try:
+        with open(dist_dir / MANIFEST_FILE, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    current = {}
+    for name, entry in manifest.items():
+        try:
+            fresh = _digest((static_dir / name).read_bytes()) == entry['source_hash']
+        except OSError:
+            # Source not deployed: the build is all there is
+            fresh = True
+        if fresh and (dist_dir / entry['file']).exists():
+            current[name] = entry['file']
+    return current
+
+
+def select_variant(dist_dir, filename, accept_encodings):
+    """
+    Pick the best precompressed variant of a built file
+
+    Args:
+        dist_dir: Directory of built files
+        filename: Fingerprinted file name
+        accept_encodings: request.accept_encodings
+
+    Returns:
+        tuple: (path to send, Content-Encoding or None)
+    """
+    path = Path(dist_dir) / filename
+    for encoding, suffix in ENCODINGS.items():
+        if accept_encodings[encoding] and path.with_name(path.name + suffix).exists():
+            return path.with_name(path.name + suffix), encoding
+    return path, None
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Build the web UI's static assets")
+    parser.add_argument('--static-dir', default=str(STATIC_DIR))
+    args = parser.parse_args(argv)
+
+    if brotli is None:
+        print("brotli not installed (pip install brotli); writing gzip variants only")
+    for name, entry in build(args.static_dir).items():
+        sizes = entry['sizes']
+        line = f"{name:>10} -> {entry['file']:<28} {sizes['source']:>7,} -> {sizes['minified']:>7,} bytes"
+        for encoding in ENCODINGS:
+            if encoding in sizes:
+                line += f"  {encoding} {sizes[encoding]:>6,}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
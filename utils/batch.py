@@ -0,0 +1,220 @@
+"""
+Batch Input Utilities
+Helpers for array-valued (batch) inputs and outputs of the web API
+"""
+
+import numpy as np
+
+from modules.kinematics import Kinematics
+from modules.newtons_law import NewtonsLaw
+from modules.pe_ke import PEandKE
+from modules.freefall_dynamics import FreefallDynamics
+from modules.work_energy import WorkEnergy
+from modules.momentum import Momentum
+from modules.electricity import Electricity
+from modules.projectile_motion import ProjectileMotion
+from modules.circular_motion import CircularMotion
+from utils.input_warnings import compile_rules
+
+
+# Vectorized module kernels: function, the scalar function it mirrors, input
+# defaults (the same as the web routes), history name and optional
+# (warning rule set, {rule field: input}).
+BATCH_MODULES = {
+    'kinematics': {
+        'function': Kinematics.calculate_batch,
+        'scalar': Kinematics.calculate,
+        'defaults': {'u': 0, 'a': 0, 't': 0, 's': 0, 'v': 0},
+        'name': 'Kinematics',
+        'warnings': ('kinematics', {'u': 'u', 'v': 'v', 'a': 'a', 't': 't', 's': 's'})
+    },
+    'newtons_law': {
+        'function': NewtonsLaw.calculate_batch,
+        'scalar': NewtonsLaw.calculate,
+        'defaults': {'f': 0, 'm': 0, 'a': 0},
+        'name': "Newton's Law"
+    },
+    'pe_ke': {
+        'function': PEandKE.calculate_batch,
+        'scalar': PEandKE.calculate,
+        'defaults': {'m': 0, 'h': 0, 'v': 0, 'g': 9.8},
+        'name': 'PE & KE',
+        'warnings': ('energy', {'m': 'm', 'v': 'v'})
+    },
+    'freefall': {
+        'function': FreefallDynamics.calculate_freefall_batch,
+        'scalar': FreefallDynamics.calculate_freefall,
+        'defaults': {'h': 0, 'v0': 0, 't': 0, 'g': 9.8},
+        'name': 'Freefall Dynamics'
+    },
+    'work_energy': {
+        'function': WorkEnergy.calculate_work_energy_batch,
+        'scalar': WorkEnergy.calculate_work_energy,
+        'defaults': {'force': 0, 'distance': 0, 'mass': 0, 'velocity': 0, 'height': 0, 'g': 9.8},
+        'name': 'Work and Energy'
+    },
+    'momentum': {
+        'function': Momentum.calculate_batch,
+        'scalar': Momentum.calculate,
+        'defaults': {'m1': 0, 'v1': 0, 'm2': 0, 'v2': 0},
+        'name': 'Momentum',
+        'warnings': ('momentum', {'m1': 'm1', 'v1': 'v1', 'm2': 'm2', 'v2': 'v2'})
+    },
+    'ohms_law': {
+        'function': Electricity.calculate_ohms_law_batch,
+        'scalar': Electricity.calculate_ohms_law,
+        'defaults': {'v': 0, 'i': 0, 'r': 0},
+        'name': 'Electricity',
+        'warnings': ('ohms_law', {'V': 'v', 'I': 'i', 'R': 'r'})
+    },
+    'coulombs_law': {
+        'function': Electricity.calculate_coulombs_law_batch,
+        'scalar': Electricity.calculate_coulombs_law,
+        'defaults': {'q1': 0, 'q2': 0, 'r': 1, 'k': 8.99e9},
+        'name': 'Electricity'
+    },
+    'projectile': {
+        'function': ProjectileMotion.calculate_batch,
+        'scalar': ProjectileMotion.calculate,
+        'defaults': {'v0': 0, 'theta': 0, 'g': 9.8},
+        'name': 'Projectile Motion'
+    },
+    'circular': {
+        'function': CircularMotion.calculate_batch,
+        'scalar': CircularMotion.calculate,
+        'defaults': {'v': 0, 'r': 0, 'm': 0, 'g': 9.8},
+        'name': 'Circular Motion'
+    },
+}
+
+
+def as_array(value, field_name="Value"):
+    """
+    Convert a scalar or list input to a float array
+
+    Args:
+        value: Number, numeric string or (nested) list of numbers
+        field_name: Name of the field for error messages
+
+    Returns:
+        ndarray: Float64 array (0-d for scalar inputs)
+
+    Raises:
+        ValueError: If the value cannot be parsed as numbers
+    """
+    try:
+        return np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field_name} must be a valid number or list of numbers!")
+
+
+def parse_batch(data, defaults):
+    """
+    Parse several batch fields and broadcast them to a common shape
+
+    Args:
+        data: Request dictionary
+        defaults: Dictionary of field_name: default_value pairs
+
+    Returns:
+        dict: Dictionary of field_name: ndarray pairs, all of the same shape
+
+    Raises:
+        ValueError: If a field is invalid or the shapes cannot be broadcast
+    """
+    arrays = {
+        name: as_array(data.get(name, default), name)
+        for name, default in defaults.items()
+    }
+    try:
+        broadcast = np.broadcast_arrays(*arrays.values())
+    except ValueError:
+        raise ValueError("Batch inputs must have matching lengths!")
+    return dict(zip(arrays.keys(), broadcast))
+
+
+def to_serializable(obj):
+    """
+    Recursively convert NumPy values to plain Python types for JSON
+
+    Args:
+        obj: Result object (dict, list, ndarray, NumPy scalar, ...)
+
+    Returns:
+        The same structure built from dicts, lists, floats and ints,
+        with NaN (an undefined result) replaced by None
+    """
+    if isinstance(obj, dict):
+        return {key: to_serializable(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_serializable(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f' and np.isnan(obj).any():
+            return np.where(np.isnan(obj), None, obj).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and obj != obj:
+        return None
+    return obj
+
+
+def get_batch_module(module):
+    """
+    Look up a vectorized module kernel
+    
+    Raises:
+        ValueError: If the module has no batch kernel
+    """
+    if module not in BATCH_MODULES:
+        raise ValueError(f"Unknown batch module: {module}")
+    return BATCH_MODULES[module]
+
+
+def check_inputs(module, names):
+    """
+    Reject input names a batch module does not take, so a misspelled
+    input fails instead of silently taking its default
+
+    Raises:
+        ValueError: If the module is unknown or a name is not one of its inputs
+    """
+    defaults = get_batch_module(module)['defaults']
+    for name in names:
+        if name not in defaults:
+            raise ValueError(f"Unknown input for {module}: {name} "
+                             f"(expected one of {', '.join(defaults)})")
+
+
+def run_batch(module, columns):
+    """
+    Evaluate a module over columns of inputs
+    
+    Args:
+        module: Key of BATCH_MODULES
+        columns: Dictionary of input name: array; missing inputs and NaN
+            entries take the module defaults
+        
+    Returns:
+        tuple: (dict of output arrays, uint32 warning bitmasks or None)
+    """
+    spec = get_batch_module(module)
+    inputs = {}
+    for name, default in spec['defaults'].items():
+        if name in columns:
+            values = np.asarray(columns[name], dtype=float)
+            inputs[name] = np.where(np.isnan(values), default, values)
+        else:
+            inputs[name] = default
+    results = spec['function'](**inputs)
+    
+    masks = None
+    if 'warnings' in spec:
+        rule_set, fields = spec['warnings']
+        # As in the web routes, zero means "not given"
+        rule_columns = {
+            field: np.where(inputs[name] == 0, np.nan, inputs[name])
+            for field, name in fields.items()
+        }
+        masks = compile_rules(rule_set).batch_masks(rule_columns)
+    return results, masks
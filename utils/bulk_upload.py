@@ -0,0 +1,259 @@
+"""
+Bulk Upload Pipeline
+Run a physics module over every row of a CSV or Parquet file, reading the
+input and writing the results in fixed-size chunks
+
+Usage:
+    python -m utils.bulk_upload rows.csv --module kinematics -o results.csv
+    python -m utils.bulk_upload rows.parquet --module ohms_law --output ndjson
+"""
+
+import argparse
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from utils.batch import BATCH_MODULES, get_batch_module, run_batch
+from utils.csv_stream import DEFAULT_CHUNK_SIZE, iter_csv_chunks, format_csv_rows
+from utils.input_warnings import compile_rules
+from utils.validators import parse_float_array
+
+INPUT_FORMATS = ('csv', 'parquet')
+OUTPUT_FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(filename, default='csv'):
+    """Guess the input format from a file name suffix"""
+    suffix = Path(filename or '').suffix.lower()
+    if suffix in ('.parquet', '.pq'):
+        return 'parquet'
+    if suffix == '.csv':
+        return 'csv'
+    return default
+
+
+def iter_csv_columns(text_stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a CSV stream as chunks of columns
+
+    Returns:
+        tuple: (header list, generator of {column: list of cell strings})
+    """
+    header, chunks = iter_csv_chunks(text_stream, chunk_size)
+
+    def generate():
+        for chunk in chunks:
+            yield {
+                name: [row[index] if index < len(row) else "" for row in chunk]
+                for index, name in enumerate(header)
+            }
+
+    return header, generate()
+
+
+def iter_parquet_columns(binary_stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a Parquet file as chunks of columns (requires pyarrow)
+
+    Args:
+        binary_stream: Seekable binary file object or path
+        chunk_size: Number of rows per chunk
+
+    Returns:
+        tuple: (header list, generator of {column: array})
+
+    Raises:
+        ValueError: If pyarrow is not installed or the file is not Parquet
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet upload requires pyarrow (pip install pyarrow)")
+    try:
+        parquet = pq.ParquetFile(binary_stream)
+    except Exception:
+        raise ValueError("File is not a valid Parquet file!")
+    header = list(parquet.schema_arrow.names)
+
+    def generate():
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield {
+                name: batch.column(index).to_numpy(zero_copy_only=False)
+                for index, name in enumerate(batch.schema.names)
+            }
+
+    return header, generate()
+
+
+def read_columns(binary_stream, file_format='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Open an uploaded file as chunks of columns
+
+    Args:
+        binary_stream: Binary file object (seekable for Parquet)
+        file_format: 'csv' or 'parquet'
+        chunk_size: Number of rows per chunk
+
+    Returns:
+        tuple: (header list, generator of {column: values})
+    """
+    if file_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format: {file_format}")
+    if int(chunk_size) <= 0:
+        raise ValueError("Chunk size must be positive!")
+    if file_format == 'parquet':
+        return iter_parquet_columns(binary_stream, int(chunk_size))
+    text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8', newline='')
+    return iter_csv_columns(text_stream, int(chunk_size))
+
+
+def _cell(value):
+    """CSV text for one value, blank for missing or NaN (undefined)"""
+    if value is None or value != value:
+        return ""
+    return str(value)
+
+
+def bulk_calculate(header, chunks, module, output='csv', stats=None):
+    """
+    Evaluate a module over chunks of input rows and format the results
+
+    Columns whose names match the module inputs (e.g. u, a, t for
+    kinematics) are parsed with the validators' rules: empty cells take the
+    module default and rows with an invalid value get an error instead of
+    outputs. Every other column is passed through untouched to CSV output.
+
+    Args:
+        header: Input column names
+        chunks: Iterable of {column: values} chunks
+        module: Key of utils.batch.BATCH_MODULES
+        output: 'csv' or 'ndjson'
+        stats: Optional dictionary that is filled with row, error and
+            warning counts as the stream is consumed
+
+    Yields:
+        str: Output text, one chunk of rows at a time (CSV starts with a header)
+
+    Raises:
+        ValueError: If the module, output format or columns are invalid
+            (before any output)
+    """
+    spec = get_batch_module(module)
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output}")
+    inputs = [name for name in spec['defaults'] if name in header]
+    if not inputs:
+        expected = ", ".join(spec['defaults'])
+        raise ValueError(f"No input columns for {module}! Expected some of: {expected}")
+
+    # Output columns are fixed by the kernel, so probe it once with defaults
+    outputs = list(run_batch(module, {})[0])
+    rules = compile_rules(spec['warnings'][0]) if 'warnings' in spec else None
+
+    if stats is None:
+        stats = {}
+    stats.update({'module': module, 'inputs': inputs, 'rows': 0,
+                  'error_rows': 0, 'warning_rows': 0, 'chunks': 0})
+
+    def generate():
+        if output == 'csv':
+            # Results that share a name with an input column are suffixed
+            names = [f"{name} (result)" if name in header else name for name in outputs]
+            yield format_csv_rows([header + names + ['warnings', 'error']])
+
+        messages = {0: []}
+        for chunk in chunks:
+            columns = {}
+            bad = []
+            for name in inputs:
+                columns[name], errors = parse_float_array(chunk[name], allow_empty=True)
+                bad.append(errors)
+            errors = np.logical_or.reduce(bad)
+
+            with np.errstate(all='ignore'):
+                results, masks = run_batch(module, columns)
+            size = len(errors)
+            values = {
+                name: np.where(errors, np.nan, np.broadcast_to(results[name], (size,))).tolist()
+                for name in outputs
+            }
+            masks = np.zeros(size, dtype=np.uint32) if masks is None else np.where(errors, 0, masks)
+            masks = np.broadcast_to(masks, (size,)).tolist()
+
+            lines = []
+            for row in range(size):
+                mask = masks[row]
+                if mask not in messages:
+                    messages[mask] = rules.messages(mask)
+                error = None
+                if errors[row]:
+                    invalid = [name for name, column in zip(inputs, bad) if column[row]]
+                    error = f"Invalid value for: {', '.join(invalid)}"
+
+                if output == 'csv':
+                    lines.append(
+                        [_cell(chunk[name][row]) for name in header]
+                        + [_cell(values[name][row]) for name in outputs]
+                        + ["; ".join(messages[mask]), error or ""]
+                    )
+                else:
+                    lines.append(json.dumps({
+                        'row': stats['rows'] + row + 1,
+                        'inputs': {name: columns[name][row] for name in inputs
+                                   if columns[name][row] == columns[name][row]},
+                        'outputs': {name: values[name][row] for name in outputs
+                                    if values[name][row] == values[name][row]},
+                        'warnings': messages[mask],
+                        'error': error
+                    }))
+
+            stats['rows'] += size
+            stats['error_rows'] += int(errors.sum())
+            stats['warning_rows'] += int(np.count_nonzero(masks))
+            stats['chunks'] += 1
+            if output == 'csv':
+                yield format_csv_rows(lines)
+            elif lines:
+                yield "\n".join(lines) + "\n"
+
+    return generate()
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Run a physics module over every row of a CSV or Parquet file"
+    )
+    parser.add_argument('input', help="Input .csv or .parquet file ('-' for CSV on stdin)")
+    parser.add_argument('--module', required=True, choices=sorted(BATCH_MODULES))
+    parser.add_argument('--format', choices=INPUT_FORMATS,
+                        help="Input format (default: from the file suffix)")
+    parser.add_argument('--output', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('-o', '--out', help="Output file (default: stdout)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    file_format = args.format or detect_format(args.input)
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    target = open(args.out, 'w', newline='') if args.out else sys.stdout
+    stats = {}
+    try:
+        header, chunks = read_columns(source, file_format, args.chunk_size)
+        for text in bulk_calculate(header, chunks, args.module, args.output, stats):
+            target.write(text)
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+    finally:
+        if args.out:
+            target.close()
+        if source is not sys.stdin.buffer:
+            source.close()
+    print(f"{stats['rows']} rows, {stats['error_rows']} with errors, "
+          f"{stats['warning_rows']} with warnings", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+"""
+Client-Side Calculation Engine
+Translate the scalar formulas in modules/ into a JavaScript engine, so the
+web UI can show results without waiting for the server. The Python methods
+stay the single definition: the JavaScript is generated from their source
+each time the server starts, and the server still computes (and stores) the
+authoritative result.
+
+Usage:
+    python -m utils.client_engine            # print the engine
+    python -m utils.client_engine -o engine.js
+"""
+
+import argparse
+import ast
+import functools
+import hashlib
+import inspect
+import json
+import sys
+import textwrap
+
+from modules.kinematics import Kinematics
+from modules.newtons_law import NewtonsLaw
+from modules.pe_ke import PEandKE
+from modules.freefall_dynamics import FreefallDynamics
+from modules.work_energy import WorkEnergy
+from modules.momentum import Momentum
+from modules.electricity import Electricity
+from modules.vectors import Vectors
+from modules.projectile_motion import ProjectileMotion
+from modules.circular_motion import CircularMotion
+from utils.http_cache import ENGINE_VERSION
+
+# Route: {calculation type: (method, parameters)}. Routes with one method use
+# the type None; otherwise inputs['type'] picks the method, defaulting to the
+# first. Parameters are the inputs each route passes to the method.
+ROUTES = {
+    'kinematics': {None: (Kinematics.calculate, ('u', 'a', 't', 's', 'v'))},
+    'newtons_law': {None: (NewtonsLaw.calculate, ('f', 'm', 'a'))},
+    'pe_ke': {None: (PEandKE.calculate, ('m', 'h', 'v', 'g'))},
+    'freefall': {None: (FreefallDynamics.calculate_freefall, ('h', 'v0', 't', 'g'))},
+    'work_energy': {None: (WorkEnergy.calculate_work_energy,
+                           ('force', 'distance', 'mass', 'velocity', 'height', 'g'))},
+    'momentum': {None: (Momentum.calculate, ('m1', 'v1', 'm2', 'v2'))},
+    'electricity': {
+        'ohms': (Electricity.calculate_ohms_law, ('v', 'i', 'r')),
+        'coulombs': (Electricity.calculate_coulombs_law, ('q1', 'q2', 'r')),
+    },
+    'vectors': {
+        'magnitude': (Vectors.calculate_vector_magnitude, ('x', 'y', 'z')),
+        'addition': (Vectors.calculate_vector_addition, ('x1', 'y1', 'x2', 'y2')),
+        'dot': (Vectors.calculate_dot_product, ('x1', 'y1', 'x2', 'y2')),
+        'angle': (Vectors.calculate_angle_between, ('x1', 'y1', 'x2', 'y2')),
+    },
+    'projectile': {None: (ProjectileMotion.calculate, ('v0', 'theta', 'g'))},
+    'circular': {None: (CircularMotion.calculate, ('v', 'r', 'm', 'g'))},
+}
+
+# Python calls and constants: their JavaScript equivalent (py.* are the
+# helpers in RUNTIME, which raise where Python raises)
+CALLS = {
+    'math.sqrt': 'py.sqrt', 'math.sin': 'py.sin', 'math.cos': 'py.cos', 'math.tan': 'py.tan',
+    'math.asin': 'py.asin', 'math.acos': 'py.acos', 'math.atan': 'Math.atan',
+    'math.atan2': 'Math.atan2', 'math.exp': 'Math.exp', 'math.log': 'py.log',
+    'math.log10': 'py.log10', 'math.radians': 'py.radians', 'math.degrees': 'py.degrees',
+    'abs': 'Math.abs', 'max': 'py.max', 'min': 'py.min',
+}
+CONSTANTS = {'math.pi': 'Math.PI', 'math.e': 'Math.E'}
+BINARY_OPERATORS = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*'}
+COMPARISONS = {ast.Eq: '===', ast.NotEq: '!==', ast.Lt: '<', ast.LtE: '<=',
+               ast.Gt: '>', ast.GtE: '>='}
+# Python names that cannot be JavaScript identifiers (or would hide py.*)
+RESERVED = {'arguments', 'case', 'catch', 'const', 'default', 'delete', 'eval', 'function',
+            'let', 'new', 'null', 'py', 'switch', 'this', 'typeof', 'var', 'void'}
+
+# Helpers giving JavaScript Python's float semantics where they differ
+RUNTIME = r"""
+    const py = {
+        div(a, b) {
+            if (b === 0) throw new Error('float division by zero');
+            return a / b;
+        },
+        pow(a, b) {
+            if (a === 0 && b < 0) throw new Error('0.0 cannot be raised to a negative power');
+            if (a < 0 && !Number.isInteger(b)) throw new Error('math domain error');
+            const result = a ** b;
+            if (!Number.isFinite(result) && Number.isFinite(a) && Number.isFinite(b)) {
+                throw new Error('Numerical result out of range');
+            }
+            return result;
+        },
+        domain(ok, value) {
+            if (!ok) throw new Error('math domain error');
+            return value;
+        },
+        sqrt: x => py.domain(!(x < 0), Math.sqrt(x)),
+        sin: x => py.domain(Number.isFinite(x) || Number.isNaN(x), Math.sin(x)),
+        cos: x => py.domain(Number.isFinite(x) || Number.isNaN(x), Math.cos(x)),
+        tan: x => py.domain(Number.isFinite(x) || Number.isNaN(x), Math.tan(x)),
+        asin: x => py.domain(!(Math.abs(x) > 1), Math.asin(x)),
+        acos: x => py.domain(!(Math.abs(x) > 1), Math.acos(x)),
+        log: x => py.domain(!(x <= 0), Math.log(x)),
+        log10: x => py.domain(!(x <= 0), Math.log10(x)),
+        radians: x => x * (Math.PI / 180),
+        degrees: x => x * (180 / Math.PI),
+        // Python's max/min compare with > and <, so NaN does not spread
+        max: (...values) => values.reduce((best, value) => (value > best ? value : best)),
+        min: (...values) => values.reduce((best, value) => (value < best ? value : best)),
+        truthy: x => (typeof x === 'number' ? x !== 0 : Boolean(x)),
+        float(value) {
+            if (typeof value === 'number') return value;
+            if (typeof value === 'boolean') return Number(value);
+            if (typeof value === 'string') {
+                const text = value.trim().toLowerCase().replace(/_/g, '');
+                if (/^[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?$/.test(text)) return Number(text);
+                if (/^[+-]?(inf|infinity)$/.test(text)) return text[0] === '-' ? -Infinity : Infinity;
+                if (/^[+-]?nan$/.test(text)) return NaN;
+                throw new Error(`could not convert string to float: '${value}'`);
+            }
+            throw new Error('float() argument must be a string or a real number');
+        }
+    };
+"""
+
+# Exposes PhysicsEngine.calculate(route, inputs) globally (window or worker)
+INTERFACE = r"""
+    function calculate(route, inputs) {
+        const cases = ROUTES[route];
+        if (!cases) throw new Error(`No local formula for ${route}`);
+        const type = '' in cases ? '' : ('type' in inputs ? inputs.type : Object.keys(cases)[0]);
+        if (!(type in cases)) return {};
+        const [formula, defaults] = cases[type];
+        const args = Object.entries(defaults).map(
+            ([name, fallback]) => py.float(name in inputs ? inputs[name] : fallback)
+        );
+        return formula(...args);
+    }
+
+    root.PhysicsEngine = {
+        version: VERSION,
+        routes: Object.keys(ROUTES),
+        has: route => route in ROUTES,
+        calculate
+    };
+"""
+
+
+class _Translator:
+    """Python AST of one formula method -> JavaScript function source"""
+
+    def __init__(self, function):
+        self.name = function.__qualname__.replace('.', '_')
+        self.qualname = function.__qualname__
+        tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+        self.node = tree.body[0]
+
+    def error(self, node, what=None):
+        what = what or type(node).__name__
+        return ValueError(f"{self.qualname} line {getattr(node, 'lineno', '?')}: "
+                          f"{what} has no JavaScript translation")
+
+    def name_of(self, identifier):
+        return identifier + '_' if identifier in RESERVED else identifier
+
+    def function(self):
+        node = self.node
+        parameters = [self.name_of(arg.arg) for arg in node.args.args]
+        defaults = [None] * (len(parameters) - len(node.args.defaults)) + node.args.defaults
+        signature = ', '.join(p if d is None else f'{p} = {self.expression(d)}'
+                              for p, d in zip(parameters, defaults))
+        # Python locals are function-scoped: declare them all up front
+        assigned = []
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                name = self.name_of(child.id)
+                if name not in parameters and name not in assigned:
+                    assigned.append(name)
+        lines = [f'function {self.name}({signature}) {{']
+        if assigned:
+            lines.append(f"    let {', '.join(assigned)};")
+        lines.extend(self.block(node.body, 1))
+        lines.append('}')
+        return '\n'.join(lines)
+
+    def block(self, statements, depth):
+        lines = []
+        for statement in statements:
+            lines.extend(self.statement(statement, depth))
+        return lines
+
+    def statement(self, node, depth):
+        pad = '    ' * depth
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            return []  # docstring
+        if isinstance(node, ast.Pass):
+            return []
+        if isinstance(node, ast.Assign):
+            targets = ' = '.join(self.expression(target) for target in node.targets)
+            return [f'{pad}{targets} = {self.expression(node.value)};']
+        if isinstance(node, ast.AugAssign) and type(node.op) in BINARY_OPERATORS:
+            operator = BINARY_OPERATORS[type(node.op)]
+            return [f'{pad}{self.expression(node.target)} {operator}= {self.expression(node.value)};']
+        if isinstance(node, ast.Return):
+            value = 'undefined' if node.value is None else self.expression(node.value)
+            return [f'{pad}return {value};']
+        if isinstance(node, ast.Raise):
+            if (isinstance(node.exc, ast.Call) and node.exc.args
+                    and isinstance(node.exc.args[0], ast.Constant)):
+                return [f'{pad}throw new Error({json.dumps(node.exc.args[0].value)});']
+            raise self.error(node, 'raise without a constant message')
+        if isinstance(node, ast.If):
+            lines = [f'{pad}if ({self.test(node.test)}) {{']
+            lines.extend(self.block(node.body, depth + 1))
+            orelse = node.orelse
+            # elif chains become else if
+            while len(orelse) == 1 and isinstance(orelse[0], ast.If):
+                lines.append(f'{pad}}} else if ({self.test(orelse[0].test)}) {{')
+                lines.extend(self.block(orelse[0].body, depth + 1))
+                orelse = orelse[0].orelse
+            if orelse:
+                lines.append(f'{pad}}} else {{')
+                lines.extend(self.block(orelse, depth + 1))
+            lines.append(f'{pad}}}')
+            return lines
+        raise self.error(node)
+
+    def is_boolean(self, node):
+        return (isinstance(node, (ast.Compare, ast.BoolOp))
+                or (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not))
+                or (isinstance(node, ast.Constant) and isinstance(node.value, bool)))
+
+    def test(self, node):
+        """Condition with Python truthiness (NaN is true, 0 is false)"""
+        text = self.expression(node)
+        return text if self.is_boolean(node) else f'py.truthy({text})'
+
+    def dotted(self, node):
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return f'{self.dotted(node.value)}.{node.attr}'
+        return None
+
+    def expression(self, node):
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool):
+                return 'true' if node.value else 'false'
+            if node.value is None:
+                return 'null'
+            if isinstance(node.value, (int, float, str)):
+                return json.dumps(node.value) if isinstance(node.value, str) else repr(node.value)
+            raise self.error(node, repr(node.value))
+        if isinstance(node, ast.Name):
+            return self.name_of(node.id)
+        if isinstance(node, ast.Attribute):
+            dotted = self.dotted(node)
+            if dotted in CONSTANTS:
+                return CONSTANTS[dotted]
+            raise self.error(node, dotted)
+        if isinstance(node, ast.Subscript):
+            return f'{self.expression(node.value)}[{self.expression(node.slice)}]'
+        if isinstance(node, ast.Dict):
+            items = ', '.join(f'{self.expression(k)}: {self.expression(v)}'
+                              for k, v in zip(node.keys, node.values))
+            return f'{{{items}}}'
+        if isinstance(node, ast.BinOp):
+            left, right = self.expression(node.left), self.expression(node.right)
+            if isinstance(node.op, ast.Div):
+                return f'py.div({left}, {right})'
+            if isinstance(node.op, ast.Pow):
+                return f'py.pow({left}, {right})'
+            if type(node.op) in BINARY_OPERATORS:
+                return f'({left} {BINARY_OPERATORS[type(node.op)]} {right})'
+            raise self.error(node, type(node.op).__name__)
+        if isinstance(node, ast.UnaryOp):
+            if isinstance(node.op, ast.USub):
+                return f'(-{self.expression(node.operand)})'
+            if isinstance(node.op, ast.UAdd):
+                return self.expression(node.operand)
+            if isinstance(node.op, ast.Not):
+                return f'(!{self.test(node.operand)})'
+            raise self.error(node, type(node.op).__name__)
+        if isinstance(node, ast.BoolOp):
+            if all(self.is_boolean(value) for value in node.values):
+                operator = ' && ' if isinstance(node.op, ast.And) else ' || '
+                return '(' + operator.join(self.expression(v) for v in node.values) + ')'
+            # Python returns the deciding operand, not a boolean
+            text = self.expression(node.values[-1])
+            for value in reversed(node.values[:-1]):
+                operand = self.expression(value)
+                if isinstance(node.op, ast.And):
+                    text = f'(py.truthy({operand}) ? {text} : {operand})'
+                else:
+                    text = f'(py.truthy({operand}) ? {operand} : {text})'
+            return text
+        if isinstance(node, ast.Compare):
+            parts = []
+            left = node.left
+            for operator, right in zip(node.ops, node.comparators):
+                if type(operator) not in COMPARISONS:
+                    raise self.error(node, type(operator).__name__)
+                parts.append(f'{self.expression(left)} {COMPARISONS[type(operator)]} '
+                             f'{self.expression(right)}')
+                left = right
+            return '(' + ' && '.join(parts) + ')'
+        if isinstance(node, ast.IfExp):
+            return (f'({self.test(node.test)} ? {self.expression(node.body)} '
+                    f': {self.expression(node.orelse)})')
+        if isinstance(node, ast.Call):
+            dotted = self.dotted(node.func)
+            if dotted not in CALLS or node.keywords:
+                raise self.error(node, f'call to {dotted}')
+            arguments = ', '.join(self.expression(arg) for arg in node.args)
+            return f'{CALLS[dotted]}({arguments})'
+        raise self.error(node)
+
+
+def translate(function):
+    """
+    JavaScript source of a formula method
+
+    Raises:
+        ValueError: If the method uses Python the translator does not handle
+    """
+    return _Translator(function).function()
+
+
+def _defaults(function, parameters):
+    """Each parameter's default, as the route reads it: float(data.get(name, default))"""
+    signature = inspect.signature(function)
+    return {name: signature.parameters[name].default for name in parameters}
+
+
+def translate_routes(routes=ROUTES):
+    """
+    Translate the formulas of every route
+
+    Returns:
+        tuple: (dict of function name: JavaScript source, dict of route:
+            JavaScript case table, dict of skipped route: reason). Routes
+            with a method that cannot be translated are skipped, and the
+            UI sends them to the server.
+    """
+    functions, tables, skipped = {}, {}, {}
+    for route, cases in routes.items():
+        try:
+            table = {}
+            for calc_type, (function, parameters) in cases.items():
+                name = function.__qualname__.replace('.', '_')
+                if name not in functions:
+                    functions[name] = translate(function)
+                table['' if calc_type is None else calc_type] = (name, _defaults(function, parameters))
+            tables[route] = table
+        except ValueError as e:
+            skipped[route] = str(e)
+    return functions, tables, skipped
+
+
+@functools.lru_cache(maxsize=None)
+def build_engine():
+    """
+    The engine script served to the browser
+
+    Returns:
+        tuple: (JavaScript source, SHA-256 hex digest of it)
+    """
+    functions, tables, skipped = translate_routes()
+    lines = [
+        '// Generated by utils/client_engine.py from the formulas in modules/.',
+        '// Do not edit: change the Python method and the engine follows.',
+        '(function (root) {',
+        "    'use strict';",
+        f'    const VERSION = {json.dumps(ENGINE_VERSION)};',
+        RUNTIME.rstrip(),
+        '',
+    ]
+    for source in functions.values():
+        lines.append(textwrap.indent(source, '    '))
+        lines.append('')
+    lines.append('    const ROUTES = {')
+    for route, table in tables.items():
+        cases = ', '.join(f'{json.dumps(calc_type)}: [{name}, {json.dumps(defaults)}]'
+                          for calc_type, (name, defaults) in table.items())
+        lines.append(f'        {json.dumps(route)}: {{{cases}}},')
+    lines.append('    };')
+    for route, reason in skipped.items():
+        lines.append(f'    // {route} is calculated on the server: {reason}')
+    lines.append(INTERFACE.rstrip())
+    lines.append('})(globalThis);')
+    source = '\n'.join(lines) + '\n'
+    return source, hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Generate the client-side calculation engine")
+    parser.add_argument('-o', '--output', help="File to write (default: standard output)")
+    args = parser.parse_args(argv)
+
+    _, _, skipped = translate_routes()
+    for route, reason in skipped.items():
+        print(f"skipped {route}: {reason}", file=sys.stderr)
+    source, _ = build_engine()
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""
+Response Compression
+Compress responses with the best encoding the client accepts (zstd, brotli
+or gzip). Whole bodies below a size threshold are sent as they are, and
+streamed responses are compressed chunk by chunk as they are generated.
+
+Usage:
+    python -m utils.compression --benchmark
+"""
+
+import argparse
+import gzip
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Server preference when the client accepts several equally
+ENCODINGS = ('zstd', 'br', 'gzip')
+# Levels that suit per-request compression: most of the size reduction
+# at a fraction of the maximum levels' cost
+LEVELS = {'zstd': 3, 'br': 4, 'gzip': 4}
+
+# Bodies smaller than about one network packet gain nothing from compression
+MIN_SIZE = 1400
+
+# Server-sent events are left alone: each event must reach the client at
+# once, and single events are too small to compress
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/msgpack',
+    'application/x-msgpack',
+    'application/vnd.physics-lab.arrays',
+    'application/javascript',
+    'image/svg+xml',
+    'text/csv',
+    'text/css',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+}
+
+
+def available_encodings():
+    """Encodings that can be produced with the installed packages"""
+    installed = {'zstd': zstandard is not None, 'br': brotli is not None, 'gzip': True}
+    return [name for name in ENCODINGS if installed[name]]
+
+
+def negotiate(accept_encodings):
+    """
+    Pick a content coding from the Accept-Encoding header
+
+    Args:
+        accept_encodings: request.accept_encodings
+
+    Returns:
+        str: 'zstd', 'br' or 'gzip', or None to send the body uncompressed
+    """
+    return accept_encodings.best_match(available_encodings(), default=None)
+
+
+def compress(data, encoding):
+    """
+    Compress a whole body
+
+    Raises:
+        ValueError: If the encoding is unknown or its package is not installed
+    """
+    if encoding not in available_encodings():
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=LEVELS['zstd']).compress(data)
+    if encoding == 'br':
+        return brotli.compress(data, quality=LEVELS['br'])
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(data, compresslevel=LEVELS['gzip'], mtime=0)
+
+
+class StreamCompressor:
+    """
+    Incremental compressor for one streamed body
+
+    Everything passed to compress() with flush=True can be decompressed
+    by the client as soon as it arrives; the compression state is kept
+    between chunks, so later chunks still refer back to earlier ones.
+    """
+
+    def __init__(self, encoding):
+        if encoding not in available_encodings():
+            raise ValueError(f"Unsupported encoding: {encoding}")
+        self.encoding = encoding
+        if encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=LEVELS['zstd']).compressobj()
+        elif encoding == 'br':
+            self._compressor = brotli.Compressor(quality=LEVELS['br'])
+        else:
+            self._compressor = zlib.compressobj(LEVELS['gzip'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data, flush=True):
+        """
+        Compress the next chunk
+
+        Args:
+            data: Bytes to compress
+            flush: Emit everything compressed so far instead of letting
+                the compressor buffer it
+
+        Returns:
+            bytes: Compressed output (may be empty when not flushing)
+        """
+        if self.encoding == 'br':
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        if not flush:
+            return out
+        if self.encoding == 'zstd':
+            return out + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        """End the stream; returns the remaining compressed bytes"""
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress_stream(chunks, encoding, flush=True):
+    """
+    Compress an iterable of str or bytes chunks as they are produced
+
+    Args:
+        chunks: Response body iterable (a generator, a file wrapper, ...)
+        encoding: 'zstd', 'br' or 'gzip'
+        flush: Flush after every chunk so each one reaches the client as
+            soon as it is generated (not needed for files)
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    compressor = StreamCompressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = compressor.compress(chunk, flush)
+            if out:
+                yield out
+        yield compressor.finish()
+    finally:
+        # Let the wrapped body clean up (close files, end the request context)
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response, accept_encodings, min_size=MIN_SIZE):
+    """
+    Compress a response in place when the client and the content allow it
+
+    Responses are left unchanged when they are not 200 OK, are already
+    encoded (e.g. precompressed assets), are of a type that does not
+    compress well (images, server-sent events) or carry Cache-Control:
+    no-transform. Whole bodies under min_size are also left unchanged;
+    streamed bodies are always compressed, as their size is not known
+    in advance.
+
+    Args:
+        response: Flask/Werkzeug response
+        accept_encodings: request.accept_encodings
+        min_size: Smallest whole body worth compressing, in bytes
+
+    Returns:
+        The same response
+    """
+    if (response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    if response.is_streamed:
+        encoding = negotiate(accept_encodings)
+        if encoding is not None:
+            # Files (send_file) are read in blocks and need no flushing
+            flush = not response.direct_passthrough
+            response.response = compress_stream(response.response, encoding, flush)
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+            # Byte ranges would refer to the uncompressed file
+            response.headers.pop('Accept-Ranges', None)
+    else:
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        encoding = negotiate(accept_encodings)
+        if encoding is not None:
+            response.set_data(compress(body, encoding))
+
+    response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ from the uncompressed ones, so a strong
+        # tag would be wrong; weak comparison still matches If-None-Match
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+    return response
+
+
+# ==================== BENCHMARK ====================
+
+def _payload(rows):
+    """A projectile sweep encoded as JSON, like /api/sweep returns it"""
+    import numpy as np
+
+    from modules.projectile_motion import ProjectileMotion
+    from utils.serialization import encode_json
+
+    theta = np.linspace(0, 90, rows)
+    data = dict(ProjectileMotion.calculate_batch(v0=20.0, theta=theta), theta=theta)
+    return encode_json({'success': True, 'data': data})
+
+
+def benchmark(rows=100000, repeat=3):
+    """
+    Time each available encoding on a sweep response
+
+    Returns:
+        dict: {encoding: {'seconds': best of repeat, 'bytes': size}},
+            including 'identity' for the uncompressed body
+    """
+    body = _payload(rows)
+    report = {'identity': {'seconds': 0.0, 'bytes': len(body)}}
+    for encoding in available_encodings():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            out = compress(body, encoding)
+            best = min(best, time.perf_counter() - start)
+        report[encoding] = {'seconds': best, 'bytes': len(out)}
+    return report
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Response compression")
+    parser.add_argument('--benchmark', action='store_true', help="Compare the encodings")
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"Encodings: {', '.join(available_encodings())} "
+          f"(bodies under {MIN_SIZE} bytes are sent uncompressed)")
+    if args.benchmark:
+        for encoding, result in benchmark(args.rows).items():
+            print(f"  {encoding:>8} {result['seconds'] * 1000:10.3f} ms {result['bytes']:>12,} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+CSV Streaming Utilities
+Read and write large CSV files in fixed-size chunks of rows
+"""
+
+import csv
+import io
+
+from utils.units import convert_array
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def iter_csv_chunks(text_stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a CSV stream as a header followed by chunks of rows
+    
+    Args:
+        text_stream: File-like object or iterable of text lines
+        chunk_size: Number of rows per chunk
+        
+    Returns:
+        tuple: (header list, generator of row-list chunks)
+        
+    Raises:
+        ValueError: If the stream is empty
+    """
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("CSV file is empty!")
+    header = [name.strip() for name in header]
+    
+    def chunks():
+        chunk = []
+        for row in reader:
+            if not row:
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    return header, chunks()
+
+
+def format_csv_rows(rows):
+    """Format a list of rows as CSV text"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def column_index(header, column):
+    """
+    Find a column by name or zero-based index
+    
+    Raises:
+        ValueError: If the column does not exist
+    """
+    if column in header:
+        return header.index(column)
+    try:
+        index = int(column)
+    except (TypeError, ValueError):
+        raise ValueError(f"Unknown column: {column}")
+    if not 0 <= index < len(header):
+        raise ValueError(f"Unknown column: {column}")
+    return index
+
+
+def convert_csv(text_stream, column, from_unit, to_unit, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a CSV file, converting one column between units
+    
+    Each output row is the input row plus the converted value and an error
+    flag (1 for rows whose value could not be parsed). Only one chunk of rows
+    is held in memory at a time.
+    
+    Args:
+        text_stream: File-like object or iterable of CSV text lines
+        column: Column name or zero-based index to convert
+        from_unit: Unit of the column
+        to_unit: Unit to convert to
+        chunk_size: Number of rows converted per vectorized step
+        
+    Yields:
+        str: CSV text, starting with the header
+        
+    Raises:
+        ValueError: If the column or units are invalid (before any output)
+    """
+    header, chunks = iter_csv_chunks(text_stream, chunk_size)
+    index = column_index(header, column)
+    # Fail on bad units before the response starts streaming
+    convert_array([], from_unit, to_unit)
+    
+    def generate():
+        yield format_csv_rows([header + [f"{header[index]} ({to_unit})", "error"]])
+        for chunk in chunks:
+            values = [row[index] if index < len(row) else "" for row in chunk]
+            converted, errors = convert_array(values, from_unit, to_unit)
+            rows = [
+                row + (["", 1] if error else [repr(value), 0])
+                for row, value, error in zip(chunk, converted.tolist(), errors.tolist())
+            ]
+            yield format_csv_rows(rows)
+    
+    return generate()
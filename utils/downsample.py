@@ -0,0 +1,134 @@
+"""
+Series Downsampling
+Largest-Triangle-Three-Buckets (LTTB) decimation of plotted series. A client
+drawing a curve a few thousand pixels wide gains nothing from a million
+points; LTTB keeps the points that carry the curve's visual shape (peaks,
+troughs, sharp turns) and drops the rest.
+"""
+
+import numpy as np
+
+# The first and last points are always kept, plus at least one in between
+MIN_POINTS = 3
+
+
+def _bucket_means(values, edges):
+    """Mean of each bucket [edges[i], edges[i + 1]) along axis 0, ignoring NaN"""
+    finite = np.isfinite(values)
+    sums = np.add.reduceat(np.where(finite, values, 0.0), edges[:-1], axis=0)
+    counts = np.add.reduceat(finite, edges[:-1], axis=0)
+    with np.errstate(all='ignore'):
+        return sums / counts
+
+
+def lttb_indices(x, ys, max_points):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps
+
+    The points between the first and the last are split into max_points - 2
+    buckets of consecutive rows. From each bucket the point kept is the one
+    forming the largest triangle with the point kept from the previous
+    bucket and the average of the next bucket.
+
+    Several series sharing the x axis are decimated together, so their rows
+    stay aligned: the triangle areas are summed over the series, each scaled
+    by its range so that no series dominates. NaN values add nothing.
+
+    Args:
+        x: 1-D array of n x values
+        ys: Array of shape (n,) or (n, series)
+        max_points: Number of points to keep (at least 3)
+
+    Returns:
+        ndarray: Increasing row indices; all rows when n <= max_points
+
+    Raises:
+        ValueError: If max_points is below 3 or ys does not have n rows
+    """
+    x = np.asarray(x, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    if ys.ndim == 1:
+        ys = ys[:, None]
+    n = x.shape[0]
+    if max_points < MIN_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_POINTS}!")
+    if ys.shape[0] != n:
+        raise ValueError("Each series must have one value per x value!")
+    if n <= max_points:
+        return np.arange(n)
+
+    finite = np.isfinite(ys)
+    with np.errstate(all='ignore'):
+        low = np.where(finite, ys, np.inf).min(axis=0)
+        span = np.where(finite, ys, -np.inf).max(axis=0) - low
+    ys = ys / np.where(np.isfinite(span) & (span > 0), span, 1.0)
+
+    buckets = max_points - 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    # The last bucket looks ahead to the final point
+    ahead = np.append(edges, n)
+    next_x = _bucket_means(x, ahead)[1:]
+    next_y = _bucket_means(ys, ahead)[1:]
+
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(buckets):
+        start, stop = edges[i], edges[i + 1]
+        # Twice the triangle areas; the factor does not change the winner
+        area = np.abs((x[a] - next_x[i]) * (ys[start:stop] - ys[a])
+                      - (x[a] - x[start:stop, None]) * (next_y[i] - ys[a]))
+        area = np.where(np.isnan(area), 0.0, area).sum(axis=1)
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def downsample_rows(results, max_points, x_key=None, length=None, keys=None):
+    """
+    Decimate the row arrays of a series result to a point budget
+
+    Arrays with one entry per row are reduced to the same LTTB-selected
+    rows; summary values (scalars, arrays of another length) are kept.
+
+    Args:
+        results: Dictionary of arrays and summary values
+        max_points: Point budget
+        x_key: Key of the x axis (e.g. 't'); the row number when None
+        length: Number of rows (default: length of results[keys[0]] or
+            results[x_key])
+        keys: Keys of the row arrays (default: every array with length rows)
+
+    Returns:
+        dict: New results with a 'downsampled' summary ({'method': 'lttb',
+            'points', 'of'}), or the results unchanged when they already fit
+
+    Raises:
+        ValueError: If max_points is below 3
+    """
+    if max_points < MIN_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_POINTS}!")
+    if length is None:
+        reference = keys[0] if keys else x_key
+        if reference is None:
+            raise ValueError("The number of rows is needed without x_key or keys!")
+        length = len(results[reference])
+    if keys is None:
+        keys = [key for key, value in results.items()
+                if np.ndim(value) and np.shape(value)[0] == length]
+    if length <= max_points:
+        return results
+
+    rows = {key: np.asarray(results[key]) for key in keys}
+    x = rows[x_key] if x_key in rows else np.arange(length)
+    series = [value.reshape(length, -1) for key, value in rows.items()
+              if key != x_key and value.dtype.kind == 'f']
+    ys = np.concatenate(series, axis=1) if series else x[:, None]
+    indices = lttb_indices(x, ys, max_points)
+
+    downsampled = dict(results)
+    for key, value in rows.items():
+        downsampled[key] = value[indices]
+    downsampled['downsampled'] = {'method': 'lttb', 'points': int(indices.size), 'of': int(length)}
+    return downsampled
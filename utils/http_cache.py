@@ -0,0 +1,84 @@
+"""
+HTTP Caching for Deterministic Calculations
+Canonical query strings and strong ETags for the GET variants of the
+calculation routes, so browsers, proxies and CDNs can cache them.
+"""
+
+import hashlib
+import math
+from urllib.parse import quote, urlencode
+
+from utils.singleflight import canonical_key
+
+# Bump whenever a formula change gives different results for the same
+# inputs. It is part of every canonical URL, so a bump moves results to
+# new URLs and no cache can serve an older engine's results.
+ENGINE_VERSION = '1.0.0'
+# Query parameter carrying the engine version in canonical URLs
+VERSION_PARAM = 'engine'
+
+# A canonical URL names its engine version, so its response never changes
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Redirects to the canonical URL (and responses whose URL has no version)
+# change with a release, so they are only cached briefly
+SHORT_CACHE_MAX_AGE = 3600
+SHORT_CACHE_CONTROL = f'public, max-age={SHORT_CACHE_MAX_AGE}'
+
+
+def _format_value(value):
+    """Single text form of a query value: numbers in their shortest form"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+    if not math.isfinite(number):
+        raise ValueError(f"Invalid number: {value}")
+    if number.is_integer() and abs(number) < 1e16:
+        return str(int(number))
+    return repr(number)
+
+
+def canonical_query(data, engine=ENGINE_VERSION):
+    """
+    Canonical query string of a calculation's inputs
+
+    The engine version comes first, then the inputs: keys are sorted, empty
+    values are dropped and numbers are written in their shortest form, so
+    v0=20.0&theta=45 and theta=45&v0=20 both become
+    engine=1.0.0&theta=45&v0=20. Unit-carrying values should be converted
+    first (see utils.units.normalize_inputs), which makes v0=72 km/h
+    canonical as v0=20.
+
+    Args:
+        data: Dictionary of input name: value
+        engine: Engine version to name, or None for the inputs alone
+
+    Returns:
+        str: URL-encoded query string (without the leading '?')
+
+    Raises:
+        ValueError: If a value is not a finite number or a plain string
+    """
+    pairs = [] if engine is None else [(VERSION_PARAM, engine)]
+    for key in sorted(data):
+        value = data[key]
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        if isinstance(value, (list, tuple, dict)):
+            raise ValueError(f"{key} must be a single value in a query string!")
+        pairs.append((key, _format_value(value)))
+    return urlencode(pairs, quote_via=quote)
+
+
+def calculation_etag(route, data):
+    """
+    Strong ETag of a calculation: a hash of the engine version, the route
+    and the canonical inputs
+
+    Returns:
+        str: Unquoted entity tag
+    """
+    text = f'{ENGINE_VERSION}:{canonical_key(route, data)}'
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
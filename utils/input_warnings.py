@@ -3,139 +3,159 @@ Input Validation with Real-time Warnings
 Provides warnings for unrealistic physics values
 """
 
+from functools import lru_cache
+
+import numpy as np
+
+
+# Declarative warning rules per module: (fields, check, message).
+# Each check receives one number or array per field, with missing inputs as
+# NaN, so any comparison involving a missing input is simply False.
+WARNING_RULES = {
+    "kinematics": [
+        # Unrealistic velocities (>300 m/s ≈ 670 mph)
+        (("u",), lambda u: abs(u) > 300, "⚠ Initial velocity is very high (>300 m/s). Check for errors?"),
+        (("v",), lambda v: abs(v) > 300, "⚠ Final velocity is very high (>300 m/s). Check for errors?"),
+        (("a",), lambda a: abs(a) > 100, "⚠ Acceleration is very high (>100 m/s²). Check for errors?"),
+        (("t",), lambda t: t > 1000, "⚠ Time is very large (>1000s). Check for errors?"),
+        (("s",), lambda s: abs(s) > 1000000, "⚠ Displacement is very large (>1M meters). Check for errors?"),
+        # Physics consistency: v = u + at
+        (("u", "v", "a", "t"), lambda u, v, a, t: abs(v - (u + a * t)) > 1,
+         "⚠ Values may be inconsistent with kinematics equations"),
+    ],
+    "ohms_law": [
+        (("V",), lambda V: V > 1000, "⚠ Voltage is very high (>1000V). This is industrial level."),
+        (("I",), lambda I: I > 100, "⚠ Current is very high (>100A). This is industrial level."),
+        (("R",), lambda R: R < 0.001, "⚠ Resistance is very low (<0.001Ω). Check for errors?"),
+        (("R",), lambda R: R > 1000000, "⚠ Resistance is very high (>1MΩ). Check for errors?"),
+        (("V", "I", "R"), lambda V, I, R: abs(V - I * R) > 0.1,
+         "⚠ Values may not satisfy Ohm's Law (V = I·R)"),
+    ],
+    "energy": [
+        (("m",), lambda m: m > 1000000, "⚠ Mass is very large (>1M kg). Check for errors?"),
+        (("v",), lambda v: abs(v) > 300, "⚠ Velocity is very high (>300 m/s). Check for errors?"),
+        (("m", "v", "KE"), lambda m, v, KE: abs(KE - 0.5 * m * v * v) > 1,
+         "⚠ Values may not satisfy KE = ½mv²"),
+    ],
+    "momentum": [
+        (("m1",), lambda m1: m1 > 1000000, "⚠ Object 1 mass is very large (>1M kg). Check for errors?"),
+        (("m2",), lambda m2: m2 > 1000000, "⚠ Object 2 mass is very large (>1M kg). Check for errors?"),
+        (("v1",), lambda v1: abs(v1) > 300, "⚠ Object 1 velocity is very high (>300 m/s). Check for errors?"),
+        (("v2",), lambda v2: abs(v2) > 300, "⚠ Object 2 velocity is very high (>300 m/s). Check for errors?"),
+        # Same direction with object 1 slower: they may never meet
+        (("v1", "v2"), lambda v1, v2: (v1 > 0) & (v2 > 0) & (v1 <= v2),
+         "ℹ Same direction: Object 1 slower. They may not collide."),
+    ],
+    "optics": [
+        (("f",), lambda f: f == 0, "⚠ Focal length cannot be zero!"),
+        (("f",), lambda f: abs(f) > 1000, "⚠ Focal length is very large (>1000 cm). Check for errors?"),
+        (("f", "u"), lambda f, u: abs(u) <= abs(f),
+         "ℹ Object is at or inside focal point. Virtual image will form."),
+        (("u",), lambda u: u > 10000, "⚠ Object distance is very large (>10km). Check for errors?"),
+        (("v",), lambda v: v > 10000, "⚠ Image distance is very large (>10km). Check for errors?"),
+    ],
+}
+
+
+class CompiledRules:
+    """One module's rule table, evaluated as scalar checks or batch bitmasks
+    
+    Bit i of a warning mask is set when rule i fired for that row; the text
+    for a mask is only built when messages() is called.
+    """
+    
+    def __init__(self, rules):
+        self.rules = [(fields, check) for fields, check, _ in rules]
+        self.texts = [message for _, _, message in rules]
+        self.fields = sorted({field for fields, _ in self.rules for field in fields})
+    
+    def mask(self, values):
+        """Warning bitmask for one set of scalar inputs (None = missing)"""
+        values = {field: float("nan") if values.get(field) is None else values[field]
+                  for field in self.fields}
+        mask = 0
+        for bit, (fields, check) in enumerate(self.rules):
+            if check(*(values[field] for field in fields)):
+                mask |= 1 << bit
+        return mask
+    
+    def batch_masks(self, columns):
+        """Per-row uint32 warning bitmasks for array inputs"""
+        arrays = {
+            field: np.asarray(columns[field], dtype=float)
+            if columns.get(field) is not None else np.float64("nan")
+            for field in self.fields
+        }
+        shape = np.broadcast_shapes(*(np.shape(array) for array in arrays.values()))
+        masks = np.zeros(shape, dtype=np.uint32)
+        with np.errstate(invalid="ignore"):
+            for bit, (fields, check) in enumerate(self.rules):
+                hit = np.asarray(check(*(arrays[field] for field in fields)), dtype=np.uint32)
+                masks |= hit << np.uint32(bit)
+        return masks
+    
+    def messages(self, mask):
+        """Warning texts for one row's bitmask"""
+        mask = int(mask)
+        return [text for bit, text in enumerate(self.texts) if mask >> bit & 1]
+
+
+@lru_cache(maxsize=None)
+def compile_rules(module):
+    """
+    Compile (once) the warning rules for a module
+    
+    Raises:
+        ValueError: If the module has no warning rules
+    """
+    if module not in WARNING_RULES:
+        raise ValueError(f"No warning rules for module: {module}")
+    return CompiledRules(WARNING_RULES[module])
+
 
 class InputValidator:
     """Validates physics inputs and provides warnings"""
     
+    @staticmethod
+    def check(module, **values):
+        """Return warning messages for one set of inputs (None = missing)"""
+        rules = compile_rules(module)
+        return rules.messages(rules.mask(values))
+    
+    @staticmethod
+    def batch_masks(module, columns):
+        """Return per-row warning bitmasks for a dict of input arrays"""
+        return compile_rules(module).batch_masks(columns)
+    
+    @staticmethod
+    def mask_messages(module, mask):
+        """Materialize the warning texts for one bitmask"""
+        return compile_rules(module).messages(mask)
+    
     @staticmethod
     def validate_kinematics(u, v, a, t, s):
         """Validate kinematics inputs and return warnings"""
-        warnings = []
-        
-        # Check for unrealistic velocities (>300 m/s ≈ 670 mph)
-        if u is not None and abs(u) > 300:
-            warnings.append("⚠ Initial velocity is very high (>300 m/s). Check for errors?")
-        if v is not None and abs(v) > 300:
-            warnings.append("⚠ Final velocity is very high (>300 m/s). Check for errors?")
-        
-        # Check for unrealistic acceleration (>100 m/s²)
-        if a is not None and abs(a) > 100:
-            warnings.append("⚠ Acceleration is very high (>100 m/s²). Check for errors?")
-        
-        # Check for unrealistic time (>1000 seconds)
-        if t is not None and t > 1000:
-            warnings.append("⚠ Time is very large (>1000s). Check for errors?")
-        
-        # Check for unrealistic displacement (>1 million meters)
-        if s is not None and abs(s) > 1000000:
-            warnings.append("⚠ Displacement is very large (>1M meters). Check for errors?")
-        
-        # Physics consistency checks
-        if u is not None and v is not None and a is not None and t is not None:
-            # v = u + at
-            expected_v = u + a * t
-            if abs(v - expected_v) > 1:
-                warnings.append("⚠ Values may be inconsistent with kinematics equations")
-        
-        return warnings
+        return InputValidator.check("kinematics", u=u, v=v, a=a, t=t, s=s)
     
     @staticmethod
     def validate_ohms_law(V, I, R):
         """Validate Ohm's Law inputs and return warnings"""
-        warnings = []
-        
-        # Check for unrealistic voltage (>1000V is industrial)
-        if V is not None and V > 1000:
-            warnings.append("⚠ Voltage is very high (>1000V). This is industrial level.")
-        
-        # Check for unrealistic current (>100A is heavy industrial)
-        if I is not None and I > 100:
-            warnings.append("⚠ Current is very high (>100A). This is industrial level.")
-        
-        # Check for unrealistic resistance (<0.001Ω or >1MΩ)
-        if R is not None and R < 0.001:
-            warnings.append("⚠ Resistance is very low (<0.001Ω). Check for errors?")
-        if R is not None and R > 1000000:
-            warnings.append("⚠ Resistance is very high (>1MΩ). Check for errors?")
-        
-        # Physics consistency checks
-        if V is not None and I is not None and R is not None:
-            expected_V = I * R
-            if abs(V - expected_V) > 0.1:
-                warnings.append("⚠ Values may not satisfy Ohm's Law (V = I·R)")
-        
-        return warnings
+        return InputValidator.check("ohms_law", V=V, I=I, R=R)
     
     @staticmethod
     def validate_energy(m, v, KE):
         """Validate Energy inputs and return warnings"""
-        warnings = []
-        
-        # Check for unrealistic mass (>1000000 kg = 1000 ton)
-        if m is not None and m > 1000000:
-            warnings.append("⚠ Mass is very large (>1M kg). Check for errors?")
-        
-        # Check for unrealistic velocity (>300 m/s)
-        if v is not None and abs(v) > 300:
-            warnings.append("⚠ Velocity is very high (>300 m/s). Check for errors?")
-        
-        # Physics consistency checks
-        if m is not None and v is not None and KE is not None:
-            expected_KE = 0.5 * m * v * v
-            if abs(KE - expected_KE) > 1:
-                warnings.append("⚠ Values may not satisfy KE = ½mv²")
-        
-        return warnings
+        return InputValidator.check("energy", m=m, v=v, KE=KE)
     
     @staticmethod
     def validate_momentum(m1, v1, m2, v2):
         """Validate Momentum inputs and return warnings"""
-        warnings = []
-        
-        # Check for unrealistic masses
-        if m1 is not None and m1 > 1000000:
-            warnings.append("⚠ Object 1 mass is very large (>1M kg). Check for errors?")
-        if m2 is not None and m2 > 1000000:
-            warnings.append("⚠ Object 2 mass is very large (>1M kg). Check for errors?")
-        
-        # Check for unrealistic velocities
-        if v1 is not None and abs(v1) > 300:
-            warnings.append("⚠ Object 1 velocity is very high (>300 m/s). Check for errors?")
-        if v2 is not None and abs(v2) > 300:
-            warnings.append("⚠ Object 2 velocity is very high (>300 m/s). Check for errors?")
-        
-        # Check for reasonable collision scenario
-        if v1 is not None and v2 is not None:
-            if (v1 > 0 and v2 > 0 and v1 <= v2):
-                warnings.append("ℹ Same direction: Object 1 slower. They may not collide.")
-        
-        return warnings
+        return InputValidator.check("momentum", m1=m1, v1=v1, m2=m2, v2=v2)
     
     @staticmethod
     def validate_optics(f, u, v):
         """Validate Optics inputs and return warnings"""
-        warnings = []
-        
-        # Check for focal length at zero (undefined)
-        if f is not None and f == 0:
-            warnings.append("⚠ Focal length cannot be zero!")
-        
-        # Check for very large focal length (>1000 cm)
-        if f is not None and abs(f) > 1000:
-            warnings.append("⚠ Focal length is very large (>1000 cm). Check for errors?")
-        
-        # Check for object distance <= focal length (special cases)
-        if f is not None and u is not None:
-            if abs(u) <= abs(f):
-                warnings.append("ℹ Object is at or inside focal point. Virtual image will form.")
-        
-        # Check for very large distances
-        if u is not None and u > 10000:
-            warnings.append("⚠ Object distance is very large (>10km). Check for errors?")
-        if v is not None and v > 10000:
-            warnings.append("⚠ Image distance is very large (>10km). Check for errors?")
-        
-        return warnings
+        return InputValidator.check("optics", f=f, u=u, v=v)
     
     @staticmethod
     def get_warning_message(warnings):
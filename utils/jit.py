@@ -0,0 +1,321 @@
+"""
+JIT Backend for the Time-Stepping Integrators
+Compiles EnergySimulation's inner time loop with Numba when it is installed
+and falls back to the pure NumPy implementation when it is not.
+
+Usage:
+    python -m utils.jit --warm-up      # compile once and cache to disk
+    python -m utils.jit --benchmark    # compare the NumPy and JIT paths
+"""
+
+import argparse
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.energy_simulation import EnergySimulation
+
+try:
+    if os.environ.get('PHYSICS_LAB_JIT', '1') == '0':
+        raise ImportError("JIT disabled by PHYSICS_LAB_JIT=0")
+    from numba import config as numba_config, njit
+except ImportError:
+    njit = None
+
+# Compiled kernels are cached here so a restart does not recompile, unless
+# NUMBA_CACHE_DIR points elsewhere. Resolved from the app, not the cwd.
+NUMBA_CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / 'numba_cache'
+
+JIT_AVAILABLE = njit is not None
+BACKENDS = ('auto', 'numpy', 'jit')
+
+SYSTEM_IDS = {'pendulum': 0, 'ramp': 1, 'spring': 2}
+INTEGRATOR_IDS = {'euler': 0, 'semi_implicit': 1, 'verlet': 2, 'rk4': 3}
+# Progress reports per run when a callback is given
+PROGRESS_REPORTS = 100
+
+
+# ==================== KERNELS ====================
+# Plain Python on scalars, so the same code is valid for Numba's nopython
+# mode. Each sample is integrated in its own scalar loop, which is what
+# NumPy cannot do without an array temporary per step.
+
+def _accel(system, x, m, g, length, k, sin_angle):
+    if system == 0:
+        return -(g / length) * math.sin(x)
+    if system == 1:
+        return -g * sin_angle
+    return -(k / m) * x
+
+
+def _energy(system, x, v, m, g, length, k, sin_angle):
+    if system == 0:
+        return m * g * length * (1 - math.cos(x)), 0.5 * m * (length * v) ** 2
+    if system == 1:
+        return m * g * x * sin_angle, 0.5 * m * v * v
+    return 0.5 * k * x * x, 0.5 * m * v * v
+
+
+def _integrate(system, integrator, state, m, g, length, k, sin_angle, dt, first, last, steps,
+               record_every, position, velocity, potential, kinetic, max_error):
+    """
+    Advance every sample from step first to step last, filling the recorded
+    (frames, samples) output rows. state holds each sample's x, v, a and
+    initial energy between calls; first == 0 starts from x and v.
+    """
+    for i in range(state.shape[1]):
+        mi, gi, li, ki, si = m[i], g[i], length[i], k[i], sin_angle[i]
+        x = state[0, i]
+        v = state[1, i]
+        if first == 0:
+            a = _accel(system, x, mi, gi, li, ki, si)
+            pe, ke = _energy(system, x, v, mi, gi, li, ki, si)
+            e0 = pe + ke
+            error = 0.0
+            position[0, i] = x
+            velocity[0, i] = v
+            potential[0, i] = pe
+            kinetic[0, i] = ke
+        else:
+            a = state[2, i]
+            e0 = state[3, i]
+            error = max_error[i]
+
+        for n in range(first + 1, last + 1):
+            if integrator == 0:
+                x_new = x + v * dt
+                v = v + a * dt
+                x = x_new
+                a = _accel(system, x, mi, gi, li, ki, si)
+            elif integrator == 1:
+                v = v + a * dt
+                x = x + v * dt
+                a = _accel(system, x, mi, gi, li, ki, si)
+            elif integrator == 2:
+                x = x + v * dt + 0.5 * a * dt * dt
+                a_new = _accel(system, x, mi, gi, li, ki, si)
+                v = v + 0.5 * (a + a_new) * dt
+                a = a_new
+            else:
+                k2x = v + 0.5 * dt * a
+                k2v = _accel(system, x + 0.5 * dt * v, mi, gi, li, ki, si)
+                k3x = v + 0.5 * dt * k2v
+                k3v = _accel(system, x + 0.5 * dt * k2x, mi, gi, li, ki, si)
+                k4x = v + dt * k3v
+                k4v = _accel(system, x + dt * k3x, mi, gi, li, ki, si)
+                x_new = x + (dt / 6) * (v + 2 * k2x + 2 * k3x + k4x)
+                v = v + (dt / 6) * (a + 2 * k2v + 2 * k3v + k4v)
+                x = x_new
+                a = _accel(system, x, mi, gi, li, ki, si)
+
+            pe, ke = _energy(system, x, v, mi, gi, li, ki, si)
+            if abs(pe + ke - e0) > error:
+                error = abs(pe + ke - e0)
+            if n % record_every == 0 or n == steps:
+                # The last step is recorded even off the record_every grid
+                frame = n // record_every if n % record_every == 0 else position.shape[0] - 1
+                position[frame, i] = x
+                velocity[frame, i] = v
+                potential[frame, i] = pe
+                kinetic[frame, i] = ke
+        state[0, i] = x
+        state[1, i] = v
+        state[2, i] = a
+        state[3, i] = e0
+        max_error[i] = error
+
+
+_compiled = None
+_compile_lock = threading.Lock()
+
+
+def _kernel():
+    """
+    The compiled _integrate, built on first use so that importing this
+    module neither compiles nor touches the disk cache
+    """
+    global _compiled, _accel, _energy
+    with _compile_lock:
+        if _compiled is None:
+            # Numba picks the cache directory when a function is decorated
+            if not numba_config.CACHE_DIR:
+                numba_config.CACHE_DIR = str(NUMBA_CACHE_DIR)
+            # _integrate looks these up as globals when it is compiled
+            _accel = njit(cache=True)(_accel)
+            _energy = njit(cache=True)(_energy)
+            _compiled = njit(cache=True)(_integrate)
+    return _compiled
+
+
+def resolve_backend(backend='auto'):
+    """
+    Pick the backend that will actually run
+
+    Raises:
+        ValueError: If the backend is unknown, or 'jit' without Numba
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend == 'jit' and not JIT_AVAILABLE:
+        raise ValueError("The JIT backend needs numba (pip install numba)")
+    if backend == 'auto':
+        return 'jit' if JIT_AVAILABLE else 'numpy'
+    return backend
+
+
+def simulate(backend='auto', **kwargs):
+    """
+    EnergySimulation.simulate() on the chosen backend
+
+    Args:
+        backend: 'auto' (JIT when Numba is installed), 'numpy' or 'jit'
+        **kwargs: Any EnergySimulation.simulate() argument
+
+    Returns:
+        The same dictionary as EnergySimulation.simulate(), plus 'backend'
+    """
+    backend = resolve_backend(backend)
+    if backend == 'numpy':
+        results = EnergySimulation.simulate(**kwargs)
+        results['backend'] = backend
+        return results
+
+    # The compiled loop cannot call back into Python, so with a progress
+    # callback it runs in blocks of steps and reports between blocks
+    progress = kwargs.pop('progress', None)
+    system = kwargs.get('system', 'spring')
+    integrator = kwargs.get('integrator', 'verlet')
+    dt = float(kwargs.get('dt', 0.01))
+    steps, record_every, x, v, params = EnergySimulation.prepare(
+        system, integrator, kwargs.get('x0', 1.0), kwargs.get('v0', 0.0), dt,
+        kwargs.get('steps', 1000), kwargs.get('record_every'),
+        kwargs.get('m', 1.0), kwargs.get('g', 9.8), kwargs.get('length', 1.0),
+        kwargs.get('k', 10.0), kwargs.get('angle', 30.0)
+    )
+    shape = x.shape
+    flat = {key: np.array(value, dtype=np.float64).ravel() for key, value in params.items()}
+    sin_angle = np.sin(np.radians(flat['angle']))
+    samples = x.size
+    frames = 1 + steps // record_every + (1 if steps % record_every else 0)
+    out = {key: np.empty((frames, samples)) for key in
+           ('position', 'velocity', 'potential_energy', 'kinetic_energy')}
+    max_error = np.zeros(samples)
+    state = np.zeros((4, samples))
+    state[0] = np.ravel(x)
+    state[1] = np.ravel(v)
+    # Same reporting interval as the NumPy path
+    block = steps if progress is None else max(1, steps // PROGRESS_REPORTS)
+
+    integrate = _kernel()
+    start = time.perf_counter()
+    for first in range(0, steps, block):
+        last = min(first + block, steps)
+        integrate(SYSTEM_IDS[system], INTEGRATOR_IDS[integrator], state,
+                   flat['m'], flat['g'], flat['length'], flat['k'], sin_angle,
+                   dt, first, last, steps, record_every, out['position'], out['velocity'],
+                   out['potential_energy'], out['kinetic_energy'], max_error)
+        if progress is not None:
+            progress(last / steps)
+    elapsed = max(time.perf_counter() - start, 1e-12)
+
+    recorded = [n for n in range(record_every, steps + 1, record_every)]
+    if steps % record_every:
+        recorded.append(steps)
+    results = {'t': np.array([0.0] + [n * dt for n in recorded])}
+    for key, value in out.items():
+        results[key] = value.reshape((frames,) + shape)
+    results['total_energy'] = results['potential_energy'] + results['kinetic_energy']
+
+    # Relative drift, falling back to absolute drift where E0 is zero
+    max_error = max_error.reshape(shape)
+    scale = np.abs(results['total_energy'][0])
+    drift = np.divide(max_error, scale, out=max_error.copy(), where=scale > 0)
+    results['energy_drift'] = drift
+    results['max_energy_drift'] = float(np.max(drift))
+    results['steps_per_second'] = steps / elapsed
+    results['sample_steps_per_second'] = steps * max(samples, 1) / elapsed
+    results['backend'] = backend
+    return results
+
+
+def compare_integrators(backend='auto', **kwargs):
+    """EnergySimulation.compare_integrators() on the chosen backend"""
+    backend = resolve_backend(backend)
+    return EnergySimulation.compare_integrators(
+        simulate=lambda **options: simulate(backend=backend, **options), **kwargs
+    )
+
+
+def warm_up():
+    """
+    Compile the kernels now (or load them from the disk cache) so the first
+    request does not pay for compilation
+
+    Returns:
+        float: Seconds taken, or None when Numba is not installed
+    """
+    if not JIT_AVAILABLE:
+        return None
+    start = time.perf_counter()
+    simulate(backend='jit', x0=np.array([0.1]), steps=2)
+    return time.perf_counter() - start
+
+
+def benchmark(system='pendulum', integrator='rk4', samples=1000, steps=2000):
+    """
+    Time the NumPy and JIT paths on the same run
+
+    Returns:
+        dict: Seconds and sample-steps per second for each available
+        backend, the JIT speedup and the largest difference in position
+    """
+    x0 = np.linspace(0.1, 1.0, samples)
+    kwargs = dict(system=system, integrator=integrator, x0=x0, steps=steps, record_every=steps)
+    report = {'system': system, 'integrator': integrator, 'samples': samples, 'steps': steps}
+    runs = {}
+    backends = ['numpy'] + (['jit'] if JIT_AVAILABLE else [])
+    for backend in backends:
+        if backend == 'jit':
+            report['jit_warm_up_seconds'] = warm_up()
+        start = time.perf_counter()
+        runs[backend] = simulate(backend=backend, **kwargs)
+        report[f'{backend}_seconds'] = time.perf_counter() - start
+        report[f'{backend}_sample_steps_per_second'] = runs[backend]['sample_steps_per_second']
+    if 'jit' in runs:
+        report['speedup'] = report['numpy_seconds'] / report['jit_seconds']
+        report['max_position_difference'] = float(
+            np.max(np.abs(runs['jit']['position'] - runs['numpy']['position']))
+        )
+    return report
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="JIT backend for the energy simulation integrators")
+    parser.add_argument('--warm-up', action='store_true', help="Compile and cache the kernels")
+    parser.add_argument('--benchmark', action='store_true', help="Compare the NumPy and JIT paths")
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if not JIT_AVAILABLE:
+        print("JIT backend unavailable (numba not installed or PHYSICS_LAB_JIT=0); using NumPy")
+    if args.warm_up and JIT_AVAILABLE:
+        print(f"Kernels ready in {warm_up():.2f} s (cache: {numba_config.CACHE_DIR})")
+    if args.benchmark:
+        for system in SYSTEM_IDS:
+            for integrator in INTEGRATOR_IDS:
+                report = benchmark(system, integrator, args.samples, args.steps)
+                line = f"{system:>9} {integrator:>13}  numpy {report['numpy_seconds']:8.3f} s"
+                if 'jit_seconds' in report:
+                    line += (f"  jit {report['jit_seconds']:8.3f} s  x{report['speedup']:6.1f}"
+                             f"  max diff {report['max_position_difference']:.1e}")
+                print(line)
+
+
+if __name__ == '__main__':
+    main()
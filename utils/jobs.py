@@ -0,0 +1,412 @@
+"""
+Background Job Queue
+Run long simulations in a local process pool with priorities, progress
+reporting and cancellation. Job state and results are kept on disk under
+data/jobs/<job id>/, so no external broker is needed.
+"""
+
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from modules.energy_simulation import EnergySimulation
+from utils import jit
+from utils.batch import run_batch, to_serializable
+from utils.precision import DTYPES, high_precision_batch, resolve_precision
+from utils.report import build_report, iter_entries, select_entries
+
+JOBS_DIR = Path('data/jobs')
+PROGRESS_INTERVAL = 0.2
+SWEEP_CHUNK = 100000
+
+STATUS_FILE = 'job.json'
+PROGRESS_FILE = 'progress.json'
+RESULT_FILE = 'result.json'
+CANCEL_FILE = 'cancel'
+# Tasks that write a file besides their JSON result; _run_job passes its
+# path to the task as params['output']
+OUTPUT_FILES = {'report': 'report.pdf'}
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled"""
+
+
+def _write_json(path, data):
+    """Write JSON atomically so readers never see a partial file"""
+    temp = path.with_name(path.name + '.tmp')
+    with open(temp, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp, path)
+
+
+def _read_json(path, default=None):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _process_alive(pid):
+    """Whether a process with this ID is still running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else
+        return True
+    return True
+
+
+# ==================== TASKS ====================
+# Each task takes (params, progress) and returns a JSON-serializable result.
+# progress(fraction) raises JobCancelled once the job has been cancelled.
+
+def _energy_simulation_task(params, progress):
+    results = jit.simulate(progress=progress, **params)
+    return to_serializable(results)
+
+
+def _compare_integrators_task(params, progress):
+    integrators = params.pop('integrators', None) or list(EnergySimulation.INTEGRATORS)
+    results = {}
+    for index, name in enumerate(integrators):
+        results.update(jit.compare_integrators(integrators=[name], **params))
+        progress((index + 1) / len(integrators))
+    return results
+
+
+def _sweep_task(params, progress):
+    """Evaluate a batch module over a grid of one swept input"""
+    module = params['module']
+    name = params['sweep']
+    precision = resolve_precision(params.get('precision'))
+    if precision == 'high':
+        sweep = {'name': name, 'start': params['start'], 'stop': params['stop'],
+                 'points': int(params['points'])}
+        results, exact, _ = high_precision_batch(module, params.get('fixed', {}), sweep=sweep,
+                                                 progress=progress)
+        results['exact'] = exact
+        return results
+
+    dtype = DTYPES[precision]
+    values = np.linspace(float(params['start']), float(params['stop']), int(params['points'])).astype(dtype)
+    fixed = {key: float(value) for key, value in params.get('fixed', {}).items()}
+
+    chunks = []
+    for start in range(0, values.size, SWEEP_CHUNK):
+        columns = dict(fixed)
+        columns[name] = values[start:start + SWEEP_CHUNK]
+        with np.errstate(all='ignore'):
+            results, _ = run_batch(module, columns)
+        chunks.append({key: np.broadcast_to(value, columns[name].shape).astype(dtype)
+                       for key, value in results.items()})
+        progress(min(1.0, (start + SWEEP_CHUNK) / values.size))
+
+    results = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]} if chunks else {}
+    results[name] = values
+    return to_serializable(results)
+
+
+def _batch_task(params, progress):
+    """Evaluate a batch module over uploaded columns"""
+    precision = resolve_precision(params.get('precision'))
+    if precision == 'high':
+        results, exact, masks = high_precision_batch(params['module'], params['columns'],
+                                                     progress=progress)
+        results['exact'] = exact
+    else:
+        dtype = DTYPES[precision]
+        columns = {key: np.asarray(value, dtype=float).astype(dtype)
+                   for key, value in params['columns'].items()}
+        with np.errstate(all='ignore'):
+            results, masks = run_batch(params['module'], columns)
+        results = {key: np.asarray(value).astype(dtype) for key, value in results.items()}
+    progress(1.0)
+    results = to_serializable(results)
+    if masks is not None:
+        results['warning_masks'] = masks.tolist()
+    return results
+
+
+def _report_task(params, progress):
+    """Write a PDF report of the history entries matching a query"""
+    def query():
+        return select_entries(iter_entries(), params.get('modules'), params.get('since'),
+                              params.get('until'), params.get('limit'))
+
+    total = sum(1 for _ in query())
+    report = build_report(
+        query(), params['output'], title=params.get('title', 'Calculation Report'),
+        workers=params.get('workers'), total=total,
+        progress=lambda done, total: progress(done / total if total else 1.0)
+    )
+    report['file'] = OUTPUT_FILES['report']
+    return report
+
+
+TASKS = {
+    'energy_simulation': _energy_simulation_task,
+    'compare_integrators': _compare_integrators_task,
+    'sweep': _sweep_task,
+    'batch': _batch_task,
+    'report': _report_task,
+}
+
+
+def _run_job(job_dir, task, params):
+    """
+    Worker process entry point: run one task, reporting progress and
+    writing the result to the job directory
+
+    Returns:
+        float: Run time in seconds
+    """
+    job_dir = Path(job_dir)
+    cancel_file = job_dir / CANCEL_FILE
+    last_write = [0.0]
+
+    def progress(fraction):
+        if cancel_file.exists():
+            raise JobCancelled()
+        now = time.monotonic()
+        if now - last_write[0] >= PROGRESS_INTERVAL or fraction >= 1:
+            last_write[0] = now
+            _write_json(job_dir / PROGRESS_FILE, {'progress': round(float(fraction), 4)})
+
+    if task in OUTPUT_FILES:
+        params = dict(params, output=str(job_dir / OUTPUT_FILES[task]))
+    start = time.perf_counter()
+    progress(0.0)
+    result = TASKS[task](params, progress)
+    _write_json(job_dir / RESULT_FILE, result)
+    return time.perf_counter() - start
+
+
+class JobQueue:
+    """
+    Priority job queue in front of a process pool
+
+    At most max_workers jobs are handed to the pool at a time, so the order
+    in which queued jobs start is decided here (highest priority first, then
+    oldest) rather than by the pool's own FIFO queue.
+    """
+
+    def __init__(self, root=JOBS_DIR, max_workers=None):
+        self.root = Path(root)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = []
+        self._running = {}
+        self._counter = itertools.count()
+
+    def _job_dir(self, job_id):
+        # Job IDs are generated hex strings; refuse anything else
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            raise ValueError(f"Unknown job: {job_id}")
+        return self.root / job_id
+
+    def _update(self, job_id, **fields):
+        path = self._job_dir(job_id) / STATUS_FILE
+        status = _read_json(path, {})
+        status.update(fields)
+        _write_json(path, status)
+        return status
+
+    def submit(self, task, params=None, priority=0):
+        """
+        Queue a job
+
+        Args:
+            task: Key of TASKS
+            params: Task parameters (JSON-serializable)
+            priority: Higher numbers start first
+
+        Returns:
+            str: Job ID
+
+        Raises:
+            ValueError: If the task is unknown
+        """
+        if task not in TASKS:
+            raise ValueError(f"Unknown task: {task}")
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True)
+        _write_json(job_dir / STATUS_FILE, {
+            'id': job_id,
+            'task': task,
+            'params': params or {},
+            'priority': int(priority),
+            'status': QUEUED,
+            'submitted': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        with self._lock:
+            heapq.heappush(self._pending, (-int(priority), next(self._counter), job_id))
+            self._dispatch()
+        return job_id
+
+    def _dispatch(self):
+        """Start queued jobs while there are free workers (lock held)"""
+        while self._pending and len(self._running) < self.max_workers:
+            _, _, job_id = heapq.heappop(self._pending)
+            status = _read_json(self._job_dir(job_id) / STATUS_FILE, {})
+            if status.get('status') != QUEUED:
+                continue
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads or locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            future = self._executor.submit(
+                _run_job, str(self._job_dir(job_id)), status['task'], status['params']
+            )
+            # Registered before the status says running, so status() never
+            # sees a running job of this process that it does not know
+            self._running[job_id] = future
+            self._update(job_id, status=RUNNING, owner=os.getpid(),
+                         started=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            future.add_done_callback(lambda f, job_id=job_id: self._finished(job_id, f))
+
+    def _finished(self, job_id, future):
+        try:
+            elapsed = future.result()
+            fields = {'status': DONE, 'elapsed': elapsed}
+        except JobCancelled:
+            fields = {'status': CANCELLED}
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            fields = {'status': FAILED, 'error': "Worker process terminated abruptly"}
+            with self._lock:
+                self._executor = None
+        except Exception as e:
+            fields = {'status': FAILED, 'error': str(e) or type(e).__name__}
+        fields['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self._update(job_id, **fields)
+            self._running.pop(job_id, None)
+            self._dispatch()
+
+    def _interrupted(self, job_id, status):
+        """True if a job recorded as running has lost the server running it"""
+        if job_id in self._running:
+            return False
+        owner = status.get('owner')
+        if owner is None or owner == os.getpid():
+            # Ours but not running here: started by an earlier process
+            return True
+        # Started by another server process sharing the jobs directory
+        return not _process_alive(owner)
+
+    def status(self, job_id):
+        """
+        Current state of a job
+
+        Returns:
+            dict: Job record with 'status' and, while running, 'progress'
+
+        Raises:
+            ValueError: If the job does not exist
+        """
+        job_dir = self._job_dir(job_id)
+        status = _read_json(job_dir / STATUS_FILE)
+        if status is None:
+            raise ValueError(f"Unknown job: {job_id}")
+        if status['status'] == RUNNING and self._interrupted(job_id, status):
+            status['status'] = FAILED
+            status['error'] = "Job was interrupted"
+        if status['status'] == DONE:
+            status['progress'] = 1.0
+        else:
+            status['progress'] = _read_json(job_dir / PROGRESS_FILE, {}).get('progress', 0.0)
+        return status
+
+    def list_jobs(self):
+        """Status of every job on disk, newest first"""
+        if not self.root.exists():
+            return []
+        jobs = []
+        for job_dir in self.root.iterdir():
+            try:
+                jobs.append(self.status(job_dir.name))
+            except ValueError:
+                continue
+        return sorted(jobs, key=lambda job: job.get('submitted', ''), reverse=True)
+
+    def result_path(self, job_id):
+        """
+        Path of a finished job's result file
+
+        Raises:
+            ValueError: If the job does not exist or has not finished successfully
+        """
+        status = self.status(job_id)
+        if status['status'] != DONE:
+            raise ValueError(f"Job is {status['status']}, no result available")
+        return self._job_dir(job_id) / RESULT_FILE
+
+    def output_path(self, job_id):
+        """
+        Path of the file a finished job wrote (e.g. a report's PDF)
+
+        Raises:
+            ValueError: If the job has not finished successfully or writes no file
+        """
+        status = self.status(job_id)
+        if status['status'] != DONE:
+            raise ValueError(f"Job is {status['status']}, no file available")
+        if status['task'] not in OUTPUT_FILES:
+            raise ValueError(f"{status['task']} jobs write no file")
+        return self._job_dir(job_id) / OUTPUT_FILES[status['task']]
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job
+
+        Queued jobs never start. Running jobs stop at their next progress
+        report.
+
+        Returns:
+            dict: Updated job status
+        """
+        with self._lock:
+            # Read under the lock: _dispatch() may have started the job since
+            status = self.status(job_id)
+            if status['status'] in FINISHED:
+                return status
+            if status['status'] == QUEUED:
+                self._update(job_id, status=CANCELLED,
+                             finished=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            else:
+                (self._job_dir(job_id) / CANCEL_FILE).touch()
+                self._update(job_id, cancel_requested=True)
+        return self.status(job_id)
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,141 @@
+"""
+Live Simulation Streams
+Server-Sent Events (SSE) of simulation frames paced in real time
+"""
+
+import json
+import math
+import time
+
+from modules.projectile_motion import ProjectileMotion
+from modules.circular_motion import CircularMotion
+from modules.freefall_dynamics import FreefallDynamics
+from utils.batch import to_serializable
+
+SSE_MIMETYPE = 'text/event-stream'
+DEFAULT_RATE = 30
+MAX_RATE = 60
+MAX_STREAM_SECONDS = 120
+
+
+def _projectile(v0=0, theta=45, g=9.8, m=1.0):
+    flight = ProjectileMotion.calculate(v0=v0, theta=theta, g=g).get('time_of_flight', 0)
+    if flight <= 0:
+        raise ValueError("Launch speed and angle must give a positive time of flight!")
+    return (lambda t: ProjectileMotion.state(t, v0=v0, theta=theta, g=g, m=m)), flight
+
+
+def _circular(v=0, r=0, m=1.0, revolutions=1):
+    period = CircularMotion.calculate(v=v, r=r).get('period', 0)
+    if period <= 0:
+        raise ValueError("Speed and radius must be positive!")
+    return (lambda t: CircularMotion.state(t, v=v, r=r, m=m)), period * revolutions
+
+
+def _freefall(h=0, v0=0, g=9.8, m=1.0):
+    fall = FreefallDynamics.time_to_ground(h=h, v0=v0, g=g)
+    return (lambda t: FreefallDynamics.state(t, h=h, v0=v0, g=g, m=m)), fall
+
+
+# Simulation name: (factory returning (state function, duration), input defaults)
+SIMULATIONS = {
+    'projectile': (_projectile, {'v0': 0, 'theta': 45, 'g': 9.8, 'm': 1.0}),
+    'circular': (_circular, {'v': 0, 'r': 0, 'm': 1.0, 'revolutions': 1}),
+    'freefall': (_freefall, {'h': 0, 'v0': 0, 'g': 9.8, 'm': 1.0}),
+}
+
+
+def create_simulation(name, data):
+    """
+    Build a simulation from request parameters
+
+    Args:
+        name: Key of SIMULATIONS
+        data: Dictionary of parameters; missing ones take the defaults
+
+    Returns:
+        tuple: (state function of time, simulated duration in seconds)
+
+    Raises:
+        ValueError: If the simulation or parameters are invalid
+    """
+    if name not in SIMULATIONS:
+        raise ValueError(f"Unknown simulation: {name}")
+    factory, defaults = SIMULATIONS[name]
+    params = {key: float(data.get(key, default)) for key, default in defaults.items()}
+    return factory(**params)
+
+
+def paced_frames(state, duration, rate=DEFAULT_RATE, speed=1.0,
+                 clock=time.monotonic, sleep=time.sleep):
+    """
+    Compute simulation frames on a wall-clock schedule
+
+    Frame n is due at n / rate seconds after the start and shows the state at
+    simulated time n * speed / rate; the last frame is at the end of the
+    simulation. Frames are computed only when they are sent, so at most one
+    frame is ever buffered. When the client reads slower than the rate (the
+    generator resumes late), the frames it missed are coalesced into the
+    latest due frame and counted in 'dropped' rather than queued.
+
+    Args:
+        state: Function of simulated time returning a dict of values
+        duration: Simulated duration (s)
+        rate: Frames per second (1 to MAX_RATE)
+        speed: Simulated seconds per wall-clock second
+        clock: Monotonic clock (for testing)
+        sleep: Sleep function (for testing)
+
+    Yields:
+        dict: Frame number, simulated time t, dropped count and the state
+
+    Raises:
+        ValueError: If the rate, speed or resulting stream length is invalid
+    """
+    if not 1 <= rate <= MAX_RATE:
+        raise ValueError(f"Rate must be between 1 and {MAX_RATE} frames per second!")
+    if speed <= 0:
+        raise ValueError("Speed must be positive!")
+    if duration / speed > MAX_STREAM_SECONDS:
+        raise ValueError(f"Stream would last longer than {MAX_STREAM_SECONDS} s; increase speed!")
+
+    def generate():
+        interval = 1 / rate
+        last = math.ceil(duration / (speed * interval))
+        start = clock()
+        sent = -1
+        while sent < last:
+            elapsed = clock() - start
+            due = min(last, int(elapsed / interval))
+            if due <= sent:
+                sleep((sent + 1) * interval - elapsed)
+                continue
+            t = min(due * interval * speed, duration)
+            frame = {'frame': due, 't': t, 'dropped': due - sent - 1}
+            frame.update(to_serializable(state(t)))
+            yield frame
+            sent = due
+
+    return generate()
+
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event with a JSON payload"""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_stream(frames, duration):
+    """
+    Wrap frames as an SSE stream: a 'start' event, one 'frame' event per
+    frame and an 'end' event with the number of coalesced frames
+    """
+    yield sse_event({'duration': duration}, event='start')
+    dropped = 0
+    count = 0
+    for frame in frames:
+        dropped += frame['dropped']
+        count += 1
+        yield sse_event(frame, event='frame')
+    yield sse_event({'frames': count, 'dropped': dropped}, event='end')
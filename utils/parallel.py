@@ -0,0 +1,288 @@
+"""
+Parallel Batch Executor
+Split large batch computations into chunks and evaluate them on a process
+pool. Inputs and outputs live in shared memory, so workers receive only
+buffer names and row ranges and nothing large is pickled.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from utils.batch import check_inputs, get_batch_module, run_batch
+
+# Smallest batch worth the cost of going parallel
+PARALLEL_THRESHOLD = 200000
+# Rows timed in-process to estimate the single-core throughput
+CALIBRATION_ROWS = 20000
+# Aim for chunks of about this many seconds of single-core work
+TARGET_CHUNK_SECONDS = 0.05
+MIN_CHUNK = 10000
+# Chunks per worker, so uneven chunks still balance out
+CHUNKS_PER_WORKER = 4
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(workers):
+    """Shared process pool per worker count, started on first use"""
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executors[workers]
+
+
+def _attach(name):
+    """Attach to a block owned (and later unlinked) by the parent process"""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching also registers the block, but spawned
+        # workers share the parent's resource tracker, so that is harmless
+        return SharedMemory(name=name)
+
+
+def _shared_array(shape, dtype=np.float64):
+    """Allocate a shared block and an ndarray view of it"""
+    size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    shm = SharedMemory(create=True, size=size)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _evaluate_chunk(task):
+    """
+    Worker entry point: evaluate rows [start, stop) from shared memory
+
+    Args:
+        task: Dictionary with the module, total rows, the chunk's start and
+            stop, shared block names (input, output, mask), the input and
+            output names and the storage dtype; scalar inputs and the sweep
+            (name, start, step) are small enough to send directly
+
+    Returns:
+        float: Seconds spent computing
+    """
+    began = time.perf_counter()
+    blocks = []
+    try:
+        _evaluate_views(task, blocks)
+    finally:
+        for block in blocks:
+            block.close()
+    return time.perf_counter() - began
+
+
+def _evaluate_views(task, blocks):
+    """Body of _evaluate_chunk; the array views die when this returns,
+    so the blocks can be closed afterwards"""
+    rows, start, stop = task['rows'], task['start'], task['stop']
+    dtype = np.dtype(task['dtype'])
+    columns = dict(task['scalars'])
+    if task['input_block']:
+        blocks.append(_attach(task['input_block']))
+        data = np.ndarray((len(task['inputs']), rows), dtype=dtype, buffer=blocks[-1].buf)
+        for index, name in enumerate(task['inputs']):
+            columns[name] = data[index, start:stop]
+    if task['sweep']:
+        columns[task['sweep'][0]] = _sweep_values(task['sweep'], start, stop, dtype)
+
+    with np.errstate(all='ignore'):
+        results, masks = run_batch(task['module'], columns)
+
+    blocks.append(_attach(task['output_block']))
+    out = np.ndarray((len(task['outputs']), rows), dtype=dtype, buffer=blocks[-1].buf)
+    for index, name in enumerate(task['outputs']):
+        out[index, start:stop] = results[name]
+    if task['mask_block'] and masks is not None:
+        blocks.append(_attach(task['mask_block']))
+        np.ndarray((rows,), dtype=np.uint32, buffer=blocks[-1].buf)[start:stop] = masks
+
+
+def _sweep_values(sweep, start, stop, dtype=np.float64):
+    """Rows [start, stop) of a (name, first, step) sweep, rounded to dtype"""
+    _, first, step = sweep
+    return (first + step * np.arange(start, stop, dtype=np.float64)).astype(dtype, copy=False)
+
+
+def _calibrate(module, columns, sweep, rows):
+    """Single-core rows per second, timed on the first rows in-process"""
+    count = min(rows, CALIBRATION_ROWS)
+    sample = {name: values[:count] if np.ndim(values) else values
+              for name, values in columns.items()}
+    if sweep:
+        sample[sweep[0]] = _sweep_values(sweep, 0, count)
+    began = time.perf_counter()
+    with np.errstate(all='ignore'):
+        run_batch(module, sample)
+    return count / max(time.perf_counter() - began, 1e-9)
+
+
+def tune_chunk_size(rows, workers, rows_per_second):
+    """
+    Pick a chunk size from the measured throughput
+
+    Chunks are large enough to amortize the per-task overhead (about
+    TARGET_CHUNK_SECONDS of work each) but small enough to give every worker
+    several chunks.
+    """
+    by_time = int(rows_per_second * TARGET_CHUNK_SECONDS)
+    by_balance = math.ceil(rows / (workers * CHUNKS_PER_WORKER))
+    return max(MIN_CHUNK, min(by_time, by_balance))
+
+
+def parallel_batch(module, columns=None, sweep=None, workers=None, chunk_size=None,
+                   dtype=np.float64):
+    """
+    Evaluate a batch module over many rows on all cores
+
+    Args:
+        module: Key of utils.batch.BATCH_MODULES
+        columns: Dictionary of input name: 1-D array (or scalar) of equal length
+        sweep: Optional dict {'name', 'start', 'stop', 'points'}; the swept
+            input is generated inside the workers instead of being stored
+        workers: Number of processes (default: all cores)
+        chunk_size: Rows per task (default: auto-tuned)
+        dtype: Storage type of the inputs and outputs. Each chunk is still
+            computed in float64; float32 halves the memory and the bytes
+            moved through shared memory at the cost of rounding every
+            stored value to float32
+
+    Returns:
+        tuple: (dict of output arrays, uint32 warning masks or None,
+            scaling report dict)
+
+    Raises:
+        ValueError: If the module is unknown, an input name is not one of
+            its inputs or the inputs do not line up
+    """
+    spec = get_batch_module(module)
+    check_inputs(module, list(columns or {}) + ([sweep['name']] if sweep else []))
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("Batch storage type must be float32 or float64!")
+    columns = {name: np.asarray(value, dtype=dtype) for name, value in (columns or {}).items()}
+    arrays = {name: value for name, value in columns.items() if value.ndim}
+    scalars = {name: float(value) for name, value in columns.items() if not value.ndim}
+
+    sweep_spec = None
+    if sweep:
+        points = int(sweep['points'])
+        if points < 1:
+            raise ValueError("Sweep needs at least one point!")
+        first, last = float(sweep['start']), float(sweep['stop'])
+        sweep_spec = (sweep['name'], first, (last - first) / (points - 1) if points > 1 else 0.0)
+        rows = points
+    else:
+        rows = None
+    for name, value in arrays.items():
+        if value.ndim != 1 or (rows is not None and value.size != rows):
+            raise ValueError("Batch inputs must have matching lengths!")
+        rows = value.size
+    if rows is None:
+        rows = 1
+
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    outputs = list(run_batch(module, {})[0])
+    has_masks = 'warnings' in spec
+
+    throughput = _calibrate(module, dict(arrays, **scalars), sweep_spec, rows)
+    serial_estimate = rows / throughput
+    if chunk_size is None:
+        chunk_size = tune_chunk_size(rows, workers, throughput)
+    chunk_size = max(1, int(chunk_size))
+    if rows < PARALLEL_THRESHOLD or workers == 1:
+        workers = 1
+        chunk_size = rows
+
+    began = time.perf_counter()
+    if workers == 1:
+        results, warning_masks = _evaluate_local(module, dict(arrays, **scalars), sweep_spec, rows, dtype)
+        chunks = 1
+        busy = [time.perf_counter() - began]
+    else:
+        results, warning_masks, busy = _evaluate_shared(
+            module, arrays, scalars, sweep_spec, rows, outputs, has_masks, workers, chunk_size, dtype
+        )
+        chunks = len(busy)
+    elapsed = max(time.perf_counter() - began, 1e-9)
+
+    speedup = serial_estimate / elapsed
+    report = {
+        'rows': rows,
+        'workers': workers,
+        'dtype': dtype.name,
+        'chunks': chunks,
+        'chunk_size': chunk_size,
+        'elapsed': elapsed,
+        'compute_time': float(sum(busy)),
+        'serial_estimate': serial_estimate,
+        'speedup': speedup,
+        'efficiency': speedup / workers,
+        'rows_per_second': rows / elapsed
+    }
+    return results, warning_masks, report
+
+
+def _evaluate_local(module, columns, sweep, rows, dtype=np.float64):
+    """Evaluate every row in this process (small batches)"""
+    if sweep:
+        columns[sweep[0]] = _sweep_values(sweep, 0, rows, dtype)
+    with np.errstate(all='ignore'):
+        results, masks = run_batch(module, columns)
+    results = {name: np.broadcast_to(value, (rows,)).astype(dtype)
+               for name, value in results.items()}
+    if masks is not None:
+        masks = np.broadcast_to(masks, (rows,)).copy()
+    return results, masks
+
+
+def _evaluate_shared(module, arrays, scalars, sweep, rows, outputs, has_masks, workers, chunk_size,
+                     dtype=np.float64):
+    """Evaluate chunks on the process pool through shared memory blocks"""
+    blocks = []
+    try:
+        input_name = None
+        if arrays:
+            block, data = _shared_array((len(arrays), rows), dtype)
+            blocks.append(block)
+            for index, value in enumerate(arrays.values()):
+                data[index] = value
+            del data
+            input_name = block.name
+        block, out = _shared_array((len(outputs), rows), dtype)
+        blocks.append(block)
+        mask_name = None
+        if has_masks:
+            mask_block, masks = _shared_array((rows,), np.uint32)
+            blocks.append(mask_block)
+            mask_name = mask_block.name
+
+        tasks = [{
+            'module': module, 'rows': rows,
+            'start': start, 'stop': min(rows, start + chunk_size),
+            'input_block': input_name, 'inputs': list(arrays),
+            'output_block': block.name, 'outputs': outputs,
+            'mask_block': mask_name, 'scalars': scalars, 'sweep': sweep,
+            'dtype': dtype.name
+        } for start in range(0, rows, chunk_size)]
+        busy = list(_executor(workers).map(_evaluate_chunk, tasks))
+
+        results = {name: out[index].copy() for index, name in enumerate(outputs)}
+        warning_masks = masks.copy() if has_masks else None
+        del out
+        if has_masks:
+            del masks
+        return results, warning_masks, busy
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
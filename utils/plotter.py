@@ -1,16 +1,27 @@
 """
 Plotting Utilities
 Helper functions for creating and embedding matplotlib plots in CustomTkinter
+
+Figures are created directly (not through pyplot), so importing this module
+selects no backend and works on headless servers; only the functions that
+embed a canvas in a Tk frame need Tk.
 """
 
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib.style
 from matplotlib.figure import Figure
 
 # Set matplotlib style
-plt.style.use('seaborn-v0_8-darkgrid')
+matplotlib.style.use('seaborn-v0_8-darkgrid')
+
+
+def _tk_canvas(fig, parent_frame):
+    """Embed a figure in a Tk frame (imports the Tk backend on first use)"""
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    
+    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+    return canvas
 
 
 def create_plot(parent_frame, figsize=(8, 6), dpi=100):
@@ -32,12 +43,8 @@ def create_plot(parent_frame, figsize=(8, 6), dpi=100):
     # Create figure
     fig = Figure(figsize=figsize, dpi=dpi, facecolor='#2b2b2b')
     
-    # Create canvas
-    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-    canvas.draw()
-    
-    # Pack canvas
-    canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+    # Create and pack canvas
+    _tk_canvas(fig, parent_frame)
     
     return fig
 
@@ -125,12 +132,11 @@ def create_subplot_grid(parent_frame, rows, cols, figsize=(10, 8)):
         widget.destroy()
     
     # Create figure with subplots
-    fig, axes = plt.subplots(rows, cols, figsize=figsize, facecolor='#2b2b2b')
+    fig = Figure(figsize=figsize, facecolor='#2b2b2b')
+    axes = fig.subplots(rows, cols)
     
     # Create canvas
-    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+    _tk_canvas(fig, parent_frame)
     
     return fig, axes
 
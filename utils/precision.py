@@ -0,0 +1,324 @@
+"""
+Precision Modes for Batch and Sweep Calculations
+
+    float32  Inputs and outputs stored as float32; each chunk is computed in
+             float64 and rounded once when stored. Half the memory and
+             bandwidth of float64.
+    float64  The default vectorized kernels.
+    high     Exact rational arithmetic (fractions.Fraction) through the
+             scalar module functions, reported as decimal strings. Orders of
+             magnitude slower; meant for reference values and small sweeps.
+
+Error bounds (kappa = condition number of the formula
+with respect to its inputs, e.g. 3 for m*v*v/2, large for a difference of
+nearly equal values such as v - u):
+
+    float32  relative error <= (1 + kappa) * 2**-24 (about 6e-8 per unit of
+             kappa): every input and output is rounded to float32 once
+    float64  relative error <= (n + kappa) * 2**-53 for a formula of n
+             operations (a few 1e-16 for every module here)
+    high     +, -, * and / are exact for the decimal inputs as written;
+             outputs are rounded to HIGH_PRECISION_DIGITS significant
+             digits (relative error <= 5e-30). Square roots, trigonometry
+             and pi have no exact rational value, so those outputs fall back
+             to float64 and are flagged as inexact.
+
+Usage:
+    python -m utils.precision --benchmark [--module pe_ke] [--rows 1000000]
+"""
+
+import argparse
+import math
+import numbers
+import time
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+import numpy as np
+
+from utils.batch import check_inputs, get_batch_module, run_batch
+from utils.parallel import parallel_batch
+
+PRECISIONS = ('float32', 'float64', 'high')
+DTYPES = {'float32': np.float32, 'float64': np.float64}
+HIGH_PRECISION_DIGITS = 30
+# The exact path runs one Python call per row
+HIGH_PRECISION_MAX_ROWS = 100000
+
+ERROR_BOUNDS = {
+    'float32': "relative error <= (1 + kappa) * 2**-24 (inputs and outputs rounded to float32)",
+    'float64': "relative error <= (n + kappa) * 2**-53 for n operations",
+    'high': (f"exact rational arithmetic rounded to {HIGH_PRECISION_DIGITS} significant digits; "
+             "sqrt/trig/pi outputs fall back to float64 (see 'exact')"),
+}
+
+
+def resolve_precision(precision):
+    """
+    Validate a precision mode
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    precision = precision or 'float64'
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision} (use {', '.join(PRECISIONS)})")
+    return precision
+
+
+def to_fraction(value):
+    """
+    Exact rational value of an input
+
+    Floats are read as the shortest decimal that round-trips (0.1 becomes
+    1/10, not the binary value 3602879701896397/36028797018963968), which
+    is the number the user typed. Strings are parsed as decimals.
+
+    Raises:
+        ValueError: If the value is not a finite number
+    """
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, numbers.Integral):
+        return Fraction(int(value))
+    if isinstance(value, str):
+        text = value.strip()
+    else:
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError("High precision inputs must be finite numbers!")
+        text = repr(value)
+    try:
+        return Fraction(text)
+    except ValueError:
+        raise ValueError(f"Invalid number: {value}")
+
+
+def format_value(value, digits=HIGH_PRECISION_DIGITS):
+    """
+    Decimal string of an exact or float result
+
+    Returns:
+        str: Fractions rounded to `digits` significant digits, other numbers
+            as their shortest repr
+    """
+    if isinstance(value, Fraction):
+        with localcontext() as context:
+            context.prec = digits
+            return str(Decimal(value.numerator) / Decimal(value.denominator))
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _column_values(values, rows):
+    """Row values of a scalar or 1-D column as a list"""
+    if isinstance(values, (list, tuple)):
+        items = list(values)
+    else:
+        array = np.asarray(values)
+        items = [array.item()] * rows if array.ndim == 0 else array.tolist()
+    if len(items) != rows:
+        raise ValueError("Batch inputs must have matching lengths!")
+    return items
+
+
+def exact_sweep(start, stop, points):
+    """Evenly spaced sweep values as exact fractions"""
+    first, last = to_fraction(start), to_fraction(stop)
+    if points == 1:
+        return [first]
+    return [first + (last - first) * i / (points - 1) for i in range(points)]
+
+
+def high_precision_batch(module, columns=None, sweep=None, digits=HIGH_PRECISION_DIGITS,
+                         progress=None):
+    """
+    Evaluate a batch module row by row in exact rational arithmetic
+
+    Args:
+        module: Key of utils.batch.BATCH_MODULES
+        columns: Dictionary of input name: scalar or list of numbers (or
+            decimal strings); missing, None and NaN entries take the defaults
+        sweep: Optional dict {'name', 'start', 'stop', 'points'}; the swept
+            values are generated exactly
+        digits: Significant digits of the decimal output strings
+        progress: Optional callback taking the fraction of rows done
+
+    Returns:
+        tuple: (dict of output lists of decimal strings (None where a
+            result is undefined) plus the swept input, dict of output
+            name: True if every row was computed exactly, uint32 warning
+            masks or None)
+
+    Raises:
+        ValueError: If the module is unknown or the inputs are invalid
+    """
+    spec = get_batch_module(module)
+    check_inputs(module, list(columns or {}) + ([sweep['name']] if sweep else []))
+    columns = dict(columns or {})
+    rows = None
+    if sweep:
+        rows = int(sweep['points'])
+        if rows < 1:
+            raise ValueError("Sweep needs at least one point!")
+        columns[sweep['name']] = exact_sweep(sweep['start'], sweep['stop'], rows)
+    for values in columns.values():
+        if np.ndim(values):
+            if rows is not None and len(values) != rows:
+                raise ValueError("Batch inputs must have matching lengths!")
+            rows = len(values)
+    rows = 1 if rows is None else rows
+    if rows > HIGH_PRECISION_MAX_ROWS:
+        raise ValueError(f"High precision is limited to {HIGH_PRECISION_MAX_ROWS} rows!")
+
+    inputs = {}
+    for name, default in spec['defaults'].items():
+        items = _column_values(columns[name], rows) if name in columns else [None] * rows
+        inputs[name] = [
+            to_fraction(default if item is None or (isinstance(item, float) and item != item) else item)
+            for item in items
+        ]
+
+    outputs = list(run_batch(module, {})[0])
+    results = {name: [None] * rows for name in outputs}
+    exact = {name: True for name in outputs}
+    step = max(1, rows // 100)
+    for row in range(rows):
+        values = spec['scalar'](**{name: inputs[name][row] for name in inputs})
+        for name, value in values.items():
+            if name not in results:
+                continue
+            if not isinstance(value, numbers.Rational):
+                exact[name] = False
+            results[name][row] = format_value(value, digits)
+        if progress is not None and (row + 1) % step == 0:
+            progress((row + 1) / rows)
+
+    if sweep:
+        results[sweep['name']] = [format_value(value, digits) for value in columns[sweep['name']]]
+
+    # Warnings are threshold checks, so the float64 masks are exact enough
+    _, masks = run_batch(module, {name: np.array([float(v) for v in values])
+                                  for name, values in inputs.items()})
+    return results, exact, masks
+
+
+def precision_batch(module, columns=None, sweep=None, precision='float64', **options):
+    """
+    Evaluate a batch module (or sweep) in the chosen precision mode
+
+    Args:
+        module: Key of utils.batch.BATCH_MODULES
+        columns: Dictionary of input name: 1-D array (or scalar)
+        sweep: Optional dict {'name', 'start', 'stop', 'points'}
+        precision: 'float32', 'float64' or 'high'
+        **options: workers and chunk_size for utils.parallel.parallel_batch
+
+    Returns:
+        tuple: (dict of output columns including the swept input, warning
+            masks or None, report dict with 'precision' and 'error_bound')
+
+    Raises:
+        ValueError: If the mode, module or inputs are invalid
+    """
+    precision = resolve_precision(precision)
+    if precision == 'high':
+        began = time.perf_counter()
+        results, exact, masks = high_precision_batch(module, columns, sweep)
+        elapsed = max(time.perf_counter() - began, 1e-9)
+        rows = len(next(iter(results.values()))) if results else 0
+        report = {'rows': rows, 'workers': 1, 'elapsed': elapsed,
+                  'rows_per_second': rows / elapsed, 'digits': HIGH_PRECISION_DIGITS,
+                  'exact': exact}
+    else:
+        dtype = DTYPES[precision]
+        results, masks, report = parallel_batch(module, columns, sweep=sweep, dtype=dtype, **options)
+        if sweep:
+            results[sweep['name']] = np.linspace(
+                float(sweep['start']), float(sweep['stop']), int(sweep['points'])
+            ).astype(dtype)
+    report['precision'] = precision
+    report['error_bound'] = ERROR_BOUNDS[precision]
+    return results, masks, report
+
+
+def max_relative_error(values, reference):
+    """Largest relative difference from the reference where both are defined"""
+    values = np.asarray(values, dtype=np.float64)
+    reference = np.array([np.nan if r is None else float(r) for r in reference])
+    defined = ~np.isnan(values) & ~np.isnan(reference)
+    if not defined.any():
+        return 0.0
+    scale = np.maximum(np.abs(reference[defined]), np.finfo(np.float64).tiny)
+    return float(np.max(np.abs(values[defined] - reference[defined]) / scale))
+
+
+def benchmark(module='pe_ke', rows=1000000, reference_rows=2000, seed=0):
+    """
+    Throughput of each precision mode and its error against the exact path
+
+    Inputs are random values with three decimals, so they are exact
+    decimals for the high precision reference.
+
+    Returns:
+        dict: {mode: {'seconds', 'rows_per_second', 'bytes_per_value',
+            'max_relative_error'}} (high is timed on reference_rows rows)
+    """
+    spec = get_batch_module(module)
+    generator = np.random.default_rng(seed)
+    columns = {name: np.round(generator.uniform(0.5, 100, rows), 3) for name in spec['defaults']}
+    sample = {name: values[:reference_rows].tolist() for name, values in columns.items()}
+
+    began = time.perf_counter()
+    reference, exact, _ = high_precision_batch(module, sample)
+    high_seconds = time.perf_counter() - began
+    report = {'high': {
+        'seconds': high_seconds,
+        'rows_per_second': reference_rows / high_seconds,
+        'bytes_per_value': None,
+        'max_relative_error': 0.0,
+        'exact': exact
+    }}
+    for precision, dtype in DTYPES.items():
+        began = time.perf_counter()
+        results, _, _ = parallel_batch(module, columns, dtype=dtype, workers=1)
+        seconds = time.perf_counter() - began
+        report[precision] = {
+            'seconds': seconds,
+            'rows_per_second': rows / seconds,
+            'bytes_per_value': np.dtype(dtype).itemsize,
+            'max_relative_error': max(
+                (max_relative_error(results[name][:reference_rows], reference[name])
+                 for name in reference), default=0.0
+            )
+        }
+    return report
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Precision modes for batch calculations")
+    parser.add_argument('--benchmark', action='store_true', help="Time each mode and measure its error")
+    parser.add_argument('--module', default='pe_ke')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--reference-rows', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    for precision in PRECISIONS:
+        print(f"{precision:>8}: {ERROR_BOUNDS[precision]}")
+    if args.benchmark:
+        report = benchmark(args.module, args.rows, args.reference_rows)
+        print(f"\n{args.module}: {args.rows} rows (high: {args.reference_rows} rows)")
+        for precision in PRECISIONS:
+            mode = report[precision]
+            line = (f"{precision:>8} {mode['rows_per_second']:14,.0f} rows/s"
+                    f"  max rel. error {mode['max_relative_error']:.1e}")
+            if 'exact' in mode:
+                inexact = [name for name, flag in mode['exact'].items() if not flag]
+                line += f"  (float64 fallback: {', '.join(inexact)})" if inexact else "  (all exact)"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
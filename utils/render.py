@@ -0,0 +1,563 @@
+"""
+Headless Plot Rendering
+Module graphs rendered to PNG, SVG or PDF on matplotlib's Agg backend, for
+servers without a display. A graph is first described as a plot spec (a
+JSON-serializable dict of traces and labels); specs are rendered on a pool
+of worker processes and the images are kept in a size-bounded disk cache
+keyed by the spec's hash.
+
+The graphs match the web UI's (static/script.js generateGraph), plus the
+oscillator time series.
+
+Usage:
+    python -m utils.render projectile v0=20 theta=45 -o trajectory.png
+"""
+
+import argparse
+import hashlib
+import inspect
+import io
+import json
+import math
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import matplotlib
+    from matplotlib.figure import Figure
+    from utils.plotter import add_watermark
+except ImportError:
+    matplotlib = None
+
+from modules.oscillator import Oscillator
+from utils.singleflight import SingleFlight
+
+RENDER_AVAILABLE = matplotlib is not None
+
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+# Bump when the drawing code changes, so cached images are not reused
+RENDER_VERSION = '1'
+
+RENDERS_DIR = Path('data/renders')
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+RENDER_TIMEOUT = 60
+
+# Figure options and their limits
+DEFAULT_OPTIONS = {'width': 8.0, 'height': 5.0, 'dpi': 100, 'theme': 'dark'}
+SIZE_LIMITS = (2.0, 20.0)
+DPI_LIMITS = (50, 300)
+THEMES = {
+    'dark': {'paper': '#0f0f0f', 'plot': '#1a1a1a', 'text': '#ffffff', 'grid': '#333333'},
+    'light': {'paper': '#ffffff', 'plot': '#ffffff', 'text': '#000000', 'grid': '#dddddd'},
+}
+
+# Plotly marker symbols used by the web UI
+MARKERS = {'star': '*', 'diamond': 'D', 'circle': 'o'}
+
+
+# ==================== PLOT SPECS ====================
+
+def _number(inputs, name, default=0.0):
+    """An input as a float; missing or empty inputs take the default"""
+    value = inputs.get(name)
+    if value is None or value == '':
+        return default
+    return float(value)
+
+
+def _trace(x, y, label, color, axis='y', mode='lines', fill=None, marker='circle', size=None):
+    """One trace of a plot spec; fill is None, 'tozeroy' or 'toself' as in Plotly"""
+    return {'x': np.asarray(x, dtype=float).tolist(), 'y': np.asarray(y, dtype=float).tolist(),
+            'label': label, 'color': color, 'axis': axis, 'mode': mode, 'fill': fill,
+            'marker': marker, 'size': size}
+
+
+def _kinematics(inputs):
+    u, a, t = _number(inputs, 'u'), _number(inputs, 'a'), _number(inputs, 't')
+    if not t > 0:
+        return None
+    times = np.arange(50) * t / 50
+    return {
+        'title': (f"Kinematics Analysis | Final Velocity: {u + a * t:.2f} m/s "
+                  f"| Displacement: {u * t + 0.5 * a * t * t:.2f} m"),
+        'xlabel': 'Time (s)', 'ylabel': 'Velocity (m/s)', 'y2label': 'Displacement (m)',
+        'traces': [
+            _trace(times, u + a * times, 'Velocity (m/s)', '#90caf9', fill='tozeroy'),
+            _trace(times, u * times + 0.5 * a * times ** 2, 'Displacement (m)', '#ff9800',
+                   axis='y2', fill='tozeroy'),
+        ],
+    }
+
+
+def _freefall(inputs):
+    v0, g, t = _number(inputs, 'v0'), _number(inputs, 'g', 9.81), _number(inputs, 't')
+    if not t > 0:
+        return None
+    times = np.arange(50) * t / 50
+    return {
+        'title': 'Freefall Analysis', 'xlabel': 'Time (s)', 'ylabel': 'Velocity (m/s)',
+        'y2label': 'Height (m)',
+        'traces': [
+            _trace(times, v0 + g * times, 'Velocity (m/s)', '#90caf9', fill='tozeroy'),
+            _trace(times, v0 * times + 0.5 * g * times ** 2, 'Height (m)', '#4dd0e1',
+                   axis='y2', fill='tozeroy'),
+        ],
+    }
+
+
+def _work_energy(inputs):
+    mass, height = _number(inputs, 'mass'), _number(inputs, 'height')
+    velocity, g = _number(inputs, 'velocity'), _number(inputs, 'g', 9.81)
+    if not (mass > 0 and height > 0):
+        return None
+    steps = np.arange(50) / 50
+    return {
+        'title': 'Work and Energy Analysis', 'xlabel': 'Parameter', 'ylabel': 'Energy (J)',
+        'traces': [
+            _trace(steps * height, mass * g * steps * height, 'Potential Energy (J)', '#81c784',
+                   fill='tozeroy'),
+            _trace(steps * velocity, 0.5 * mass * velocity ** 2 * steps, 'Kinetic Energy (J)',
+                   '#ff7043', fill='tozeroy'),
+        ],
+    }
+
+
+def _momentum(inputs):
+    m1, v1 = _number(inputs, 'm1'), _number(inputs, 'v1')
+    if not (m1 > 0 and v1 > 0):
+        return None
+    masses = (np.arange(50) + 1) * m1 / 50
+    return {
+        'title': f"Momentum Analysis | Total Momentum: {m1 * v1:.2f} kg·m/s",
+        'xlabel': 'Mass (kg)', 'ylabel': 'Momentum (kg·m/s)',
+        'traces': [_trace(masses, masses * v1, 'Momentum (kg·m/s)', '#4dd0e1',
+                          mode='lines+markers', fill='tozeroy', size=5)],
+    }
+
+
+def _electricity(inputs):
+    v, r = _number(inputs, 'v'), _number(inputs, 'r')
+    if not r > 0:
+        return None
+    resistances = (np.arange(50) + 1) * r / 50
+    scale = 1.0 if v > 0 else 0.0
+    return {
+        'title': 'Electricity Analysis', 'xlabel': 'Resistance (Ω)', 'ylabel': 'Current (A)',
+        'y2label': 'Power (W)',
+        'traces': [
+            _trace(resistances, scale * v / resistances, 'Current (A)', '#64b5f6', fill='tozeroy'),
+            _trace(resistances, scale * v * v / resistances, 'Power (W)', '#ef5350', axis='y2',
+                   fill='tozeroy'),
+        ],
+    }
+
+
+def _vectors(inputs):
+    x, y, z = _number(inputs, 'x'), _number(inputs, 'y'), _number(inputs, 'z')
+    return {
+        'title': f"Vectors Analysis | Magnitude: {math.sqrt(x * x + y * y + z * z):.2f}",
+        'xlabel': 'X Component', 'ylabel': 'Y Component',
+        'traces': [_trace([0, x], [0, y], 'Vector', '#90caf9', mode='lines+markers', size=8)],
+    }
+
+
+def _projectile(inputs):
+    v0, theta, g = _number(inputs, 'v0'), _number(inputs, 'theta'), _number(inputs, 'g', 9.81)
+    if not (v0 > 0 and theta >= 0 and g > 0):
+        return None
+    theta = math.radians(theta)
+    flight = 2 * v0 * math.sin(theta) / g
+    distance = v0 * v0 * math.sin(2 * theta) / g
+    height = (v0 * math.sin(theta)) ** 2 / (2 * g)
+    times = np.arange(100) * flight / 100
+    return {
+        'title': f"Projectile Motion | Range: {distance:.2f} m | Max Height: {height:.2f} m",
+        'xlabel': 'Distance (m)', 'ylabel': 'Height (m)',
+        'traces': [
+            _trace(v0 * math.cos(theta) * times, v0 * math.sin(theta) * times - 0.5 * g * times ** 2,
+                   'Trajectory', '#64b5f6', fill='tozeroy'),
+            _trace([distance], [0], 'Landing', '#ff5722', mode='markers', marker='star', size=10),
+        ],
+    }
+
+
+def _circular(inputs):
+    v, r = _number(inputs, 'v'), _number(inputs, 'r')
+    if not (v > 0 and r > 0):
+        return None
+    angles = np.arange(100) * 2 * math.pi / 100
+    return {
+        'title': (f"Circular Motion | Period: {2 * math.pi * r / v:.3f} s "
+                  f"| Centripetal Accel: {v * v / r:.2f} m/s²"),
+        'xlabel': 'X (m)', 'ylabel': 'Y (m)', 'equal_aspect': True,
+        'traces': [
+            _trace(r * np.cos(angles), r * np.sin(angles), 'Circular Path', '#ba68c8', fill='toself'),
+            _trace([0], [0], 'Center', '#ff9800', mode='markers', marker='diamond', size=10),
+        ],
+    }
+
+
+def _oscillator(inputs):
+    kind = inputs.get('type', 'simple')
+    if kind not in ('simple', 'damped', 'driven'):
+        raise ValueError(f"Unknown oscillator type: {kind}")
+    function = getattr(Oscillator, kind)
+    params = {name: _number(inputs, name) for name in inspect.signature(function).parameters
+              if name != 't' and name in inputs}
+    t = np.linspace(0, _number(inputs, 't_max', 10.0), int(_number(inputs, 'points', 500)))
+    results = function(t, **params)
+    return {
+        'title': f"{kind.capitalize()} Oscillator", 'xlabel': 'Time (s)',
+        'ylabel': 'Displacement (m)', 'y2label': 'Velocity (m/s)',
+        'traces': [
+            _trace(t, results['displacement'], 'Displacement (m)', '#90caf9'),
+            _trace(t, results['velocity'], 'Velocity (m/s)', '#ff9800', axis='y2'),
+        ],
+    }
+
+
+PLOTS = {
+    'kinematics': _kinematics,
+    'freefall': _freefall,
+    'work_energy': _work_energy,
+    'momentum': _momentum,
+    'electricity': _electricity,
+    'vectors': _vectors,
+    'projectile': _projectile,
+    'circular': _circular,
+    'oscillator': _oscillator,
+}
+
+
+def plot_spec(module, inputs):
+    """
+    Describe a module's graph for the given inputs
+
+    Args:
+        module: Key of PLOTS (the calculation route name)
+        inputs: Dictionary of inputs in SI units (strings are accepted)
+
+    Returns:
+        dict: {'title', 'xlabel', 'ylabel', optional 'y2label' and
+            'equal_aspect', 'traces': [{'x', 'y', 'label', 'color', 'axis',
+            'mode', 'fill', 'marker', 'size'}]}
+
+    Raises:
+        ValueError: If the module has no graph or the inputs give nothing to plot
+    """
+    if module not in PLOTS:
+        raise ValueError(f"No graph for module: {module}")
+    spec = PLOTS[module](inputs)
+    if spec is None:
+        raise ValueError("Nothing to plot for these inputs!")
+    return spec
+
+
+# ==================== RENDERING ====================
+
+def render_options(width=None, height=None, dpi=None, theme=None):
+    """
+    Validate figure options, filling in the defaults
+
+    Raises:
+        ValueError: If a size, the dpi or the theme is out of range
+    """
+    options = {
+        'width': float(DEFAULT_OPTIONS['width'] if width in (None, '') else width),
+        'height': float(DEFAULT_OPTIONS['height'] if height in (None, '') else height),
+        'dpi': int(DEFAULT_OPTIONS['dpi'] if dpi in (None, '') else dpi),
+        'theme': theme or DEFAULT_OPTIONS['theme'],
+    }
+    low, high = SIZE_LIMITS
+    if not (low <= options['width'] <= high and low <= options['height'] <= high):
+        raise ValueError(f"Width and height must be between {low:g} and {high:g} inches!")
+    if not DPI_LIMITS[0] <= options['dpi'] <= DPI_LIMITS[1]:
+        raise ValueError(f"dpi must be between {DPI_LIMITS[0]} and {DPI_LIMITS[1]}!")
+    if options['theme'] not in THEMES:
+        raise ValueError(f"Unknown theme: {options['theme']}")
+    return options
+
+
+def spec_key(spec, fmt, options):
+    """SHA-256 of everything that determines the image bytes"""
+    payload = json.dumps([RENDER_VERSION, matplotlib.__version__, fmt, options, spec],
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def draw_figure(spec, width=8.0, height=5.0, dpi=100, theme='dark'):
+    """
+    Draw a plot spec on a new Figure (no pyplot, so no global state)
+
+    Returns:
+        Figure: Ready to save in any format
+    """
+    fig = Figure(figsize=(width, height), dpi=dpi, facecolor=THEMES[theme]['paper'])
+    draw_axes(fig.add_subplot(), spec, theme)
+    fig.tight_layout()
+    return fig
+
+
+def draw_axes(ax, spec, theme='dark'):
+    """Draw a plot spec's traces, labels and legend on existing axes"""
+    colors = THEMES[theme]
+    ax2 = ax.twinx() if any(trace['axis'] == 'y2' for trace in spec['traces']) else None
+
+    for trace in spec['traces']:
+        target = ax2 if trace['axis'] == 'y2' else ax
+        x, y = trace['x'], trace['y']
+        if 'lines' in trace['mode']:
+            target.plot(x, y, color=trace['color'], linewidth=2, label=trace['label'],
+                        marker='o' if 'markers' in trace['mode'] else None,
+                        markersize=trace['size'] or 5)
+        else:
+            target.scatter(x, y, color=trace['color'], label=trace['label'],
+                           marker=MARKERS.get(trace['marker'], 'o'), s=(trace['size'] or 8) ** 2,
+                           zorder=3)
+        if trace['fill'] == 'toself':
+            target.fill(x, y, color=trace['color'], alpha=0.1)
+        elif trace['fill'] == 'tozeroy':
+            target.fill_between(x, y, color=trace['color'], alpha=0.2)
+
+    for axes in filter(None, (ax, ax2)):
+        axes.set_facecolor(colors['plot'])
+        axes.tick_params(colors=colors['text'])
+        for spine in axes.spines.values():
+            spine.set_color(colors['grid'])
+    ax.grid(True, color=colors['grid'])
+    if ax2 is not None:
+        ax2.grid(False)
+        ax2.set_ylabel(spec.get('y2label', ''), color=colors['text'])
+    ax.set_title(spec['title'], color=colors['text'], fontsize=10)
+    ax.set_xlabel(spec['xlabel'], color=colors['text'])
+    ax.set_ylabel(spec['ylabel'], color=colors['text'])
+    if spec.get('equal_aspect'):
+        ax.set_aspect('equal', adjustable='datalim')
+
+    handles, labels = ax.get_legend_handles_labels()
+    if ax2 is not None:
+        more = ax2.get_legend_handles_labels()
+        handles, labels = handles + more[0], labels + more[1]
+    legend = ax.legend(handles, labels, loc='upper left', facecolor=colors['plot'],
+                       edgecolor=colors['grid'])
+    for text in legend.get_texts():
+        text.set_color(colors['text'])
+    add_watermark(ax)
+
+
+def render_figure(spec, fmt='png', width=8.0, height=5.0, dpi=100, theme='dark'):
+    """
+    Render a plot spec to image bytes
+
+    Args:
+        spec: Plot spec (see plot_spec)
+        fmt: 'png', 'svg' or 'pdf'
+        width, height: Figure size in inches
+        dpi: Resolution (PNG)
+        theme: 'dark' (like the web UI) or 'light' (for printing)
+
+    Returns:
+        bytes: The image. PDF and SVG output carry no creation date, so
+            the same spec always gives the same bytes.
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown image format: {fmt}")
+    fig = draw_figure(spec, width, height, dpi, theme)
+    metadata = {'png': None, 'svg': {'Date': None}, 'pdf': {'CreationDate': None}}[fmt]
+    buffer = io.BytesIO()
+    with matplotlib.rc_context({'svg.hashsalt': RENDER_VERSION}):
+        fig.savefig(buffer, format=fmt, facecolor=fig.get_facecolor(), metadata=metadata)
+    return buffer.getvalue()
+
+
+# ==================== CACHE ====================
+
+class RenderCache:
+    """
+    Rendered images on disk, one file per spec hash under root/<first two
+    digits>/, evicted least recently used first once their total size
+    exceeds max_bytes
+
+    Recency is the file's modification time, refreshed on every hit, so the
+    order survives restarts.
+    """
+
+    def __init__(self, root=RENDERS_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # path: size, oldest first; loaded from disk on first use
+        self._index = None
+        self._size = 0
+
+    def path(self, key, fmt):
+        return self.root / key[:2] / f'{key}.{fmt}'
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        files = []
+        if self.root.exists():
+            for path in self.root.glob('*/*.*'):
+                if path.suffix[1:] in FORMATS:
+                    stat = path.stat()
+                    files.append((stat.st_mtime, path, stat.st_size))
+        files.sort()
+        self._index = OrderedDict((path, size) for _, path, size in files)
+        self._size = sum(self._index.values())
+
+    def get(self, key, fmt):
+        """Cached image bytes, or None"""
+        path = self.path(key, fmt)
+        with self._lock:
+            self._load_index()
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                self._size -= self._index.pop(path, 0)
+                return None
+            if path not in self._index:
+                # Written by another process
+                self._index[path] = len(data)
+                self._size += len(data)
+            self._index.move_to_end(path)
+            return data
+
+    def put(self, key, fmt, data):
+        """
+        Store an image and evict the least recently used ones over the limit
+
+        Raises:
+            OSError: If the image cannot be written
+        """
+        path = self.path(key, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        temp.write_bytes(data)
+        os.replace(temp, path)
+        with self._lock:
+            self._load_index()
+            self._size += len(data) - self._index.pop(path, 0)
+            self._index[path] = len(data)
+            while self._size > self.max_bytes and len(self._index) > 1:
+                oldest, size = self._index.popitem(last=False)
+                self._size -= size
+                try:
+                    oldest.unlink()
+                except OSError:
+                    pass
+
+    def stats(self):
+        """{'files', 'bytes', 'max_bytes'}"""
+        with self._lock:
+            self._load_index()
+            return {'files': len(self._index), 'bytes': self._size, 'max_bytes': self.max_bytes}
+
+
+# ==================== SERVICE ====================
+
+class RenderService:
+    """
+    Render plot specs on a pool of worker processes through the cache
+
+    Concurrent requests for the same image share one render.
+    """
+
+    def __init__(self, cache=None, workers=RENDER_WORKERS, timeout=RENDER_TIMEOUT):
+        self.cache = cache if cache is not None else RenderCache()
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._renders = SingleFlight()
+        self.stats = {'hits': 0, 'renders': 0}
+
+    def _executor(self):
+        """Worker processes, started on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def render(self, spec, fmt='png', **options):
+        """
+        Image for a plot spec, from the cache or rendered by a worker
+
+        Args:
+            spec: Plot spec
+            fmt: 'png', 'svg' or 'pdf'
+            **options: width, height, dpi, theme (see render_options)
+
+        Returns:
+            tuple: (image bytes, spec hash)
+
+        Raises:
+            ValueError: If the format or an option is invalid, or matplotlib
+            is not installed
+        """
+        if not RENDER_AVAILABLE:
+            raise ValueError("Plot rendering needs matplotlib (pip install matplotlib)")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown image format: {fmt}")
+        options = render_options(**options)
+        key = spec_key(spec, fmt, options)
+        data = self.cache.get(key, fmt)
+        if data is not None:
+            self.stats['hits'] += 1
+            return data, key
+
+        def render():
+            future = self._executor().submit(render_figure, spec, fmt, **options)
+            image = future.result(timeout=self.timeout)
+            self.stats['renders'] += 1
+            try:
+                self.cache.put(key, fmt, image)
+            except OSError:
+                # Read-only filesystem: serve the image uncached
+                pass
+            return image
+
+        return self._renders.do(key, render)[0], key
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Render a module graph")
+    parser.add_argument('module', choices=sorted(PLOTS))
+    parser.add_argument('inputs', nargs='*', help="name=value inputs in SI units")
+    parser.add_argument('-o', '--output', required=True, help="Output .png, .svg or .pdf file")
+    parser.add_argument('--width', type=float)
+    parser.add_argument('--height', type=float)
+    parser.add_argument('--dpi', type=int)
+    parser.add_argument('--theme', choices=sorted(THEMES))
+    args = parser.parse_args(argv)
+
+    inputs = dict(item.split('=', 1) for item in args.inputs)
+    fmt = Path(args.output).suffix[1:].lower()
+    options = render_options(args.width, args.height, args.dpi, args.theme)
+    Path(args.output).write_bytes(render_figure(plot_spec(args.module, inputs), fmt, **options))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""
+History Reports
+Multi-page PDF reports of the calculation history: one page per entry with
+its graph (see utils.render) and its inputs and outputs. Pages are drawn on
+worker processes and written in history order into a single PdfPages file.
+The history is read as a stream and only a small window of pages is held
+in memory at a time, so a report of thousands of entries needs no more
+memory than one of ten.
+
+Usage:
+    python -m utils.report -o report.pdf [--module "Projectile Motion"] [--since 2026-01-01]
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.history import HISTORY_FILE
+from utils.render import RENDER_AVAILABLE, draw_axes, plot_spec
+from utils.result_store import ResultStore
+from utils.streaming import iter_json_array
+
+if RENDER_AVAILABLE:
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+# History module names and the graphs drawn for them
+HISTORY_PLOTS = {
+    'Kinematics': 'kinematics',
+    'Freefall Dynamics': 'freefall',
+    'Work and Energy': 'work_energy',
+    'Momentum': 'momentum',
+    'Electricity': 'electricity',
+    'Vectors': 'vectors',
+    'Projectile Motion': 'projectile',
+    'Circular Motion': 'circular',
+    'Oscillator': 'oscillator',
+}
+
+# A4 portrait, in inches
+PAGE_SIZE = (8.27, 11.69)
+# Pages in flight per worker: enough to keep the workers busy while the
+# parent writes, few enough that memory stays bounded
+PAGES_PER_WORKER = 2
+# Longest input/output value printed on a page
+MAX_VALUE_LENGTH = 80
+MAX_TABLE_ROWS = 40
+
+
+# ==================== HISTORY QUERY ====================
+
+def iter_entries(path=HISTORY_FILE, store=None):
+    """
+    Stream history entries from disk with stored results filled in
+
+    Args:
+        path: History file (a JSON array)
+        store: ResultStore for entries saved by hash (default: data/results)
+
+    Yields:
+        dict: History entries, oldest first
+    """
+    store = store if store is not None else ResultStore()
+    try:
+        with open(path, 'r') as f:
+            yield from store.expand_all(iter_json_array(f))
+    except (OSError, ValueError):
+        # A missing or unreadable history ends the report
+        return
+
+
+def select_entries(entries, modules=None, since=None, until=None, limit=None):
+    """
+    Filter history entries
+
+    Args:
+        entries: Iterable of history entries
+        modules: Module names to keep (default: all)
+        since, until: Inclusive timestamp bounds as 'YYYY-MM-DD' or
+            'YYYY-MM-DD HH:MM:SS'
+        limit: Stop after this many entries
+
+    Yields:
+        dict: Matching entries, in order
+    """
+    if isinstance(modules, str):
+        modules = [modules]
+    modules = set(modules) if modules else None
+    # Dates alone cover the whole day
+    if until is not None and len(until) == 10:
+        until = f'{until} 23:59:59'
+    count = 0
+    for entry in entries:
+        if limit is not None and count >= limit:
+            return
+        timestamp = entry.get('timestamp', '')
+        if modules is not None and entry.get('module') not in modules:
+            continue
+        if (since is not None and timestamp < since) or (until is not None and timestamp > until):
+            continue
+        count += 1
+        yield entry
+
+
+# ==================== PAGES ====================
+
+def _format_value(value):
+    if isinstance(value, float):
+        text = f'{value:.6g}'
+    else:
+        text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH - 3] + '...'
+
+
+def _table_lines(heading, values):
+    if not isinstance(values, dict) or not values:
+        return []
+    lines = [heading]
+    for name, value in list(values.items())[:MAX_TABLE_ROWS]:
+        lines.append(f'  {name}: {_format_value(value)}')
+    if len(values) > MAX_TABLE_ROWS:
+        lines.append(f'  ... {len(values) - MAX_TABLE_ROWS} more')
+    return lines
+
+
+def entry_spec(entry):
+    """Plot spec of a history entry, or None when it has no graph"""
+    if entry.get('module') not in HISTORY_PLOTS or not isinstance(entry.get('inputs'), dict):
+        return None
+    try:
+        return plot_spec(HISTORY_PLOTS[entry['module']], entry['inputs'])
+    except (TypeError, ValueError):
+        # Inputs that give nothing to plot still get their table
+        return None
+
+
+def draw_page(entry, number=None):
+    """
+    One report page: the entry's module and time, its graph when the module
+    has one, and its inputs and outputs
+
+    Returns:
+        tuple: (A4 page Figure, True if it has a graph)
+    """
+    fig = Figure(figsize=PAGE_SIZE, facecolor='white')
+    heading = f"{entry.get('module', 'Calculation')}"
+    if number is not None:
+        heading = f'{number}. {heading}'
+    fig.text(0.08, 0.95, heading, fontsize=16, weight='bold', va='top')
+    fig.text(0.08, 0.925, entry.get('timestamp', ''), fontsize=10, color='#555555', va='top')
+
+    spec = entry_spec(entry)
+    if spec is not None:
+        draw_axes(fig.add_axes([0.12, 0.52, 0.76, 0.36]), spec, theme='light')
+        table_top = 0.45
+    else:
+        table_top = 0.88
+
+    lines = (_table_lines('Inputs', entry.get('inputs'))
+             + [''] + _table_lines('Outputs', entry.get('outputs')))
+    fig.text(0.08, table_top, '\n'.join(lines).strip(), fontsize=9, family='monospace',
+             va='top', linespacing=1.4)
+    return fig, spec is not None
+
+
+def _render_page(task):
+    """Worker entry point: draw one page and return it pickled"""
+    fig, has_graph = draw_page(*task)
+    return pickle.dumps(fig, protocol=pickle.HIGHEST_PROTOCOL), has_graph
+
+
+# ==================== REPORT ====================
+
+def build_report(entries, output, title='Calculation Report', workers=None, progress=None,
+                 total=None):
+    """
+    Write a multi-page PDF with one page per history entry
+
+    Pages are drawn in parallel; the parent process writes them to the
+    PDF in order as they arrive. At most PAGES_PER_WORKER pages per worker
+    are in flight, and entries are pulled from the iterable only as pages
+    are needed.
+
+    Args:
+        entries: Iterable of history entries (e.g. select_entries(iter_entries()))
+        output: File path or binary file object
+        title: PDF document title
+        workers: Worker processes (default: all cores; 1 draws in this process)
+        progress: Optional callback progress(done, total) after each page;
+            exceptions it raises (e.g. to cancel) stop the report
+        total: Number of entries, passed on to progress when known
+
+    Returns:
+        dict: {'pages', 'graphs', 'elapsed'}
+
+    Raises:
+        ValueError: If matplotlib is not installed
+    """
+    if not RENDER_AVAILABLE:
+        raise ValueError("PDF reports need matplotlib (pip install matplotlib)")
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    began = time.perf_counter()
+    tasks = ((entry, number) for number, entry in enumerate(entries, start=1))
+    pages = graphs = 0
+
+    metadata = {'Title': title, 'Creator': 'Physics Lab', 'CreationDate': None}
+    with PdfPages(output, metadata=metadata) as pdf:
+        def write(page, has_graph):
+            nonlocal pages, graphs
+            pdf.savefig(page)
+            pages += 1
+            graphs += bool(has_graph)
+            if progress is not None:
+                progress(pages, total)
+
+        if workers == 1:
+            for entry, number in tasks:
+                write(*draw_page(entry, number))
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=multiprocessing.get_context('spawn'))
+            try:
+                pending = deque()
+                for task in tasks:
+                    pending.append(executor.submit(_render_page, task))
+                    if len(pending) >= workers * PAGES_PER_WORKER:
+                        data, has_graph = pending.popleft().result()
+                        write(pickle.loads(data), has_graph)
+                while pending:
+                    data, has_graph = pending.popleft().result()
+                    write(pickle.loads(data), has_graph)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+    return {'pages': pages, 'graphs': graphs, 'elapsed': time.perf_counter() - began}
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="PDF report of the calculation history")
+    parser.add_argument('-o', '--output', required=True, help="Output .pdf file")
+    parser.add_argument('--history', default=str(HISTORY_FILE))
+    parser.add_argument('--module', action='append', help="Module name (repeatable)")
+    parser.add_argument('--since', help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument('--until', help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--title', default='Calculation Report')
+    args = parser.parse_args(argv)
+
+    def query():
+        return select_entries(iter_entries(args.history), args.module, args.since, args.until,
+                              args.limit)
+
+    total = sum(1 for _ in query())
+
+    def progress(done, total):
+        print(f"\r{done}/{total} pages", end='', flush=True)
+
+    report = build_report(query(), args.output, title=args.title, workers=args.workers,
+                          progress=progress, total=total)
+    print(f"\nWrote {args.output}: {report['pages']} pages ({report['graphs']} with graphs) "
+          f"in {report['elapsed']:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
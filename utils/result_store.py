@@ -0,0 +1,198 @@
+"""
+Content-Addressed Result Store
+Calculation results kept once per distinct calculation, addressed by the
+hash of the engine version, module and canonical inputs (see
+utils.singleflight). History entries refer to results by hash instead of
+repeating them.
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.http_cache import ENGINE_VERSION
+from utils.singleflight import canonical_key
+
+RESULTS_DIR = Path('data/results')
+# Results kept in memory for repeated lookups (a few MB of JSON)
+CACHE_SIZE = 4096
+# History entries expanded together, sharing one cache lookup and reading
+# each distinct result file once
+EXPAND_BATCH = 256
+HEX_DIGITS = '0123456789abcdef'
+
+
+class ResultStore:
+    """
+    Results on disk, one file per hash under root/<first two digits>/
+
+    A hash always maps to the same inputs and outputs, so a result is
+    written once and never changes; later puts of the same calculation
+    only look it up. The engine version is part of the hash, so a release
+    that changes a formula stores its results under new hashes. Recently
+    used results are also kept in an LRU cache.
+    """
+
+    def __init__(self, root=RESULTS_DIR, cache_size=CACHE_SIZE):
+        self.root = Path(root)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        # Keys are SHA-256 hex digests; refuse anything else
+        if not isinstance(key, str) or len(key) != 64 or not all(c in HEX_DIGITS for c in key):
+            raise ValueError(f"Unknown result: {key}")
+        return self.root / key[:2] / f'{key}.json'
+
+    def _remember(self, key, record):
+        with self._lock:
+            self._cache[key] = record
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def put(self, module, inputs, outputs):
+        """
+        Store a result unless the same calculation is already stored
+
+        Args:
+            module: Module name
+            inputs: Request inputs (JSON-serializable)
+            outputs: Calculation outputs (JSON-serializable)
+
+        Returns:
+            str: Hash of the engine version, module and canonical inputs
+
+        Raises:
+            OSError: If the result cannot be written
+        """
+        key = canonical_key(module, {'engine': ENGINE_VERSION, 'inputs': inputs})
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return key
+        record = {'module': module, 'inputs': inputs, 'outputs': outputs}
+        path = self._path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temporary name, so concurrent writers never clash
+            temp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temp, 'w') as f:
+                json.dump(record, f)
+            os.replace(temp, path)
+        self._remember(key, record)
+        return key
+
+    def get(self, key):
+        """
+        Look up a result by hash
+
+        Returns:
+            dict: {'module', 'inputs', 'outputs'}
+
+        Raises:
+            ValueError: If no result has this hash
+        """
+        path = self._path(key)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"Unknown result: {key}")
+        self._remember(key, record)
+        return record
+
+    def get_many(self, keys):
+        """
+        Look up several results at once
+
+        Cached results are taken under one lock and the rest are read from
+        disk once each.
+
+        Returns:
+            dict: Hash: result for every hash that is stored
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    found[key] = self._cache[key]
+                else:
+                    missing.append(key)
+        loaded = {}
+        for key in missing:
+            try:
+                with open(self._path(key), 'r') as f:
+                    loaded[key] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        with self._lock:
+            for key, record in loaded.items():
+                self._cache[key] = record
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        found.update(loaded)
+        return found
+
+    def expand(self, entry):
+        """
+        History entry with its inputs and outputs filled in from the store
+
+        Entries without a hash (or whose result is missing) are returned
+        unchanged.
+        """
+        if 'hash' not in entry or 'outputs' in entry:
+            return entry
+        try:
+            record = self.get(entry['hash'])
+        except ValueError:
+            return entry
+        return dict(entry, inputs=record['inputs'], outputs=record['outputs'])
+
+    def expand_all(self, entries, batch_size=EXPAND_BATCH):
+        """
+        Expand a stream of history entries (see expand) in batches
+
+        Each batch looks up its results with one get_many(), so a result
+        shared by many entries is read at most once per batch and a long
+        history costs one cache pass per batch rather than per entry.
+
+        Yields:
+            dict: The entries, in order
+        """
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield from self._expand_batch(batch)
+                batch = []
+        yield from self._expand_batch(batch)
+
+    def _expand_batch(self, batch):
+        records = self.get_many({entry['hash'] for entry in batch
+                                 if 'hash' in entry and 'outputs' not in entry})
+        for entry in batch:
+            record = records.get(entry.get('hash')) if 'outputs' not in entry else None
+            if record is None:
+                yield entry
+            else:
+                yield dict(entry, inputs=record['inputs'], outputs=record['outputs'])
+
+    def clear(self):
+        """Delete every stored result (e.g. when the history is cleared)"""
+        with self._lock:
+            self._cache.clear()
+            # A put racing with this may leave its file behind or fail with
+            # OSError, which callers already handle
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,301 @@
+"""
+Response Serialization
+Encoders for JSON (orjson when installed), MessagePack and a compact binary
+array format, chosen per request from the Accept header. NumPy arrays and
+scalars are serialized directly, without converting them to lists first.
+
+Usage:
+    python -m utils.serialization --benchmark
+"""
+
+import argparse
+import json
+import struct
+import time
+
+import numpy as np
+
+from utils.batch import to_serializable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+BINARY_MIMETYPE = 'application/vnd.physics-lab.arrays'
+
+# Format name: mimetypes that select it (the first is the one sent back)
+FORMATS = {
+    'json': (JSON_MIMETYPE,),
+    'msgpack': (MSGPACK_MIMETYPE, 'application/x-msgpack'),
+    'binary': (BINARY_MIMETYPE,),
+}
+
+# Binary array format: magic, version, header length, JSON header, array data
+BINARY_MAGIC = b'PLAB'
+BINARY_VERSION = 1
+BINARY_PREFIX = struct.Struct('<4sB3xI')
+BINARY_ALIGN = 8
+BINARY_DTYPES = ('f', 'i', 'u', 'b')
+
+
+def available_formats():
+    """Formats that can be produced with the installed packages"""
+    return [name for name in FORMATS if name != 'msgpack' or msgpack is not None]
+
+
+def negotiate(accept_mimetypes):
+    """
+    Pick a response format from the Accept header
+
+    Args:
+        accept_mimetypes: request.accept_mimetypes
+
+    Returns:
+        str: 'json', 'msgpack' or 'binary'. JSON wins ties, so browsers and
+            clients sending */* keep getting JSON.
+    """
+    offered = [mimetype for name in available_formats() for mimetype in FORMATS[name]]
+    best = accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+    for name, mimetypes in FORMATS.items():
+        if best in mimetypes:
+            return name
+    return 'json'
+
+
+def _plain(obj):
+    """orjson/msgpack fallback for values they cannot write natively
+    (non-contiguous arrays, float16, object arrays, sets, ...)"""
+    if isinstance(obj, np.ndarray):
+        return to_serializable(obj)
+    if isinstance(obj, np.generic):
+        return to_serializable(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def encode_json(obj):
+    """
+    Encode as JSON bytes, with NaN written as null
+
+    Uses orjson (with native NumPy support) when it is installed and the
+    standard library otherwise.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_plain,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the standard library handles them
+            pass
+    return json.dumps(to_serializable(obj), separators=(',', ':')).encode('utf-8')
+
+
+def encode_msgpack(obj):
+    """
+    Encode as MessagePack bytes
+
+    Raises:
+        ValueError: If msgpack is not installed
+    """
+    if msgpack is None:
+        raise ValueError("MessagePack needs msgpack (pip install msgpack)")
+    return msgpack.packb(to_serializable(obj), use_bin_type=True)
+
+
+def _extract_arrays(obj, arrays):
+    """Replace every numeric array with {"$array": index} and collect it"""
+    if isinstance(obj, dict):
+        return {key: _extract_arrays(value, arrays) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_extract_arrays(value, arrays) for value in obj]
+    if isinstance(obj, np.ndarray) and obj.ndim and obj.dtype.kind in BINARY_DTYPES:
+        arrays.append(obj)
+        return {'$array': len(arrays) - 1}
+    return to_serializable(obj)
+
+
+def encode_binary(obj):
+    """
+    Encode in the compact binary array format
+
+    Layout (little-endian):
+        4 bytes   magic b'PLAB'
+        1 byte    version (1), then 3 padding bytes
+        uint32    header length
+        header    UTF-8 JSON {"payload": ..., "arrays": [...]}, padded with
+                  spaces to a multiple of 8 bytes
+        data      raw C-order array bytes, each starting at a multiple of 8
+
+    In the payload each numeric array is replaced by {"$array": i}; entry i
+    of "arrays" gives its dtype (NumPy notation, e.g. "<f8"), shape and
+    byte offset from the start of the data section. NaN stays NaN, and
+    arrays can be read with zero-copy views (e.g. a JavaScript
+    Float64Array over the response buffer).
+    """
+    arrays = []
+    payload = _extract_arrays(obj, arrays)
+    descriptors = []
+    offset = 0
+    for index, array in enumerate(arrays):
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        arrays[index] = array
+        descriptors.append({'dtype': array.dtype.str, 'shape': list(array.shape),
+                            'offset': offset, 'nbytes': array.nbytes})
+        offset += -(-array.nbytes // BINARY_ALIGN) * BINARY_ALIGN
+
+    header = encode_json({'payload': payload, 'arrays': descriptors})
+    start = BINARY_PREFIX.size + len(header)
+    header += b' ' * (-start % BINARY_ALIGN)
+    parts = [BINARY_PREFIX.pack(BINARY_MAGIC, BINARY_VERSION, len(header)), header]
+    for array, descriptor in zip(arrays, descriptors):
+        parts.append(array.tobytes())
+        parts.append(b'\0' * (-descriptor['nbytes'] % BINARY_ALIGN))
+    return b''.join(parts)
+
+
+def decode_binary(data):
+    """
+    Decode the binary array format
+
+    Returns:
+        The payload with NumPy arrays (read-only views of data) in place
+        of the array references
+
+    Raises:
+        ValueError: If the data is not in this format
+    """
+    if len(data) < BINARY_PREFIX.size:
+        raise ValueError("Not a binary array response!")
+    magic, version, length = BINARY_PREFIX.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Not a binary array response!")
+    start = BINARY_PREFIX.size + length
+    header = json.loads(bytes(data[BINARY_PREFIX.size:start]))
+    buffer = memoryview(data)[start:]
+    arrays = [
+        np.frombuffer(buffer, dtype=np.dtype(d['dtype']), count=int(np.prod(d['shape'])),
+                      offset=d['offset']).reshape(d['shape'])
+        for d in header['arrays']
+    ]
+
+    def restore(obj):
+        if isinstance(obj, dict):
+            if set(obj) == {'$array'}:
+                return arrays[obj['$array']]
+            return {key: restore(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [restore(value) for value in obj]
+        return obj
+
+    return restore(header['payload'])
+
+
+ENCODERS = {
+    'json': encode_json,
+    'msgpack': encode_msgpack,
+    'binary': encode_binary,
+}
+
+
+def encode(obj, format_name='json'):
+    """
+    Serialize a response payload
+
+    Returns:
+        tuple: (bytes, mimetype)
+
+    Raises:
+        ValueError: If the format is unknown or unavailable
+    """
+    if format_name not in ENCODERS:
+        raise ValueError(f"Unknown format: {format_name}")
+    return ENCODERS[format_name](obj), FORMATS[format_name][0]
+
+
+def decode(data, mimetype):
+    """Decode a response body produced by encode()"""
+    if mimetype == BINARY_MIMETYPE:
+        return decode_binary(data)
+    if mimetype in FORMATS['msgpack']:
+        if msgpack is None:
+            raise ValueError("MessagePack needs msgpack (pip install msgpack)")
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+# ==================== BENCHMARK ====================
+
+def _payloads(rows=100000):
+    """Typical responses: a scalar result, a trajectory and a sweep"""
+    from modules.projectile_motion import ProjectileMotion
+    from utils import jit
+
+    theta = np.linspace(0, 90, rows)
+    sweep = dict(ProjectileMotion.calculate_batch(v0=20.0, theta=theta), theta=theta)
+    simulation = jit.simulate(backend='numpy', system='pendulum', x0=1.0, steps=5000)
+    return {
+        'scalar': {'success': True, 'data': ProjectileMotion.calculate(v0=20, theta=45)},
+        'trajectory': {'success': True, 'data': simulation},
+        'sweep': {'success': True, 'data': sweep},
+    }
+
+
+def _stdlib(obj):
+    """The previous path: convert to lists, then the standard library encoder"""
+    return json.dumps(to_serializable(obj)).encode('utf-8')
+
+
+def benchmark(rows=100000, repeat=5):
+    """
+    Time each encoder on typical payloads
+
+    Returns:
+        dict: {payload: {encoder: {'seconds': best of repeat, 'bytes': size}}}
+    """
+    encoders = {'stdlib json': _stdlib}
+    if orjson is not None:
+        encoders['orjson'] = encode_json
+    if msgpack is not None:
+        encoders['msgpack'] = encode_msgpack
+    encoders['binary'] = encode_binary
+
+    report = {}
+    for name, payload in _payloads(rows).items():
+        report[name] = {}
+        for encoder_name, encoder in encoders.items():
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = encoder(payload)
+                best = min(best, time.perf_counter() - start)
+            report[name][encoder_name] = {'seconds': best, 'bytes': len(body)}
+    return report
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Response serialization formats")
+    parser.add_argument('--benchmark', action='store_true', help="Compare the encoders")
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"Formats: {', '.join(available_formats())} (JSON encoder: "
+          f"{'orjson' if orjson is not None else 'standard library'})")
+    if args.benchmark:
+        for payload, results in benchmark(args.rows).items():
+            print(f"\n{payload}")
+            for encoder, result in results.items():
+                print(f"  {encoder:>12} {result['seconds'] * 1000:10.3f} ms {result['bytes']:>12,} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Request Coalescing
+Concurrent requests for the same calculation wait on one computation (a
+"single flight") and share its result instead of each computing it.
+"""
+
+import hashlib
+import json
+import math
+import threading
+
+
+def canonical_inputs(value):
+    """
+    Normalize request inputs so equivalent requests compare equal
+
+    Numbers and numeric strings become floats (2, 2.0 and "2" are the same
+    input, as the routes read them all with float()), dictionary order is
+    ignored and anything else is kept as its string form.
+
+    Args:
+        value: Decoded request data (dicts, lists, numbers, strings)
+
+    Returns:
+        A JSON-serializable structure with a single form per input
+    """
+    if isinstance(value, dict):
+        return {str(key): canonical_inputs(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical_inputs(item) for item in value]
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        value = number
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if not math.isfinite(number):
+        return repr(number)
+    # -0.0 and 0.0 give the same results everywhere in the modules
+    return number + 0.0
+
+
+def canonical_key(module, inputs):
+    """
+    Hash identifying a calculation
+
+    Args:
+        module: Route or module name
+        inputs: Request inputs (after unit conversion)
+
+    Returns:
+        str: SHA-256 hex digest of the module and canonical inputs
+    """
+    text = json.dumps([module, canonical_inputs(inputs)], sort_keys=True,
+                      separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    """One in-flight computation"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key
+
+    The first caller for a key runs the function; callers that arrive while
+    it is running block until it finishes and receive the same result (or
+    the same exception). Nothing is cached once the call completes, so a
+    later request computes afresh.
+
+    Results are shared between requests, so callers must not modify them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {'computed': 0, 'shared': 0}
+
+    def do(self, key, function):
+        """
+        Run function() once for all concurrent callers with this key
+
+        Returns:
+            tuple: (result, True if it was computed by another caller)
+
+        Raises:
+            Whatever function() raised, in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['computed'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        """Number of calculations currently running"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,146 @@
+"""
+Streaming Response Utilities
+Newline-delimited JSON (NDJSON) for large batch and history results
+"""
+
+import json
+
+import numpy as np
+
+from utils.batch import to_serializable
+from utils.serialization import encode_json
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+ROW_CHUNK = 1000
+WHITESPACE = ' \t\r\n'
+
+
+def wants_ndjson(accept_mimetypes):
+    """
+    Check whether the client prefers NDJSON over a single JSON document
+
+    Args:
+        accept_mimetypes: request.accept_mimetypes
+
+    Returns:
+        bool: True if application/x-ndjson is the best match (JSON wins ties,
+            so browsers and clients sending */* keep getting JSON)
+    """
+    best = accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def ndjson_lines(records, chunk_size=ROW_CHUNK):
+    """
+    Serialize records as NDJSON text
+
+    Args:
+        records: Iterable of JSON-serializable objects
+        chunk_size: Number of lines joined into each yielded string
+
+    Yields:
+        str: One or more complete lines
+    """
+    lines = []
+    for record in records:
+        lines.append(encode_json(record).decode('utf-8'))
+        if len(lines) >= chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_rows(results, length=None, keys=None, chunk_size=ROW_CHUNK):
+    """
+    Split a dictionary of result arrays into one record per row
+
+    Values that are not row columns (summaries such as the energy drift) are
+    sent first as a single {"meta": {...}} record.
+
+    Args:
+        results: Dictionary of arrays and scalars
+        length: Number of rows; arrays with this leading dimension are row
+            columns (ignored when keys is given)
+        keys: Explicit row column names
+        chunk_size: Rows converted to Python values at a time
+
+    Yields:
+        dict: The meta record (if any), then {column: value} for each row
+    """
+    if keys is None:
+        keys = [
+            key for key, value in results.items()
+            if np.ndim(value) and len(value) == length
+        ]
+    meta = {key: value for key, value in results.items() if key not in keys}
+    if meta:
+        yield {'meta': to_serializable(meta)}
+
+    rows = len(results[keys[0]]) if keys else 0
+    for start in range(0, rows, chunk_size):
+        columns = [
+            to_serializable(np.asarray(results[key][start:start + chunk_size]))
+            for key in keys
+        ]
+        for values in zip(*columns):
+            yield dict(zip(keys, values))
+
+
+def iter_json_array(stream, read_size=64 * 1024):
+    """
+    Iterate over the items of a JSON array without loading the whole file
+
+    Args:
+        stream: Text file object containing one JSON array
+        read_size: Characters read per step
+
+    Yields:
+        Each decoded item in order
+
+    Raises:
+        ValueError: If the stream is not a valid JSON array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in WHITESPACE:
+            position += 1
+
+        end = None
+        if position < len(buffer):
+            char = buffer[position]
+            if not started:
+                if char != '[':
+                    raise ValueError("Expected a JSON array!")
+                started = True
+                position += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                position += 1
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                pass
+            # A complete item is safe unless it runs to the end of the buffer
+            # (a number such as 12 may continue in the next read)
+            if end is not None and (end < len(buffer) or eof):
+                position = end
+                yield item
+                continue
+
+        if eof:
+            if started:
+                raise ValueError("Invalid JSON array!")
+            return
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
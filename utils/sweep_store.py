@@ -0,0 +1,238 @@
+"""
+Sweep Result Files
+Large sweep results stored once as .npy files and read back through memory
+maps, so they neither stay in Python memory nor get serialized again for
+every client. Each sweep has:
+
+    <key>.npy        Output columns as one (columns, rows) array, so every
+                     column's rows are contiguous in the file
+    <key>.masks.npy  Input warning masks (uint32 per row), when the module
+                     has warning rules
+    <key>.json       Sidecar: column names, dtype, byte offsets and the swept
+                     axis. Written last, so a sweep with a sidecar is complete.
+
+Clients can fetch byte ranges of the .npy file directly (HTTP Range) or ask
+for a slice of rows and columns, which reads only those pages of the file.
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+SWEEPS_DIR = Path('data/sweeps')
+HEX_DIGITS = '0123456789abcdef'
+# Parts of a stored sweep and their file suffixes
+PARTS = {'data': '.npy', 'masks': '.masks.npy', 'meta': '.json'}
+
+
+def _write_atomic(path, write):
+    """Write to a unique temporary file, then move it into place"""
+    temp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        write(temp)
+        os.replace(temp, path)
+    finally:
+        if temp.exists():
+            temp.unlink()
+
+
+class SweepStore:
+    """
+    Sweep result files under root/<first two digits of the key>/
+
+    Keys are the hashes of the engine version, module and canonical inputs
+    (see utils.singleflight.canonical_key), so a key always holds the same
+    results and a stored sweep is never rewritten.
+    """
+
+    def __init__(self, root=SWEEPS_DIR):
+        self.root = Path(root)
+
+    def path(self, key, part='data'):
+        """
+        File of one part ('data', 'masks' or 'meta') of a stored sweep
+
+        Raises:
+            ValueError: If the key is not a hash or the part is unknown
+        """
+        # Keys are SHA-256 hex digests; refuse anything else
+        if not isinstance(key, str) or len(key) != 64 or not all(c in HEX_DIGITS for c in key):
+            raise ValueError(f"Unknown sweep: {key}")
+        if part not in PARTS:
+            raise ValueError(f"Unknown sweep file: {part}")
+        return self.root / key[:2] / f'{key}{PARTS[part]}'
+
+    def put(self, key, module, results, masks=None, sweep=None, report=None):
+        """
+        Store a float32 or float64 sweep unless it is already stored
+
+        Args:
+            key: Hash of the module and inputs
+            module: Batch module name
+            results: Dictionary of equal-length 1-D output arrays
+            masks: uint32 warning masks per row, or None
+            sweep: The swept input {'name', 'start', 'stop', 'points'}, or None
+            report: Scaling report (JSON-serializable)
+
+        Returns:
+            dict: The sidecar metadata
+
+        Raises:
+            ValueError: If the results are not equal-length float arrays
+            OSError: If the files cannot be written
+        """
+        meta_path = self.path(key, 'meta')
+        if meta_path.exists():
+            return self.metadata(key)
+
+        names = list(results)
+        arrays = [np.asarray(results[name]) for name in names]
+        if not arrays or any(a.ndim != 1 or a.dtype.kind != 'f' for a in arrays):
+            raise ValueError("Only float32 and float64 sweeps can be stored!")
+        rows = arrays[0].size
+        if any(a.size != rows for a in arrays):
+            raise ValueError("Sweep columns must have matching lengths!")
+        dtype = np.result_type(*arrays)
+
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        offset = {}
+
+        def write_data(temp):
+            out = np.lib.format.open_memmap(temp, mode='w+', dtype=dtype, shape=(len(names), rows))
+            for index, array in enumerate(arrays):
+                out[index] = array
+            out.flush()
+            offset['data'] = out.offset
+            del out
+
+        _write_atomic(self.path(key, 'data'), write_data)
+        if masks is not None:
+            def write_masks(temp):
+                # An open file, as np.save() would add .npy to the temporary name
+                with open(temp, 'wb') as f:
+                    np.save(f, np.asarray(masks, dtype=np.uint32))
+
+            _write_atomic(self.path(key, 'masks'), write_masks)
+
+        itemsize = dtype.itemsize
+        axis = None
+        if sweep:
+            points = int(sweep['points'])
+            start, stop = float(sweep['start']), float(sweep['stop'])
+            axis = {'name': sweep['name'], 'start': start, 'stop': stop, 'points': points,
+                    'step': (stop - start) / (points - 1) if points > 1 else 0.0}
+        meta = {
+            'key': key,
+            'module': module,
+            'rows': rows,
+            'dtype': dtype.str,
+            'columns': {
+                name: {'index': index, 'offset': offset['data'] + index * rows * itemsize}
+                for index, name in enumerate(names)
+            },
+            'row_bytes': itemsize,
+            'data_offset': offset['data'],
+            'masks': masks is not None,
+            'axis': axis,
+            'report': report
+        }
+
+        def write_meta(temp):
+            with open(temp, 'w') as f:
+                json.dump(meta, f)
+
+        _write_atomic(meta_path, write_meta)
+        return meta
+
+    def metadata(self, key):
+        """
+        Sidecar of a stored sweep
+
+        Raises:
+            ValueError: If no sweep has this key
+        """
+        try:
+            with open(self.path(key, 'meta'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"Unknown sweep: {key}")
+
+    def row_range(self, meta, start=None, stop=None, low=None, high=None):
+        """
+        Rows [start, stop) of a sweep, by row number or by swept value
+
+        Args:
+            meta: Sidecar of the sweep
+            start, stop: Row numbers (negative counts from the end)
+            low, high: Swept-input bounds, inclusive (sweeps only)
+
+        Returns:
+            tuple: (start, stop), clipped to the stored rows
+
+        Raises:
+            ValueError: If value bounds are given for a sweep without an axis
+        """
+        rows = meta['rows']
+        start, stop, _ = slice(start, stop).indices(rows)
+        if low is None and high is None:
+            return start, stop
+        axis = meta['axis']
+        if axis is None:
+            raise ValueError("Only sweeps can be sliced by value!")
+        if axis['step'] == 0:
+            return start, stop
+        # Row i holds start + i * step; the step may be negative
+        bounds = [(value - axis['start']) / axis['step'] for value in (low, high) if value is not None]
+        if low is not None and high is not None:
+            first, last = sorted(bounds)
+        elif (low is not None) == (axis['step'] > 0):
+            first, last = bounds[0], rows - 1
+        else:
+            first, last = 0, bounds[0]
+        # Tolerate rounding of values that fall on a row
+        first = max(start, math.ceil(first - 1e-9))
+        last = min(stop - 1, math.floor(last + 1e-9))
+        return (first, last + 1) if last >= first else (first, first)
+
+    def read(self, key, columns=None, start=None, stop=None, step=None, low=None, high=None):
+        """
+        Read some rows and columns of a stored sweep through a memory map
+
+        Only the pages of the file holding the requested rows are read.
+
+        Args:
+            key: Sweep key
+            columns: Column names (default: all); 'warning_masks' reads the masks
+            start, stop, step: Row slice
+            low, high: Swept-input bounds (see row_range)
+
+        Returns:
+            tuple: (dict of arrays, sidecar)
+
+        Raises:
+            ValueError: If the sweep or a column is unknown, or step < 1
+        """
+        meta = self.metadata(key)
+        names = list(meta['columns']) if columns is None else list(columns)
+        for name in names:
+            if name not in meta['columns'] and not (name == 'warning_masks' and meta['masks']):
+                raise ValueError(f"Unknown column: {name}")
+        step = 1 if step is None else int(step)
+        if step < 1:
+            raise ValueError("Step must be at least 1!")
+        first, last = self.row_range(meta, start, stop, low, high)
+        rows = slice(first, last, step)
+
+        data = np.load(self.path(key, 'data'), mmap_mode='r')
+        masks = np.load(self.path(key, 'masks'), mmap_mode='r') if 'warning_masks' in names else None
+        arrays = {}
+        for name in names:
+            if name == 'warning_masks':
+                arrays[name] = np.array(masks[rows])
+            else:
+                arrays[name] = np.array(data[meta['columns'][name]['index'], rows])
+        return arrays, meta
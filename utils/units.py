@@ -0,0 +1,419 @@
+"""
+Unit Registry and Quantities
+Dimension-aware units with composite unit parsing (e.g. kN·m, km/h², J/(kg·K))
+"""
+
+import math
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from utils.validators import parse_float_array
+
+# Exponents are stored in this order in every dimension tuple
+DIMENSIONS = ('length', 'mass', 'time', 'current', 'temperature', 'amount')
+
+DIMENSIONLESS = (0, 0, 0, 0, 0, 0)
+
+
+def _dim(L=0, M=0, T=0, I=0, K=0, N=0):
+    return (L, M, T, I, K, N)
+
+
+# symbol: (factor to SI, dimension exponents)
+UNITS = {
+    # Base units
+    "m": (1.0, _dim(L=1)),
+    "g": (1e-3, _dim(M=1)),
+    "s": (1.0, _dim(T=1)),
+    "A": (1.0, _dim(I=1)),
+    "K": (1.0, _dim(K=1)),
+    "mol": (1.0, _dim(N=1)),
+    # Derived SI units
+    "N": (1.0, _dim(L=1, M=1, T=-2)),
+    "J": (1.0, _dim(L=2, M=1, T=-2)),
+    "W": (1.0, _dim(L=2, M=1, T=-3)),
+    "Pa": (1.0, _dim(L=-1, M=1, T=-2)),
+    "Hz": (1.0, _dim(T=-1)),
+    "C": (1.0, _dim(T=1, I=1)),
+    "V": (1.0, _dim(L=2, M=1, T=-3, I=-1)),
+    "Ω": (1.0, _dim(L=2, M=1, T=-3, I=-2)),
+    "ohm": (1.0, _dim(L=2, M=1, T=-3, I=-2)),
+    "L": (1e-3, _dim(L=3)),
+    # Angles
+    "rad": (1.0, DIMENSIONLESS),
+    "deg": (math.pi / 180, DIMENSIONLESS),
+    "°": (math.pi / 180, DIMENSIONLESS),
+    # Time
+    "min": (60.0, _dim(T=1)),
+    "h": (3600.0, _dim(T=1)),
+    "hr": (3600.0, _dim(T=1)),
+    "day": (86400.0, _dim(T=1)),
+    # Imperial and other common units
+    "in": (0.0254, _dim(L=1)),
+    "ft": (0.3048, _dim(L=1)),
+    "yd": (0.9144, _dim(L=1)),
+    "mi": (1609.344, _dim(L=1)),
+    "mile": (1609.344, _dim(L=1)),
+    "lb": (0.45359237, _dim(M=1)),
+    "oz": (0.028349523125, _dim(M=1)),
+    "mph": (0.44704, _dim(L=1, T=-1)),
+    "knot": (1852.0 / 3600, _dim(L=1, T=-1)),
+    "knots": (1852.0 / 3600, _dim(L=1, T=-1)),
+    "kn": (1852.0 / 3600, _dim(L=1, T=-1)),
+    "eV": (1.602176634e-19, _dim(L=2, M=1, T=-2)),
+    "cal": (4.184, _dim(L=2, M=1, T=-2)),
+    "Wh": (3600.0, _dim(L=2, M=1, T=-2)),
+    "lbf": (4.4482216152605, _dim(L=1, M=1, T=-2)),
+}
+
+PREFIXES = {
+    "T": 1e12, "G": 1e9, "M": 1e6, "k": 1e3,
+    "c": 1e-2, "m": 1e-3, "μ": 1e-6, "µ": 1e-6, "u": 1e-6, "n": 1e-9, "p": 1e-12,
+}
+
+PREFIXABLE = {"m", "g", "s", "A", "K", "mol", "N", "J", "W", "Pa", "Hz", "C",
+              "V", "Ω", "ohm", "L", "eV", "cal", "Wh"}
+
+_SUPERSCRIPTS = str.maketrans("⁻⁰¹²³⁴⁵⁶⁷⁸⁹", "-0123456789")
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<num>-?\d+)|(?P<name>[A-Za-zμµΩ°]+)|(?P<sup>[⁻⁰¹²³⁴⁵⁶⁷⁸⁹]+)"
+    r"|(?P<op>\*\*|[*·⋅/^()]))"
+)
+
+_QUANTITY = re.compile(r"^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(\S.*)?$")
+
+
+def _lookup(symbol):
+    """Resolve one unit symbol, allowing an SI prefix on prefixable units"""
+    if symbol in UNITS:
+        return UNITS[symbol]
+    if len(symbol) > 1 and symbol[0] in PREFIXES and symbol[1:] in PREFIXABLE:
+        factor, dim = UNITS[symbol[1:]]
+        return PREFIXES[symbol[0]] * factor, dim
+    raise ValueError(f"Unknown unit: {symbol}")
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid unit: {text}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _UnitParser:
+    """Recursive-descent parser for products, quotients and powers of units"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        result = self.expression()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Invalid unit: {self.text}")
+        return result
+
+    def expression(self):
+        factor, dim = self.power()
+        while True:
+            kind, value = self.peek()
+            if value in ("*", "·", "⋅", "/"):
+                self.take()
+                f, d = self.power()
+                sign = -1 if value == "/" else 1
+            elif kind == "name" or value == "(":
+                # Implicit multiplication: "N m"
+                f, d = self.power()
+                sign = 1
+            else:
+                return factor, dim
+            factor *= f ** sign
+            dim = tuple(a + sign * b for a, b in zip(dim, d))
+
+    def power(self):
+        factor, dim = self.atom()
+        kind, value = self.peek()
+        exponent = None
+        if value in ("^", "**"):
+            self.take()
+            kind, value = self.take()
+            if kind != "num":
+                raise ValueError(f"Invalid unit exponent in: {self.text}")
+            exponent = int(value)
+        elif kind == "sup":
+            self.take()
+            exponent = int(value.translate(_SUPERSCRIPTS))
+        if exponent is None:
+            return factor, dim
+        return factor ** exponent, tuple(e * exponent for e in dim)
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "name":
+            return _lookup(value)
+        if kind == "num" and value == "1":
+            return 1.0, DIMENSIONLESS
+        if value == "(":
+            result = self.expression()
+            if self.take()[1] != ")":
+                raise ValueError(f"Unbalanced parentheses in unit: {self.text}")
+            return result
+        raise ValueError(f"Invalid unit: {self.text}")
+
+
+@lru_cache(maxsize=1024)
+def parse_unit(unit):
+    """
+    Parse a (possibly composite) unit string once
+
+    Args:
+        unit: Unit string such as "m/s", "kN·m", "km/h²" or "J/(kg·K)"
+
+    Returns:
+        tuple: (factor to SI, dimension exponent tuple)
+
+    Raises:
+        ValueError: If the unit string cannot be parsed
+    """
+    if unit is None or unit.strip() in ("", "1"):
+        return 1.0, DIMENSIONLESS
+    return _UnitParser(unit).parse()
+
+
+@lru_cache(maxsize=1024)
+def conversion_factor(from_unit, to_unit):
+    """
+    Multiplier that converts values in from_unit to to_unit
+
+    Raises:
+        ValueError: If either unit is unknown or the dimensions differ
+    """
+    from_factor, from_dim = parse_unit(from_unit)
+    to_factor, to_dim = parse_unit(to_unit)
+    if from_dim != to_dim:
+        raise ValueError(f"Cannot convert {from_unit} to {to_unit}: incompatible dimensions")
+    return from_factor / to_factor
+
+
+def convert(value, from_unit, to_unit):
+    """Convert a number or array between compatible units with one multiply"""
+    factor = conversion_factor(from_unit, to_unit)
+    if isinstance(value, (list, tuple)):
+        value = np.asarray(value, dtype=float)
+    return value * factor
+
+
+def convert_array(values, from_unit, to_unit):
+    """
+    Convert a whole column of values with one precomputed factor
+
+    Bad rows do not raise; they come back as NaN with their error flag set.
+
+    Args:
+        values: Sequence of numbers and/or numeric strings
+        from_unit: Unit of the input values
+        to_unit: Unit to convert to
+
+    Returns:
+        tuple: (converted float ndarray, bool ndarray error mask)
+
+    Raises:
+        ValueError: If either unit is unknown or the dimensions differ
+    """
+    factor = conversion_factor(from_unit, to_unit)
+    parsed, errors = parse_float_array(values)
+    return parsed * factor, errors
+
+
+def dimension_of(unit):
+    """Dimension exponent tuple of a unit string"""
+    return parse_unit(unit)[1]
+
+
+# Coherent SI unit of each dimension, in DIMENSIONS order
+SI_BASE_UNITS = ('m', 'kg', 's', 'A', 'K', 'mol')
+
+
+def si_unit(dim):
+    """
+    Unit string of a dimension tuple in SI base units
+
+    Returns:
+        str: e.g. "m·kg·s^-2" for (1, 1, -2, 0, 0, 0); "" when dimensionless
+    """
+    return "·".join(symbol if exponent == 1 else f"{symbol}^{exponent}"
+                    for symbol, exponent in zip(SI_BASE_UNITS, dim) if exponent)
+
+
+class Quantity:
+    """A value (number or NumPy array) with a unit"""
+
+    __slots__ = ('value', 'unit', 'factor', 'dim')
+
+    def __init__(self, value, unit=""):
+        if isinstance(value, (list, tuple)):
+            value = np.asarray(value, dtype=float)
+        self.value = value
+        self.unit = unit
+        self.factor, self.dim = parse_unit(unit)
+
+    @classmethod
+    def parse(cls, text):
+        """Parse a string such as "36 km/h" or "9.8 m/s^2" """
+        match = _QUANTITY.match(text)
+        if not match:
+            raise ValueError(f"Invalid quantity: {text}")
+        return cls(float(match.group(1)), (match.group(2) or "").strip())
+
+    def to(self, unit):
+        """Return this quantity expressed in another compatible unit"""
+        return Quantity(self.value * conversion_factor(self.unit, unit), unit)
+
+    def to_si(self):
+        """Value in coherent SI units (kg, m, s, A, K, mol)"""
+        return self.value * self.factor
+
+    def _combine(self, other, sign):
+        if not isinstance(other, Quantity):
+            other = Quantity(other)
+        if not other.unit:
+            unit = self.unit
+        elif not self.unit:
+            unit = other.unit if sign > 0 else f"1/({other.unit})"
+        else:
+            unit = f"({self.unit})·({other.unit})" if sign > 0 else f"({self.unit})/({other.unit})"
+        value = self.value * other.value if sign > 0 else self.value / other.value
+        return Quantity(value, unit)
+
+    def __mul__(self, other):
+        return self._combine(other, 1)
+
+    def __rmul__(self, other):
+        return self._combine(other, 1)
+
+    def __truediv__(self, other):
+        return self._combine(other, -1)
+
+    def __rtruediv__(self, other):
+        return Quantity(other)._combine(self, -1)
+
+    def __pow__(self, exponent):
+        """
+        Raise to a power. A non-integer power is allowed when every
+        dimension exponent stays whole, e.g. the square root of an area;
+        the result is then in SI base units.
+
+        Raises:
+            ValueError: If the power leaves a fractional dimension
+        """
+        if float(exponent).is_integer():
+            exponent = int(exponent)
+            return Quantity(self.value ** exponent, f"({self.unit})^{exponent}" if self.unit else "")
+        dim = tuple(e * exponent for e in self.dim)
+        if any(abs(e - round(e)) > 1e-9 for e in dim):
+            raise ValueError(f"Cannot raise {self.unit} to the power {exponent}: "
+                             "the dimensions would not be whole")
+        return Quantity(self.to_si() ** exponent, si_unit(tuple(int(round(e)) for e in dim)))
+
+    def _addend(self, other):
+        """other in this quantity's unit; plain numbers are dimensionless"""
+        if not isinstance(other, Quantity):
+            if self.dim != DIMENSIONLESS:
+                raise TypeError(f"Cannot add or subtract a plain number and a quantity in "
+                                f"{self.unit}; give the number a unit")
+            other = Quantity(other)
+        return other.to(self.unit).value
+
+    def __add__(self, other):
+        return Quantity(self.value + self._addend(other), self.unit)
+
+    def __radd__(self, other):
+        return Quantity(self._addend(other) + self.value, self.unit)
+
+    def __sub__(self, other):
+        return Quantity(self.value - self._addend(other), self.unit)
+
+    def __rsub__(self, other):
+        return Quantity(self._addend(other) - self.value, self.unit)
+
+    def __neg__(self):
+        return Quantity(-self.value, self.unit)
+
+    def __eq__(self, other):
+        if not isinstance(other, Quantity) or other.dim != self.dim:
+            return False
+        return np.all(self.to_si() == other.to_si())
+
+    def __repr__(self):
+        return f"Quantity({self.value!r}, {self.unit!r})"
+
+    def __str__(self):
+        return f"{self.value} {self.unit}".strip()
+
+
+def as_quantity(value):
+    """
+    Interpret a request value as a Quantity if it carries a unit
+
+    Accepts {"value": ..., "unit": "..."} dictionaries and strings such as
+    "36 km/h". Plain numbers, numeric strings and other values return None.
+    """
+    if isinstance(value, Quantity):
+        return value
+    if isinstance(value, dict) and "unit" in value:
+        return Quantity(value.get("value", 0), value["unit"])
+    if isinstance(value, str):
+        match = _QUANTITY.match(value)
+        if match and match.group(2):
+            return Quantity(float(match.group(1)), match.group(2).strip())
+    return None
+
+
+def normalize_inputs(data, units=None):
+    """
+    Convert unit-carrying inputs to plain numbers in the module's units
+
+    Args:
+        data: Request dictionary
+        units: Dictionary of field_name: unit the module expects (SI when a
+            field is not listed)
+
+    Returns:
+        dict: Copy of data with every unit-carrying value replaced by a number
+        (or list of numbers)
+
+    Raises:
+        ValueError: If a unit is unknown or has the wrong dimension
+    """
+    units = units or {}
+    normalized = {}
+    for key, value in (data or {}).items():
+        quantity = as_quantity(value)
+        if quantity is None:
+            normalized[key] = value
+            continue
+        if key in units:
+            number = quantity.to(units[key]).value
+        else:
+            number = quantity.to_si()
+        normalized[key] = number.tolist() if isinstance(number, np.ndarray) else number
+    return normalized
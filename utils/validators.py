@@ -3,6 +3,9 @@ Input Validation Utilities
 Helper functions for validating and parsing user inputs
 """
 
+import numpy as np
+
+
 def safe_float(value, field_name="Value"):
     """
     Safely parse a string to float with error handling
@@ -133,3 +136,48 @@ def parse_multiple_floats(values_dict, required_fields=None):
             result[field_name] = None
     
     return result
+
+
+def parse_float_array(values, allow_empty=False):
+    """
+    Parse a column of values to floats without raising per value
+    
+    Uses the same rules as safe_float: values that are not valid numbers are
+    errors, and so are empty values unless allow_empty is set (as
+    parse_multiple_floats does for optional fields). Numbers and numeric
+    strings are accepted.
+    
+    Args:
+        values: Sequence (or array) of numbers and/or strings
+        allow_empty: Treat empty values (and NaN) as missing rather than errors
+        
+    Returns:
+        tuple: (float ndarray with NaN for empty or bad rows,
+                bool ndarray error mask)
+    """
+    try:
+        result = np.asarray(values, dtype=float)
+        if allow_empty:
+            return result, np.zeros(result.shape, dtype=bool)
+        return result, np.isnan(result)
+    except (TypeError, ValueError):
+        pass
+    
+    # Slow path only for columns that contain bad or empty values
+    result = np.empty(len(values), dtype=float)
+    errors = np.zeros(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            result[index] = np.nan
+            errors[index] = not allow_empty
+            continue
+        try:
+            result[index] = float(value)
+        except (TypeError, ValueError):
+            result[index] = np.nan
+            errors[index] = True
+    if not allow_empty:
+        errors |= np.isnan(result)
+    return result, errors
@@ -3,9 +3,20 @@ Physics Lab - Web Application
 Flask-based web server with core physics modules
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import (Flask, render_template, request, jsonify, Response, stream_with_context, send_file,
+                   g, has_request_context, redirect, url_for, abort)
+from flask.json.provider import DefaultJSONProvider
+import functools
+import hashlib
+import io
 import math
 import json
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
 from datetime import datetime
 from pathlib import Path
 from modules.kinematics import Kinematics
@@ -18,13 +29,109 @@ from modules.electricity import Electricity
 from modules.vectors import Vectors
 from modules.projectile_motion import ProjectileMotion
 from modules.circular_motion import CircularMotion
+from modules.oscillator import Oscillator
+from modules.optics import Optics, OpticalSystem
+from utils.batch import parse_batch, to_serializable, BATCH_MODULES
+from utils.units import normalize_inputs, convert_array
+from utils.csv_stream import convert_csv, DEFAULT_CHUNK_SIZE
+from utils.bulk_upload import read_columns, bulk_calculate, detect_format
+from utils.streaming import NDJSON_MIMETYPE, wants_ndjson, ndjson_lines, iter_rows, iter_json_array
+from utils.jobs import JobQueue
+from utils import jit
+from utils.precision import DTYPES, precision_batch, resolve_precision
+from utils.live_stream import SSE_MIMETYPE, DEFAULT_RATE, create_simulation, paced_frames, sse_stream
+from utils.input_warnings import InputValidator, compile_rules
+from utils.singleflight import SingleFlight, canonical_key
+from utils.result_store import ResultStore
+from utils.http_cache import (CACHE_CONTROL, ENGINE_VERSION, SHORT_CACHE_CONTROL, VERSION_PARAM,
+                              canonical_query, calculation_etag)
+from utils.serialization import encode, encode_json, decode, negotiate
+from utils.compression import compress_response
+from utils.assets import DIST_DIR, IMMUTABLE_CACHE_CONTROL, load_manifest, select_variant
+from utils.client_engine import ROUTES as ENGINE_ROUTES, build_engine
+from utils.downsample import downsample_rows
+from utils.sweep_store import SweepStore
+from utils.render import FORMATS as IMAGE_FORMATS, RenderService, plot_spec
+
+class ResponseProvider(DefaultJSONProvider):
+    """jsonify() through utils.serialization: orjson with native NumPy
+    arrays when installed, or MessagePack / binary arrays when the client's
+    Accept header prefers them"""
+    sort_keys = False
+    
+    def dumps(self, obj, **kwargs):
+        return encode_json(obj).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        format_name = negotiate(request.accept_mimetypes) if has_request_context() else 'json'
+        body, mimetype = encode(obj, format_name)
+        response = self._app.response_class(body, mimetype=mimetype)
+        response.vary.add('Accept')
+        return response
 
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
+app.json = ResponseProvider(app)
 
 # History file
 HISTORY_FILE = Path('data/history.json')
 
+# Background jobs for long simulations (worker processes start on first use)
+job_queue = JobQueue()
+
+# Fingerprinted builds of the static assets (python -m utils.assets); assets
+# without a current build are served from static/ as they are
+built_assets = load_manifest()
+
+# Identical calculations running at the same time share one computation
+calculations = SingleFlight()
+
+# Results stored once per distinct calculation; history refers to them by hash
+result_store = ResultStore()
+
+# Large sweeps saved as memory-mapped .npy files ("store": true)
+sweep_store = SweepStore()
+
+# Server-side graph images, rendered on worker processes and cached on disk
+render_service = RenderService()
+
+# History entries waiting to be written. Concurrent requests append here and
+# whichever holds the write lock saves every pending entry in one rewrite.
+_pending_history = []
+_pending_lock = threading.Lock()
+_history_write_lock = threading.Lock()
+
+# Compile the JIT integrators in the background at startup, so the first
+# simulation request does not wait for Numba
+if os.environ.get('PHYSICS_LAB_JIT_WARMUP') == '1':
+    threading.Thread(target=jit.warm_up, daemon=True).start()
+
+# Units each route works in. Inputs may carry their own units, either as
+# {"value": 36, "unit": "km/h"} or "36 km/h", and are converted on entry.
+INPUT_UNITS = {
+    'kinematics': {'u': 'm/s', 'a': 'm/s^2', 't': 's', 's': 'm', 'v': 'm/s'},
+    'newtons_law': {'f': 'N', 'm': 'kg', 'a': 'm/s^2'},
+    'pe_ke': {'m': 'kg', 'h': 'm', 'v': 'm/s', 'g': 'm/s^2'},
+    'freefall': {'h': 'm', 'v0': 'm/s', 't': 's', 'g': 'm/s^2'},
+    'work_energy': {'force': 'N', 'distance': 'm', 'mass': 'kg', 'velocity': 'm/s',
+                    'height': 'm', 'g': 'm/s^2'},
+    'momentum': {'m1': 'kg', 'v1': 'm/s', 'm2': 'kg', 'v2': 'm/s'},
+    'electricity': {'v': 'V', 'i': 'A', 'q1': 'C', 'q2': 'C'},
+    'vectors': {},
+    'projectile': {'v0': 'm/s', 'theta': 'deg', 'g': 'm/s^2'},
+    'circular': {'v': 'm/s', 'r': 'm', 'm': 'kg', 'g': 'm/s^2'},
+    'energy_simulation': {'v0': 'm/s', 'dt': 's', 'm': 'kg', 'g': 'm/s^2',
+                          'length': 'm', 'k': 'N/m', 'angle': 'deg'},
+    'simple_harmonic_motion': {'A': 'm', 'f': 'Hz', 'T': 's', 'm': 'kg', 'k': 'N/m', 't': 's'},
+    'oscillator': {'t': 's', 't_max': 's', 'A': 'm', 'm': 'kg', 'k': 'N/m', 'phi': 'rad',
+                   'b': 'kg/s', 'F0': 'N', 'omega_d': 'rad/s', 'x0': 'm', 'v0': 'm/s'},
+    'oscillator_resonance': {'omega_d': 'rad/s', 'omega_min': 'rad/s', 'omega_max': 'rad/s',
+                             'm': 'kg', 'k': 'N/m', 'b': 'kg/s', 'F0': 'N'},
+    'optics': {'f': 'cm', 'u': 'cm', 'v': 'cm'},
+    'optics_trace': {},
+}
+
 def load_history():
     """Load calculation history"""
     try:
@@ -36,31 +143,211 @@ def load_history():
         pass
     return []
 
-def save_to_history(module, inputs, outputs):
-    """Save calculation to history"""
+def iter_history():
+    """Yield history entries one at a time without loading the whole file"""
+    try:
+        with open(HISTORY_FILE, 'r') as f:
+            yield from iter_json_array(f)
+    except (OSError, IOError, ValueError):
+        # Missing or unreadable history ends the stream
+        return
+
+def save_to_history(module, inputs, outputs, pure=True):
+    """Save calculation to history
+    
+    Pure results (a function of the inputs alone) go to the result store
+    and the history entry keeps only their hash; the hash is also sent
+    back in the X-Result-Hash header. Entries whose outputs vary between
+    runs (timings, job IDs) pass pure=False and are stored in full.
+    
+    GET requests are never saved: they are safe, cacheable reads, and a
+    browser or CDN cache may answer them without reaching the server. The
+    UI saves with an explicit POST. Requests sent with X-Save-History: 0
+    are not saved either.
+    """
     entry = {
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'module': module,
         'inputs': inputs,
         'outputs': outputs
     }
-    try:
-        history = load_history()
-        history.append(entry)
-        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=2)
-    except (OSError, IOError, PermissionError):
-        # Silently fail on read-only filesystem (Vercel)
-        # Calculations still work, history just doesn't persist
-        pass
+    if has_request_context() and (request.method == 'GET'
+                                  or request.headers.get('X-Save-History') == '0'):
+        return entry
+    if pure:
+        try:
+            key = result_store.put(module, inputs, outputs)
+            entry = {'timestamp': entry['timestamp'], 'module': module, 'hash': key}
+            if has_request_context():
+                g.result_hash = key
+        except (OSError, IOError, PermissionError):
+            # Read-only filesystem: keep the full entry
+            pass
+    with _pending_lock:
+        _pending_history.append(entry)
+    with _history_write_lock:
+        with _pending_lock:
+            pending = _pending_history[:]
+            _pending_history.clear()
+        if not pending:
+            # Another request already wrote this entry with its own
+            return entry
+        try:
+            history = load_history()
+            history.extend(pending)
+            HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(HISTORY_FILE, 'w') as f:
+                json.dump(history, f, indent=2)
+        except (OSError, IOError, PermissionError):
+            # Silently fail on read-only filesystem (Vercel)
+            # Calculations still work, history just doesn't persist
+            pass
     return entry
 
+def coalesced(module, data, compute):
+    """Run compute() once for concurrent requests with the same inputs
+    
+    Requests whose module and canonical inputs match one already being
+    computed wait for it and get the same result object, so the result must
+    not be modified afterwards. Each request still saves its own history
+    entry. Only worth it for expensive calculations (series, simulations,
+    sweeps): for a single formula, hashing the inputs costs more than
+    computing it again.
+    """
+    results, _ = calculations.do(canonical_key(module, data), compute)
+    return results
+
+def request_warnings(module, data, fields):
+    """Run the input warning rules for a single request
+    
+    Args:
+        module: Warning rule set name
+        data: Request dictionary
+        fields: Dictionary of rule field: request key
+    
+    The calculation routes treat 0 as "not given", so zeros and missing or
+    unparsable values are all passed to the rules as missing.
+    """
+    values = {}
+    for field, key in fields.items():
+        try:
+            value = float(data.get(key) or 0)
+        except (TypeError, ValueError):
+            value = 0
+        values[field] = value if value != 0 else None
+    return InputValidator.check(module, **values)
+
+def point_budget():
+    """Requested max_points, from the query string or the JSON body (None: all rows)"""
+    value = request.args.get('max_points')
+    if value is None and request.is_json:
+        value = (request.get_json(silent=True) or {}).get('max_points')
+    if value is None or value == '':
+        return None
+    return int(value)
+
+def batch_response(results, length=None, keys=None, x=None):
+    """Respond with a batch result as one JSON document, or as NDJSON rows
+    
+    Clients sending Accept: application/x-ndjson get a stream with a
+    {"meta": ...} line for the summary values followed by one line per row
+    (see utils.streaming.iter_rows), so the result is never built as one
+    large JSON string.
+    
+    Series with more rows than a requested max_points are first reduced to
+    that many with LTTB (utils.downsample), using x as the x axis.
+    """
+    max_points = point_budget()
+    if max_points is not None:
+        results = downsample_rows(results, max_points, x_key=x, length=length, keys=keys)
+        if 'downsampled' in results:
+            length = results['downsampled']['points']
+    if wants_ndjson(request.accept_mimetypes):
+        rows = iter_rows(results, length=length, keys=keys)
+        return Response(stream_with_context(ndjson_lines(rows)), mimetype=NDJSON_MIMETYPE)
+    return jsonify({'success': True, 'data': results})
+
+def series_rows(results, axis_length):
+    """Move a trailing time/frequency axis to the front so it becomes the row axis"""
+    return {
+        key: np.moveaxis(value, -1, 0) if np.ndim(value) and np.shape(value)[-1] == axis_length else value
+        for key, value in results.items()
+    }
+
+def request_data():
+    """Inputs of a calculation request: the JSON body, or the query string
+    of a GET without its engine version"""
+    if request.method == 'GET':
+        data = request.args.to_dict()
+        data.pop(VERSION_PARAM, None)
+        return data
+    return request.json
+
+def cacheable(route):
+    """Make the GET variant of a pure calculation route cacheable over HTTP
+    
+    GET requests are redirected to the canonical query string (the engine
+    version, then sorted keys, SI values and shortest numbers), so every
+    cache stores one copy per calculation and engine. A canonical URL's
+    response never changes, so it is cached for a year; after a release
+    its old URLs redirect to the new version's. Responses also get a strong
+    ETag, and a matching If-None-Match is answered with 304 without
+    computing anything. POST requests are passed through unchanged.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            try:
+                data = normalize_inputs(request_data(), INPUT_UNITS[route])
+                query = canonical_query(data)
+            except Exception as e:
+                return jsonify({'success': False, 'error': str(e)})
+            if request.query_string.decode('utf-8') != query:
+                response = redirect(f'{request.path}?{query}', code=301)
+                response.headers['Cache-Control'] = SHORT_CACHE_CONTROL
+                return response
+            
+            # Each representation (JSON, MessagePack, ...) has its own tag
+            etag = calculation_etag(route, data)
+            format_name = negotiate(request.accept_mimetypes)
+            if format_name != 'json':
+                etag = f'{etag}-{format_name}'
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.vary.add('Accept')
+            else:
+                response = app.make_response(view(*args, **kwargs))
+                if not decode(response.get_data(), response.mimetype).get('success'):
+                    # Errors are not cached
+                    response.headers['Cache-Control'] = 'no-store'
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+@app.after_request
+def add_result_hash(response):
+    """Tell clients where the stored result can be fetched again"""
+    key = g.get('result_hash')
+    if key:
+        response.headers['X-Result-Hash'] = key
+    return response
+
+@app.after_request
+def compress(response):
+    """Compress large and streamed responses (see utils.compression)"""
+    return compress_response(response, request.accept_encodings)
+
 # ==================== KINEMATICS ====================
-@app.route('/api/kinematics', methods=['POST'])
+@app.route('/api/kinematics', methods=['GET', 'POST'])
+@cacheable('kinematics')
 def kinematics():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['kinematics'])
         u = float(data.get('u', 0))
         a = float(data.get('a', 0))
         t = float(data.get('t', 0))
@@ -68,16 +355,18 @@ def kinematics():
         v = float(data.get('v', 0))
         
         results = Kinematics.calculate(u=u, a=a, t=t, s=s, v=v)
+        warnings = request_warnings('kinematics', data, {'u': 'u', 'v': 'v', 'a': 'a', 't': 't', 's': 's'})
         save_to_history('Kinematics', data, results)
-        return jsonify({'success': True, 'data': results})
+        return jsonify({'success': True, 'data': results, 'warnings': warnings})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== NEWTON'S LAW ====================
-@app.route('/api/newtons_law', methods=['POST'])
+@app.route('/api/newtons_law', methods=['GET', 'POST'])
+@cacheable('newtons_law')
 def newtons_law():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['newtons_law'])
         f = float(data.get('f', 0))
         m = float(data.get('m', 0))
         a = float(data.get('a', 0))
@@ -89,26 +378,29 @@ def newtons_law():
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== PE & KE ====================
-@app.route('/api/pe_ke', methods=['POST'])
+@app.route('/api/pe_ke', methods=['GET', 'POST'])
+@cacheable('pe_ke')
 def pe_ke():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['pe_ke'])
         m = float(data.get('m', 0))
         h = float(data.get('h', 0))
         v = float(data.get('v', 0))
         g = float(data.get('g', 9.8))
         
         results = PEandKE.calculate(m=m, h=h, v=v, g=g)
+        warnings = request_warnings('energy', data, {'m': 'm', 'v': 'v'})
         save_to_history('PE & KE', data, results)
-        return jsonify({'success': True, 'data': results})
+        return jsonify({'success': True, 'data': results, 'warnings': warnings})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== FREEFALL DYNAMICS ====================
-@app.route('/api/freefall', methods=['POST'])
+@app.route('/api/freefall', methods=['GET', 'POST'])
+@cacheable('freefall')
 def freefall():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['freefall'])
         h = float(data.get('h', 0))
         v0 = float(data.get('v0', 0))
         t = float(data.get('t', 0))
@@ -121,10 +413,11 @@ def freefall():
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== WORK AND ENERGY ====================
-@app.route('/api/work_energy', methods=['POST'])
+@app.route('/api/work_energy', methods=['GET', 'POST'])
+@cacheable('work_energy')
 def work_energy():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['work_energy'])
         force = float(data.get('force', 0))
         distance = float(data.get('distance', 0))
         mass = float(data.get('mass', 0))
@@ -142,33 +435,38 @@ def work_energy():
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== MOMENTUM ====================
-@app.route('/api/momentum', methods=['POST'])
+@app.route('/api/momentum', methods=['GET', 'POST'])
+@cacheable('momentum')
 def momentum():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['momentum'])
         m1 = float(data.get('m1', 0))
         v1 = float(data.get('v1', 0))
         m2 = float(data.get('m2', 0))
         v2 = float(data.get('v2', 0))
         
         results = Momentum.calculate(m1=m1, v1=v1, m2=m2, v2=v2)
+        warnings = request_warnings('momentum', data, {'m1': 'm1', 'v1': 'v1', 'm2': 'm2', 'v2': 'v2'})
         save_to_history('Momentum', data, results)
-        return jsonify({'success': True, 'data': results})
+        return jsonify({'success': True, 'data': results, 'warnings': warnings})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== ELECTRICITY ====================
-@app.route('/api/electricity', methods=['POST'])
+@app.route('/api/electricity', methods=['GET', 'POST'])
+@cacheable('electricity')
 def electricity():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['electricity'])
         calc_type = data.get('type', 'ohms')
+        warnings = []
         
         if calc_type == 'ohms':
             v = float(data.get('v', 0))
             i = float(data.get('i', 0))
             r = float(data.get('r', 0))
             results = Electricity.calculate_ohms_law(v=v, i=i, r=r)
+            warnings = request_warnings('ohms_law', data, {'V': 'v', 'I': 'i', 'R': 'r'})
         elif calc_type == 'coulombs':
             q1 = float(data.get('q1', 0))
             q2 = float(data.get('q2', 0))
@@ -178,15 +476,16 @@ def electricity():
             results = {}
         
         save_to_history('Electricity', data, results)
-        return jsonify({'success': True, 'data': results})
+        return jsonify({'success': True, 'data': results, 'warnings': warnings})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== VECTORS ====================
-@app.route('/api/vectors', methods=['POST'])
+@app.route('/api/vectors', methods=['GET', 'POST'])
+@cacheable('vectors')
 def vectors():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['vectors'])
         calc_type = data.get('type', 'magnitude')
         
         if calc_type == 'magnitude':
@@ -221,10 +520,11 @@ def vectors():
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== PROJECTILE MOTION ====================
-@app.route('/api/projectile', methods=['POST'])
+@app.route('/api/projectile', methods=['GET', 'POST'])
+@cacheable('projectile')
 def projectile():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['projectile'])
         v0 = float(data.get('v0', 0))
         theta = float(data.get('theta', 0))
         g = float(data.get('g', 9.8))
@@ -236,10 +536,11 @@ def projectile():
         return jsonify({'success': False, 'error': str(e)})
 
 # ==================== CIRCULAR MOTION ====================
-@app.route('/api/circular', methods=['POST'])
+@app.route('/api/circular', methods=['GET', 'POST'])
+@cacheable('circular')
 def circular():
     try:
-        data = request.json
+        data = normalize_inputs(request_data(), INPUT_UNITS['circular'])
         v = float(data.get('v', 0))
         r = float(data.get('r', 0))
         m = float(data.get('m', 0))
@@ -251,22 +552,629 @@ def circular():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+# ==================== ENERGY SIMULATION ====================
+# Largest simulation answered inline; anything longer would hold a request
+# thread for seconds, so it has to go to the job queue (POST /api/jobs)
+ENERGY_SIMULATION_MAX_STEPS = 20000
+# Steps × initial conditions, summed over the run and the integrator
+# comparison's reruns (about 1.5 s on the NumPy backend)
+ENERGY_SIMULATION_MAX_SAMPLE_STEPS = 20000000
+
+@app.route('/api/energy_simulation', methods=['POST'])
+def energy_simulation():
+    try:
+        data = normalize_inputs(request.json, INPUT_UNITS['energy_simulation'])
+        system = data.get('system', 'spring')
+        integrator = data.get('integrator', 'verlet')
+        backend = data.get('backend', 'auto')
+        dt = float(data.get('dt', 0.01))
+        steps = int(data.get('steps', 1000))
+        params = parse_batch(data, {
+            'x0': 1.0, 'v0': 0.0, 'm': 1.0, 'g': 9.8,
+            'length': 1.0, 'k': 10.0, 'angle': 30.0
+        })
+        runs = 1
+        if data.get('compare', True):
+            runs += len(data.get('integrators') or jit.INTEGRATOR_IDS)
+        sample_steps = steps * np.broadcast(*params.values()).size * runs
+        if steps > ENERGY_SIMULATION_MAX_STEPS or sample_steps > ENERGY_SIMULATION_MAX_SAMPLE_STEPS:
+            raise ValueError(
+                f"Simulation too long to run inline (at most {ENERGY_SIMULATION_MAX_STEPS} steps "
+                f"and {ENERGY_SIMULATION_MAX_SAMPLE_STEPS} steps × initial conditions, including "
+                "the integrator comparison); submit it as an energy_simulation job to POST /api/jobs"
+            )
+        
+        def simulate():
+            results = jit.simulate(
+                backend=backend, system=system, integrator=integrator, dt=dt, steps=steps, **params
+            )
+            if data.get('compare', True):
+                results['integrators'] = jit.compare_integrators(
+                    backend=backend, system=system, integrators=data.get('integrators'),
+                    dt=dt, steps=steps, **params
+                )
+            return results
+        
+        results = coalesced('energy_simulation', data, simulate)
+        summary = {
+            'max_energy_drift': results['max_energy_drift'],
+            'steps_per_second': results['steps_per_second']
+        }
+        save_to_history('Energy Simulation', data, summary, pure=False)
+        return batch_response(results, keys=[
+            't', 'position', 'velocity', 'potential_energy', 'kinetic_energy', 'total_energy'
+        ], x='t')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== OSCILLATOR ====================
+OSCILLATOR_PARAMS = {
+    'simple': {'A': 1.0, 'm': 1.0, 'k': 10.0, 'phi': 0.0},
+    'damped': {'m': 1.0, 'k': 10.0, 'b': 0.5, 'x0': 1.0, 'v0': 0.0},
+    'driven': {'m': 1.0, 'k': 10.0, 'b': 0.5, 'F0': 1.0, 'omega_d': 3.0, 'x0': 0.0, 'v0': 0.0}
+}
+
+def time_axis(data, default_max=10.0):
+    """Read an explicit 't' array or build one from 't_max' and 'points'"""
+    if 't' in data:
+        return parse_batch(data, {'t': 0})['t']
+    t_max = float(data.get('t_max', default_max))
+    points = int(data.get('points', 500))
+    return np.linspace(0, t_max, points)
+
+@app.route('/api/simple_harmonic_motion', methods=['GET', 'POST'])
+@cacheable('simple_harmonic_motion')
+def simple_harmonic_motion():
+    try:
+        data = normalize_inputs(request_data(), INPUT_UNITS['simple_harmonic_motion'])
+        A = float(data.get('A', 0))
+        f = float(data.get('f', 0))
+        T = float(data.get('T', 0))
+        m = float(data.get('m', 0))
+        k = float(data.get('k', 0))
+        t = float(data['t']) if data.get('t') is not None else None
+        
+        results = Oscillator.calculate(A=A, f=f, T=T, m=m, k=k, t=t)
+        save_to_history('Simple Harmonic Motion', data, results)
+        return jsonify({'success': True, 'data': results})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/oscillator', methods=['POST'])
+def oscillator():
+    try:
+        data = normalize_inputs(request.json, INPUT_UNITS['oscillator'])
+        kind = data.get('type', 'simple')
+        if kind not in OSCILLATOR_PARAMS:
+            raise ValueError(f"Unknown oscillator type: {kind}")
+        
+        t = time_axis(data)
+        params = parse_batch(data, OSCILLATOR_PARAMS[kind])
+        results = coalesced('oscillator', data,
+                            lambda: dict(getattr(Oscillator, kind)(t, **params), t=t))
+        save_to_history('Oscillator', data, {'type': kind, 'points': int(t.size)})
+        if t.ndim != 1:
+            return jsonify({'success': True, 'data': to_serializable(results)})
+        return batch_response(series_rows(results, t.size), length=t.size, x='t')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/oscillator/resonance', methods=['POST'])
+def oscillator_resonance():
+    try:
+        data = normalize_inputs(request.json, INPUT_UNITS['oscillator_resonance'])
+        if 'omega_d' in data:
+            omega_d = parse_batch(data, {'omega_d': 0})['omega_d']
+        else:
+            omega_d = np.linspace(
+                float(data.get('omega_min', 0.1)),
+                float(data.get('omega_max', 10.0)),
+                int(data.get('points', 500))
+            )
+        params = parse_batch(data, {'m': 1.0, 'k': 10.0, 'b': 0.5, 'F0': 1.0})
+        
+        results = coalesced('oscillator_resonance', data,
+                            lambda: Oscillator.resonance_curve(omega_d, **params))
+        summary = {
+            'peak_omega': results['peak_omega'],
+            'quality_factor': results['quality_factor']
+        }
+        save_to_history('Oscillator Resonance', data, to_serializable(summary))
+        if omega_d.ndim != 1:
+            return jsonify({'success': True, 'data': to_serializable(results)})
+        return batch_response(series_rows(results, omega_d.size), length=omega_d.size, x='omega_d')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== OPTICS ====================
+@app.route('/api/optics', methods=['GET', 'POST'])
+@cacheable('optics')
+def optics():
+    try:
+        data = normalize_inputs(request_data(), INPUT_UNITS['optics'])
+        f = float(data.get('f', 0))
+        u = float(data.get('u', 0))
+        v = float(data.get('v', 0))
+        
+        results = Optics.calculate(f=f, u=u, v=v)
+        warnings = request_warnings('optics', data, {'f': 'f', 'u': 'u', 'v': 'v'})
+        save_to_history('Optics', data, results)
+        return jsonify({'success': True, 'data': results, 'warnings': warnings})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/optics/trace', methods=['POST'])
+def optics_trace():
+    try:
+        data = normalize_inputs(request.json, INPUT_UNITS['optics_trace'])
+        system = OpticalSystem(data.get('elements', []))
+        if 'y' in data or 'theta' in data:
+            rays = parse_batch(data, {'y': 0.0, 'theta': 0.0})
+        else:
+            # Fan of parallel rays across the aperture
+            n_rays = int(data.get('n_rays', 11))
+            y_max = float(data.get('y_max', 1.0))
+            rays = {'y': np.linspace(-y_max, y_max, n_rays), 'theta': np.zeros(n_rays)}
+        
+        def trace():
+            y_out, theta_out = system.trace(rays['y'], rays['theta'])
+            results = system.properties()
+            results.update({'y_in': rays['y'], 'theta_in': rays['theta'],
+                            'y_out': y_out, 'theta_out': theta_out})
+            return results
+        
+        results = coalesced('optics_trace', data, trace)
+        save_to_history('Optics Ray Trace', {'elements': data.get('elements', [])},
+                        system.properties())
+        return batch_response(results, keys=['y_in', 'theta_in', 'y_out', 'theta_out'])
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== LIVE SIMULATION STREAMS ====================
+@app.route('/api/stream/<simulation>', methods=['GET'])
+def simulation_stream(simulation):
+    """Stream projectile, circular or freefall frames as Server-Sent Events
+    
+    Parameters come from the query string (EventSource can only send GET),
+    plus rate (frames per second) and speed (simulated seconds per second).
+    """
+    try:
+        data = normalize_inputs(request.args.to_dict(), INPUT_UNITS.get(simulation))
+        state, duration = create_simulation(simulation, data)
+        frames = paced_frames(
+            state, duration,
+            rate=float(data.get('rate', DEFAULT_RATE)),
+            speed=float(data.get('speed', 1.0))
+        )
+        save_to_history('Live Simulation', dict(data, simulation=simulation),
+                        {'duration': duration})
+        response = Response(stream_with_context(sse_stream(frames, duration)),
+                            mimetype=SSE_MIMETYPE)
+        # Frames must reach the client as they are produced
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== BACKGROUND JOBS ====================
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    try:
+        data = request.json
+        job_id = job_queue.submit(
+            data.get('task'),
+            normalize_inputs(data.get('params', {}), INPUT_UNITS.get(data.get('task'))),
+            priority=int(data.get('priority', 0))
+        )
+        save_to_history('Background Job', data, {'job_id': job_id}, pure=False)
+        return jsonify({'success': True, 'data': job_queue.status(job_id)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    try:
+        return jsonify({'success': True, 'data': job_queue.list_jobs()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    try:
+        return jsonify({'success': True, 'data': job_queue.status(job_id)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    try:
+        # The result file already holds the JSON document, so send it as is
+        return send_file(job_queue.result_path(job_id).resolve(), mimetype='application/json')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/jobs/<job_id>/output', methods=['GET'])
+def job_output(job_id):
+    """The file a finished job wrote, such as a report's PDF"""
+    try:
+        path = job_queue.output_path(job_id)
+        return send_file(path.resolve(), mimetype=mimetypes.guess_type(path.name)[0],
+                         as_attachment=True, download_name=f'{job_id[:8]}-{path.name}')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    try:
+        return jsonify({'success': True, 'data': job_queue.cancel(job_id)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== PARALLEL SWEEPS ====================
+@app.route('/api/sweep/<module>', methods=['POST'])
+def parallel_sweep(module):
+    """Evaluate a bulk-upload module over a large sweep or batch on all cores
+    
+    The body holds either a sweep ({"sweep": "theta", "start": 0, "stop": 90,
+    "points": 1000000}) with "fixed" inputs, or equal-length input "columns".
+    "precision" is float64 (default), float32 or high.
+    
+    With "store": true the results are written to a sweep file instead of
+    being sent; the response describes the file, whose rows are then read
+    through /api/sweeps/<key>.
+    """
+    try:
+        data = request.json
+        units = INPUT_UNITS.get(module)
+        columns = normalize_inputs(data.get('columns', data.get('fixed', {})), units)
+        sweep = None
+        if 'sweep' in data:
+            bounds = normalize_inputs({data['sweep']: data.get('start', 0)}, units)
+            stop = normalize_inputs({data['sweep']: data.get('stop', 0)}, units)
+            sweep = {'name': data['sweep'], 'start': bounds[data['sweep']],
+                     'stop': stop[data['sweep']], 'points': int(data.get('points', 1000))}
+        
+        def evaluate():
+            results, masks, report = precision_batch(
+                module, columns, sweep=sweep, precision=data.get('precision', 'float64'),
+                workers=data.get('workers'), chunk_size=data.get('chunk_size')
+            )
+            if masks is not None:
+                results['warning_masks'] = masks
+            results['scaling'] = report
+            return results
+        
+        if data.get('store'):
+            # Refuse what the store cannot hold before computing anything
+            precision = resolve_precision(data.get('precision'))
+            if precision not in DTYPES:
+                raise ValueError("Only float32 and float64 sweeps can be stored!")
+            key = canonical_key(f'sweep/{module}', {
+                'columns': columns, 'sweep': sweep, 'precision': precision,
+                'engine': ENGINE_VERSION
+            })
+            
+            def store():
+                results = evaluate()
+                arrays = {name: value for name, value in results.items()
+                          if name not in ('warning_masks', 'scaling')}
+                return sweep_store.put(key, module, arrays, results.get('warning_masks'),
+                                       sweep, results['scaling'])
+            
+            try:
+                meta = sweep_store.metadata(key)
+            except ValueError:
+                meta = calculations.do(key, store)[0]
+            save_to_history('Parallel Sweep', {'module': module, 'sweep': sweep},
+                            dict(meta['report'], key=key), pure=False)
+            return jsonify({'success': True, 'data': sweep_file_info(meta)})
+        
+        results = coalesced(f'sweep/{module}', data, evaluate)
+        report = results['scaling']
+        save_to_history('Parallel Sweep', {'module': module, 'sweep': sweep}, report, pure=False)
+        return batch_response(results, length=report['rows'], x=sweep['name'] if sweep else None)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== SWEEP FILES ====================
+def sweep_file_info(meta):
+    """Sidecar of a stored sweep with the URLs of its files"""
+    key = meta['key']
+    urls = {'meta': url_for('sweep_meta', key=key),
+            'data': url_for('sweep_file', key=key, part='data'),
+            'slice': url_for('sweep_slice', key=key)}
+    if meta['masks']:
+        urls['masks'] = url_for('sweep_file', key=key, part='masks')
+    return dict(meta, urls=urls)
+
+def immutable(response):
+    """Mark a response for a stored sweep as cacheable forever: a key
+    always holds the same results"""
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+@app.route('/api/sweeps/<key>', methods=['GET'])
+def sweep_meta(key):
+    try:
+        response = jsonify({'success': True, 'data': sweep_file_info(sweep_store.metadata(key))})
+        response.set_etag(key)
+        return immutable(response).make_conditional(request)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/sweeps/<key>/<part>.npy', methods=['GET'])
+def sweep_file(key, part):
+    """Download a sweep's .npy file ('data' or 'masks')
+    
+    Range requests are answered with 206 and just those bytes, read from
+    the file without loading the rest. The sidecar lists each column's
+    byte offset.
+    """
+    if part not in ('data', 'masks'):
+        abort(404)
+    try:
+        sweep_store.metadata(key)
+        path = sweep_store.path(key, part)
+    except ValueError:
+        abort(404)
+    if not path.exists():
+        abort(404)
+    response = send_file(path.resolve(), mimetype='application/octet-stream', conditional=True,
+                         download_name=f'{key}.{part}.npy')
+    return immutable(response)
+
+@app.route('/api/sweeps/<key>/slice', methods=['GET'])
+def sweep_slice(key):
+    """Rows and columns of a stored sweep
+    
+    Query: columns (comma-separated, default all), start/stop/step (row
+    numbers), from/to (swept values, inclusive) and max_points (LTTB, see
+    batch_response). Supports the same response formats as a sweep.
+    """
+    try:
+        def number(name, kind):
+            value = request.args.get(name, '')
+            return kind(value) if value != '' else None
+        
+        columns = request.args.get('columns')
+        arrays, meta = sweep_store.read(
+            key, columns=columns.split(',') if columns else None,
+            start=number('start', int), stop=number('stop', int), step=number('step', int),
+            low=number('from', float), high=number('to', float)
+        )
+        axis = meta['axis']
+        x = axis['name'] if axis and axis['name'] in arrays else None
+        length = len(next(iter(arrays.values()))) if arrays else 0
+        return immutable(batch_response(arrays, length=length, keys=list(arrays), x=x))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== INPUT WARNINGS ====================
+@app.route('/api/warnings/<module>', methods=['POST'])
+def batch_warnings(module):
+    try:
+        rules = compile_rules(module)
+        data = request.json
+        columns = {field: data[field] for field in rules.fields if field in data}
+        masks = rules.batch_masks(columns)
+        
+        if wants_ndjson(request.accept_mimetypes):
+            # One line per row: its mask and the messages it expands to
+            rows = ({'mask': mask, 'warnings': rules.messages(mask)}
+                    for mask in masks.ravel().tolist())
+            return Response(stream_with_context(ndjson_lines(rows)), mimetype=NDJSON_MIMETYPE)
+        response = {'masks': masks.tolist(), 'messages': rules.texts}
+        if data.get('materialize'):
+            response['warnings'] = [rules.messages(mask) for mask in masks.ravel()]
+        return jsonify({'success': True, 'data': response})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== UNIT CONVERSION ====================
+def uploaded_file():
+    """Binary stream and file name of an uploaded file field or a raw request body"""
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            raise ValueError("No file uploaded!")
+        return upload.stream, upload.filename
+    return io.BufferedReader(request.stream), None
+
+def uploaded_text_stream():
+    """Text stream over an uploaded file field or a raw request body"""
+    raw, _ = uploaded_file()
+    return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+@app.route('/api/convert/bulk', methods=['POST'])
+def convert_bulk():
+    try:
+        if request.is_json:
+            data = request.json
+            values, errors = convert_array(
+                data.get('values', []), data.get('from_unit'), data.get('to_unit')
+            )
+            if wants_ndjson(request.accept_mimetypes):
+                return batch_response({'value': values, 'error': errors}, keys=['value', 'error'])
+            return jsonify({'success': True, 'data': {
+                'values': to_serializable(values),
+                'errors': errors.tolist(),
+                'error_count': int(errors.sum())
+            }})
+        
+        # CSV upload: converted rows are streamed back chunk by chunk
+        params = request.form if request.mimetype == 'multipart/form-data' else request.args
+        rows = convert_csv(
+            uploaded_text_stream(),
+            column=params.get('column', '0'),
+            from_unit=params['from_unit'],
+            to_unit=params['to_unit'],
+            chunk_size=int(params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        )
+        return Response(stream_with_context(rows), mimetype='text/csv')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/upload/<module>', methods=['POST'])
+def upload_bulk(module):
+    """Run a module over every row of an uploaded CSV or Parquet file
+    
+    Results are streamed back as CSV or NDJSON (format=ndjson or an
+    Accept: application/x-ndjson header) while the file is still being read.
+    """
+    try:
+        params = request.form if request.mimetype == 'multipart/form-data' else request.args
+        raw, filename = uploaded_file()
+        file_format = params.get('format') or detect_format(
+            filename, 'parquet' if request.mimetype == 'application/vnd.apache.parquet' else 'csv'
+        )
+        if file_format == 'parquet' and not filename:
+            # Parquet needs random access, so spool a raw body (to disk when large)
+            spool = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+            shutil.copyfileobj(raw, spool)
+            spool.seek(0)
+            raw = spool
+        
+        output = params.get('output')
+        if output is None:
+            best = request.accept_mimetypes.best_match(['text/csv', 'application/x-ndjson'])
+            output = 'ndjson' if best == 'application/x-ndjson' else 'csv'
+        header, chunks = read_columns(
+            raw, file_format, int(params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        )
+        stats = {}
+        body = bulk_calculate(header, chunks, module, output, stats)
+        
+        def generate():
+            yield from body
+            # One summary entry for the whole upload once it has been processed
+            save_to_history(BATCH_MODULES[module]['name'], {
+                'upload': filename or 'request body', 'format': file_format
+            }, stats, pure=False)
+        
+        mimetype = 'application/x-ndjson' if output == 'ndjson' else 'text/csv'
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 # ==================== HISTORY ====================
 @app.route('/api/history', methods=['GET'])
 def get_history():
     try:
-        return jsonify(load_history())
+        if wants_ndjson(request.accept_mimetypes):
+            # One entry per line, read from disk as the response is sent
+            entries = result_store.expand_all(iter_history())
+            return Response(stream_with_context(ndjson_lines(entries, chunk_size=100)),
+                            mimetype=NDJSON_MIMETYPE)
+        return jsonify(list(result_store.expand_all(load_history())))
     except Exception as e:
         return jsonify([])
 
 @app.route('/api/history/clear', methods=['POST'])
 def clear_history():
     try:
-        HISTORY_FILE.write_text('[]')
+        with _history_write_lock:
+            HISTORY_FILE.write_text('[]')
+            # Nothing refers to the stored results any more
+            result_store.clear()
         return jsonify({'status': 'cleared'})
     except (OSError, IOError):
         return jsonify({'status': 'cleared'})
 
+# ==================== STORED RESULTS ====================
+@app.route('/api/result/<key>', methods=['GET'])
+def stored_result(key):
+    """A stored result by hash (from history or the X-Result-Hash header)
+    
+    The content behind a hash never changes, so the hash itself is a
+    strong ETag and the response may be cached indefinitely.
+    """
+    try:
+        response = jsonify({'success': True, 'hash': key, 'data': result_store.get(key)})
+        response.set_etag(key)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== PLOT RENDERING ====================
+# Query/body names of the figure options; the size names avoid clashing
+# with inputs such as work_energy's height
+RENDER_OPTIONS = {'fig_width': 'width', 'fig_height': 'height', 'dpi': 'dpi', 'theme': 'theme'}
+
+@app.route('/api/render/<module>.<fmt>', methods=['GET', 'POST'])
+def render_plot(module, fmt):
+    """A module's graph as a PNG, SVG or PDF image (utils.render)
+    
+    Inputs come from the query string or the JSON body, in any supported
+    unit; fig_width, fig_height (inches), dpi and theme (dark or light) set
+    the figure. The image's ETag is the hash of its plot spec, so a cached copy
+    is revalidated without rendering anything.
+    """
+    try:
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {fmt}")
+        data = dict(request_data() or {})
+        options = {option: data.pop(name) for name, option in RENDER_OPTIONS.items() if name in data}
+        inputs = normalize_inputs(data, INPUT_UNITS.get(module))
+        image, key = render_service.render(plot_spec(module, inputs), fmt, **options)
+        response = Response(image, mimetype=IMAGE_FORMATS[fmt])
+        response.set_etag(key)
+        # The URL does not name the engine version, so revalidate soon
+        response.headers['Cache-Control'] = SHORT_CACHE_CONTROL
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== STATIC ASSETS ====================
+@app.template_global()
+def asset_url(filename):
+    """URL of a static asset: its fingerprinted build when one is current"""
+    if filename in built_assets:
+        return url_for('built_asset', filename=built_assets[filename])
+    return url_for('static', filename=filename)
+
+@app.route('/assets/<filename>', methods=['GET'])
+def built_asset(filename):
+    """Serve a built asset, precompressed (brotli, then gzip) when the
+    client accepts it. Fingerprinted names change with the content, so
+    the files can be cached forever."""
+    if filename not in built_assets.values():
+        abort(404)
+    path, encoding = select_variant(DIST_DIR, filename, request.accept_encodings)
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+# ==================== CLIENT ENGINE ====================
+@app.route('/engine.js', methods=['GET'])
+def engine_script():
+    """The scalar formulas translated to JavaScript (utils.client_engine),
+    so the UI shows results before the server has answered"""
+    source, digest = build_engine()
+    response = Response(source, mimetype='application/javascript')
+    response.set_etag(digest)
+    # Revalidated on each load, so a changed formula is picked up at once
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/sw.js', methods=['GET'])
+def service_worker():
+    """Service worker caching the app shell and queueing offline history
+    writes. Served from the root so it controls the whole site."""
+    shell = [url_for('index'), asset_url('style.css'), asset_url('script.js'),
+             url_for('engine_script')]
+    _, digest = build_engine()
+    version = hashlib.sha256(json.dumps([shell, digest]).encode('utf-8')).hexdigest()[:12]
+    body = render_template('sw.js', version=version, shell=shell,
+                           queued_routes=[f'/api/{route}' for route in ENGINE_ROUTES])
+    response = Response(body, mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')